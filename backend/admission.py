@@ -0,0 +1,202 @@
+import os
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException
+
+# --- Admission Control ---
+# Expensive endpoints are grouped into classes. Each class has its own concurrency
+# limit and bounded wait queue, and all classes share a pool of worker slots.
+# When a slot frees up, waiting requests are admitted in priority order (interactive
+# first), and the last RESERVED_SLOTS slots are only ever given to interactive
+# requests, so chat stays responsive while scans are running.
+# A full queue (or a wait longer than the class's max wait) is answered with a fast
+# 429 and a Retry-After estimate.
+WORKER_SLOTS = int(os.getenv("SCOUT_ADMISSION_WORKERS", "8"))
+RESERVED_SLOTS = int(os.getenv("SCOUT_ADMISSION_RESERVED", "2"))
+
+# name -> (concurrency limit, queue size, priority (lower = sooner), max queue wait seconds)
+DEFAULT_CLASSES = {
+    "interactive": (4, 20, 0, 30),  # /api/chat, /api/draft_email
+    "research": (3, 10, 1, 60),  # /api/deep_dive, /api/battlecards
+    "artifact": (2, 10, 1, 60),  # /api/audio, /api/generate_pdf
+    "scan": (2, 6, 2, 300),  # /api/run, /api/run/windows
+    "batch": (1, 2, 3, 600),  # /api/batch
+}
+
+WAIT_SAMPLES = 500
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+class EndpointClass:
+    def __init__(self, name: str, limit: int, queue_size: int, priority: int, max_wait: float):
+        # Each class can be tuned with SCOUT_<NAME>_CONCURRENCY / SCOUT_<NAME>_QUEUE
+        self.name = name
+        self.limit = int(os.getenv(f"SCOUT_{name.upper()}_CONCURRENCY", limit))
+        self.queue_size = int(os.getenv(f"SCOUT_{name.upper()}_QUEUE", queue_size))
+        self.priority = priority
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.waiters = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_times = deque(maxlen=WAIT_SAMPLES)
+        self.service_times = deque(maxlen=WAIT_SAMPLES)
+
+    def avg_service_time(self):
+        if not self.service_times:
+            return None
+        return sum(self.service_times) / len(self.service_times)
+
+    def metrics(self):
+        waits = list(self.wait_times)
+        avg_service = self.avg_service_time()
+        return {
+            "priority": self.priority,
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "queued": len(self.waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait_p50": round(_percentile(waits, 0.5), 3) if waits else None,
+            "wait_p95": round(_percentile(waits, 0.95), 3) if waits else None,
+            "wait_max": round(max(waits), 3) if waits else None,
+            "avg_service_time": round(avg_service, 3) if avg_service is not None else None,
+        }
+
+
+class AdmissionController:
+    """
+    Bounded, prioritized admission for expensive endpoints.
+    All state is touched only from the event loop thread, so no locking is needed.
+    """
+
+    def __init__(self, classes=None, worker_slots: int = WORKER_SLOTS, reserved: int = RESERVED_SLOTS):
+        self.classes = {
+            name: EndpointClass(name, *settings)
+            for name, settings in (classes or DEFAULT_CLASSES).items()
+        }
+        self.worker_slots = worker_slots
+        self.reserved = min(reserved, max(worker_slots - 1, 0))
+        self.in_flight = 0
+
+    def _can_start(self, cls: EndpointClass):
+        # Non-interactive classes can't take the reserved slots
+        available = self.worker_slots - (0 if cls.priority == 0 else self.reserved)
+        return cls.in_flight < cls.limit and self.in_flight < available
+
+    def _higher_priority_waiting(self, cls: EndpointClass):
+        return any(other.waiters for other in self.classes.values() if other.priority < cls.priority)
+
+    def _start(self, cls: EndpointClass, waited: float):
+        cls.in_flight += 1
+        cls.admitted += 1
+        cls.wait_times.append(waited)
+        self.in_flight += 1
+
+    def _dispatch(self):
+        for cls in sorted(self.classes.values(), key=lambda c: c.priority):
+            while cls.waiters and self._can_start(cls):
+                future, enqueued = cls.waiters.popleft()
+                if future.done():
+                    continue
+                self._start(cls, time.monotonic() - enqueued)
+                future.set_result(True)
+
+    def retry_after(self, cls: EndpointClass):
+        """
+        Rough estimate (seconds) of when a queue slot will open up.
+        """
+        service = cls.avg_service_time() or 5
+        return max(1, int(service * (len(cls.waiters) + 1) / max(cls.limit, 1)))
+
+    def _reject(self, cls: EndpointClass, reason: str):
+        raise HTTPException(
+            status_code=429,
+            detail=f"Server busy ({cls.name} {reason}). Please retry shortly.",
+            headers={"Retry-After": str(self.retry_after(cls))},
+        )
+
+    async def acquire(self, name: str):
+        cls = self.classes[name]
+        if not cls.waiters and not self._higher_priority_waiting(cls) and self._can_start(cls):
+            self._start(cls, 0.0)
+            return
+
+        if len(cls.waiters) >= cls.queue_size:
+            cls.rejected += 1
+            self._reject(cls, "queue full")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (future, time.monotonic())
+        cls.waiters.append(entry)
+        try:
+            await asyncio.wait_for(future, timeout=cls.max_wait)
+        except asyncio.TimeoutError:
+            self._discard(cls, entry)
+            cls.timed_out += 1
+            self._reject(cls, "queue wait timed out")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as the client went away: hand the slot back
+                self.release(name)
+            else:
+                self._discard(cls, entry)
+            raise
+
+    def _discard(self, cls: EndpointClass, entry):
+        try:
+            cls.waiters.remove(entry)
+        except ValueError:
+            pass
+
+    def release(self, name: str):
+        cls = self.classes[name]
+        cls.in_flight -= 1
+        self.in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, name: str):
+        """
+        Holds an admission slot of the given class for the duration of the block.
+        """
+        await self.acquire(name)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.classes[name].service_times.append(time.monotonic() - started)
+            self.release(name)
+
+    def under_pressure(self):
+        """
+        True when any request is queued or the shared worker pool is nearly full.
+        Background work (e.g. prefetching) should back off.
+        """
+        if any(cls.waiters for cls in self.classes.values()):
+            return True
+        return self.in_flight >= self.worker_slots - self.reserved
+
+    def metrics(self):
+        return {
+            "worker_slots": self.worker_slots,
+            "reserved_interactive_slots": self.reserved,
+            "in_flight": self.in_flight,
+            "queued": sum(len(cls.waiters) for cls in self.classes.values()),
+            "classes": {name: cls.metrics() for name, cls in self.classes.items()},
+        }
+
+
+admission = AdmissionController()
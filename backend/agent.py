@@ -1,5 +1,4 @@
 import os
-import json
 from tavily import TavilyClient
 import google.generativeai as genai
 from dotenv import load_dotenv
@@ -12,11 +11,21 @@ from datetime import datetime
 import markdown
 from gtts import gTTS
 import re
+import time
 from xml.sax.saxutils import escape
 
 load_dotenv()
 
 import requests
+from spool import RunSpool, new_run_id
+from circuit_breaker import get_breaker
+from payloads import read_json, iter_results, compact_tavily, SNIPPET_CHARS
+from report_model import parse_report, save_report
+from archive import archive
+from watchlist import watchlist, ADAPTIVE_POLLING
+from model_router import ModelRouter, configured_models
+from prompts import report_prompt, chat_prompt, email_prompt, deep_dive_prompt, audio_script_prompt
+from prompts import swot_batch_prompt, parse_swot_batch, SWOT_RESPONSE_SCHEMA
 
 # Initialize Clients
 # Initialize Clients
@@ -27,13 +36,36 @@ websearch_api_key = os.getenv("WEBSEARCH_API_KEY")
 exa_api_key = os.getenv("EXA_API_KEY")
 you_api_key = os.getenv("YOU_API_KEY")
 
-tavily = TavilyClient(api_key=tavily_api_key) if tavily_api_key else None
+# Seconds to wait on a single provider HTTP call before treating it as failed
+PROVIDER_TIMEOUT = float(os.getenv("SCOUT_PROVIDER_TIMEOUT", "30"))
+
+# Provider endpoints can be overridden (proxies, or the local stand-ins used by loadtest.py)
+TAVILY_API_URL = os.getenv("TAVILY_API_URL")  # None -> client default
+PERPLEXITY_API_URL = os.getenv("PERPLEXITY_API_URL", "https://api.perplexity.ai")
+WEBSEARCH_API_URL = os.getenv("WEBSEARCH_API_URL", "https://api.websearchapi.ai")
+EXA_API_URL = os.getenv("EXA_API_URL", "https://api.exa.ai")
+YOU_API_URL = os.getenv("YOU_API_URL", "https://api.ydc-index.io")
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")  # e.g. http://127.0.0.1:8801 (REST transport)
+# Optional HTTP text-to-speech service: POST {"text", "lang"} -> audio/mpeg. Defaults to gTTS.
+TTS_API_URL = os.getenv("SCOUT_TTS_URL")
+
+# Battlecards: competitors per structured-output SWOT request, and how often cards that
+# come back missing or malformed are re-requested
+SWOT_BATCH_SIZE = int(os.getenv("SCOUT_SWOT_BATCH_SIZE", "4"))
+SWOT_RETRIES = int(os.getenv("SCOUT_SWOT_RETRIES", "1"))
+SWOT_GENERATION_CONFIG = genai.GenerationConfig(response_mime_type="application/json", response_schema=SWOT_RESPONSE_SCHEMA)
+
+tavily = TavilyClient(api_key=tavily_api_key, api_base_url=TAVILY_API_URL) if tavily_api_key else None
 
 if gemini_api_key:
-    genai.configure(api_key=gemini_api_key)
-    model = genai.GenerativeModel('gemini-2.5-flash')
+    if GEMINI_API_ENDPOINT:
+        genai.configure(api_key=gemini_api_key, transport="rest", client_options={"api_endpoint": GEMINI_API_ENDPOINT})
+    else:
+        genai.configure(api_key=gemini_api_key)
+    # Each task picks its model per call (see model_router.py)
+    router = ModelRouter(configured_models())
 else:
-    model = None
+    router = None
 
 def search_perplexity(query: str, days_back: int = 7, model: str = "sonar-pro"):
     """
@@ -42,7 +74,7 @@ def search_perplexity(query: str, days_back: int = 7, model: str = "sonar-pro"):
     if not perplexity_api_key:
         return "Error: PERPLEXITY_API_KEY not found."
 
-    url = "https://api.perplexity.ai/chat/completions"
+    url = f"{PERPLEXITY_API_URL}/chat/completions"
     
     # Construct a prompt that asks for recent news
     time_desc = "last 24 hours" if days_back == 1 else f"last {days_back} days"
@@ -67,9 +99,9 @@ def search_perplexity(query: str, days_back: int = 7, model: str = "sonar-pro"):
     }
     
     try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+        with requests.post(url, json=payload, headers=headers, timeout=PROVIDER_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            data = read_json(response)
         return data['choices'][0]['message']['content']
     except Exception as e:
         return f"Error querying Perplexity: {e}"
@@ -81,7 +113,7 @@ def search_websearch_api(query: str, days_back: int = 7, max_results: int = 5):
     if not websearch_api_key:
         return "Error: WEBSEARCH_API_KEY not found."
 
-    url = "https://api.websearchapi.ai/ai-search"
+    url = f"{WEBSEARCH_API_URL}/ai-search"
     
     headers = {
         "Authorization": f"Bearer {websearch_api_key}",
@@ -99,17 +131,11 @@ def search_websearch_api(query: str, days_back: int = 7, max_results: int = 5):
     }
     
     try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        
-        # Debug logging to understand response structure
-        print(f"DEBUG WebSearchAPI Raw Response: {str(data)[:500]}...")
-        
-        # Format results
+        # Format results as they are parsed; only title, url and description are kept
         formatted_results = ""
-        if 'results' in data:
-            for item in data['results']:
+        with requests.post(url, json=payload, headers=headers, timeout=PROVIDER_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            for item in iter_results(response, 'results', ('title', 'url', 'description'), max_items=max_results):
                 title = item.get('title', 'No Title')
                 link = item.get('url', '#')
                 snippet = item.get('description', '')
@@ -127,7 +153,7 @@ def search_exa(query: str, days_back: int = 7, max_results: int = 5):
     if not exa_api_key:
         return "Error: EXA_API_KEY not found."
 
-    url = "https://api.exa.ai/search"
+    url = f"{EXA_API_URL}/search"
     
     headers = {
         "x-api-key": exa_api_key,
@@ -143,21 +169,20 @@ def search_exa(query: str, days_back: int = 7, max_results: int = 5):
         "numResults": max_results,
         "useAutoprompt": True,
         "startPublishedDate": start_date,
-        "contents": {"text": True} 
+        # Only the snippet is used, so don't download full article text
+        "contents": {"text": {"maxCharacters": SNIPPET_CHARS}}
     }
     
     try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-
         formatted_results = ""
-        if 'results' in data:
-            for item in data['results']:
+        with requests.post(url, json=payload, headers=headers, timeout=PROVIDER_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            # Text is capped at SNIPPET_CHARS while parsing, even if the API ignores maxCharacters
+            for item in iter_results(response, 'results', ('title', 'url', 'publishedDate', 'text'), max_items=max_results):
                 title = item.get('title', 'No Title')
                 link = item.get('url', '#')
                 date = item.get('publishedDate', 'Unknown Date')
-                text = item.get('text', '')[:300] # Truncate text for snippet
+                text = item.get('text', '')
                 formatted_results += f"- **{title}** ({link}) [Date: {date}]: {text}...\n"
 
         return formatted_results if formatted_results else "No results found."
@@ -172,7 +197,7 @@ def search_you(query: str, days_back: int = 7, max_results: int = 5):
     if not you_api_key:
         return "Error: YOU_API_KEY not found."
 
-    url = "https://api.ydc-index.io/search"
+    url = f"{YOU_API_URL}/search"
     
     headers = {
         "X-API-Key": you_api_key
@@ -192,20 +217,14 @@ def search_you(query: str, days_back: int = 7, max_results: int = 5):
     }
     
     try:
-        response = requests.get(url, params=params, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        
-        # Debug logging to understand response structure
-        print(f"DEBUG You.com Raw Response: {str(data)[:500]}...")
-        
         formatted_results = ""
         # You.com response structure: {'hits': [{'title': ..., 'url': ..., 'snippets': [...]}]}
-        if 'hits' in data:
-            for item in data['hits']:
+        with requests.get(url, params=params, headers=headers, timeout=PROVIDER_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            for item in iter_results(response, 'hits', ('title', 'url', 'snippets'), max_items=max_results):
                 title = item.get('title', 'No Title')
                 link = item.get('url', '#')
-                snippet = " ".join(item.get('snippets', []))[:300]
+                snippet = " ".join(item.get('snippets', []))[:SNIPPET_CHARS]
                 formatted_results += f"- **{title}** ({link}): {snippet}\n"
         
         return formatted_results if formatted_results else "No results found."
@@ -221,21 +240,42 @@ MOCK_DATA = """
 - **Slack:** Slack launched a new design for better organization and focus. (https://slack.com/blog)
 """
 
-def perform_search(query: str, topic: str, days: int, max_results: int, provider: str = "tavily", use_mock_data: bool = False, search_mode: str = "deep"):
+SEARCH_PROVIDERS = ["tavily", "perplexity", "websearch", "exa", "you"]
+
+# Providers tried, in order, when the requested one fails or its circuit is open.
+# Opt-in (e.g. SCOUT_FALLBACK_PROVIDERS="tavily,exa,perplexity"): by default a scan only uses
+# the provider it asked for. Whichever provider served a result is recorded in the spool.
+FALLBACK_PROVIDERS = [p.strip() for p in os.getenv("SCOUT_FALLBACK_PROVIDERS", "").split(",") if p.strip()]
+
+def provider_configured(provider: str):
+    return {
+        "tavily": tavily is not None,
+        "perplexity": bool(perplexity_api_key),
+        "websearch": bool(websearch_api_key),
+        "exa": bool(exa_api_key),
+        "you": bool(you_api_key),
+    }.get(provider, False)
+
+def provider_chain(provider: str, allow_fallback: bool = True):
     """
-    Wrapper to switch between Tavily, Perplexity, WebSearchAPI, Exa, and You.com.
-    Also handles Mock Data and Search Mode (Fast vs Deep).
+    The requested provider first, then any configured fallbacks.
     """
-    if use_mock_data:
-        print("DEBUG: Using MOCK DATA")
-        return MOCK_DATA
+    chain = [provider]
+    if not allow_fallback:
+        return chain
+    for fallback in FALLBACK_PROVIDERS:
+        if fallback not in chain and provider_configured(fallback):
+            chain.append(fallback)
+    return chain
 
-    # Adjust parameters based on search_mode
-    if search_mode == "fast":
-        max_results = 3 # Reduce results for speed/cost
-        # For Tavily, we can use 'basic' depth if supported, but here we just limit results.
-        # Perplexity 'sonar-small-online' is faster/cheaper than 'sonar-pro'.
-    
+def is_error_result(results):
+    # Provider helpers report failures as "Error ..." strings rather than raising
+    return isinstance(results, str) and results.startswith("Error")
+
+def search_provider(provider: str, query: str, topic: str, days: int, max_results: int, search_mode: str = "deep"):
+    """
+    Dispatches a single search to one provider, without fallback.
+    """
     if provider == "perplexity":
         # Adjust model based on mode
         model = "sonar-small-online" if search_mode == "fast" else "sonar-pro"
@@ -253,13 +293,69 @@ def perform_search(query: str, topic: str, days: int, max_results: int, provider
         
         # Tavily supports 'search_depth'
         depth = "basic" if search_mode == "fast" else "advanced"
-        return tavily.search(query=query, topic=topic, days=days, max_results=max_results, search_depth=depth)
+        # Spool (and later prompt) only the compact result records, not the raw response
+        return compact_tavily(tavily.search(
+            query=query, topic=topic, days=days, max_results=max_results, search_depth=depth,
+            include_raw_content=False, include_images=False,
+        ))
+
+def perform_search(query: str, topic: str, days: int, max_results: int, provider: str = "tavily", use_mock_data: bool = False, search_mode: str = "deep"):
+    """
+    Wrapper to switch between Tavily, Perplexity, WebSearchAPI, Exa, and You.com.
+    Also handles Mock Data and Search Mode (Fast vs Deep).
+    """
+    return search_with_fallback(query, topic, days, max_results, provider, use_mock_data, search_mode)[1]
+
+def search_with_fallback(query: str, topic: str, days: int, max_results: int, provider: str = "tavily", use_mock_data: bool = False, search_mode: str = "deep", allow_fallback: bool = True):
+    """
+    Runs a search and returns (serving provider, results).
+    Each provider sits behind a circuit breaker; while one is unhealthy its calls
+    fail fast and the next provider in the fallback order (if any) is used instead.
+    A provider without an API key is a configuration error: it is reported as is,
+    without retrying elsewhere or counting against the provider's breaker.
+    """
+    if use_mock_data:
+        print("DEBUG: Using MOCK DATA")
+        return "mock", MOCK_DATA
+
+    config_error = check_search_provider(provider)
+    if config_error:
+        return provider, config_error
+
+    # Adjust parameters based on search_mode
+    if search_mode == "fast":
+        max_results = 3 # Reduce results for speed/cost
+        # For Tavily, we can use 'basic' depth if supported, but here we just limit results.
+        # Perplexity 'sonar-small-online' is faster/cheaper than 'sonar-pro'.
+
+    last_error = None
+    for name in provider_chain(provider, allow_fallback):
+        breaker = get_breaker(name)
+        if not breaker.allow():
+            last_error = f"Error: {name} circuit open, provider temporarily unavailable."
+            continue
+
+        started = time.monotonic()
+        try:
+            results = search_provider(name, query, topic, days, max_results, search_mode)
+        except Exception as e:
+            results = f"Error querying {name}: {e}"
+        breaker.record(not is_error_result(results), time.monotonic() - started)
+
+        if not is_error_result(results):
+            if name != provider:
+                print(f"DEBUG: {provider} unavailable, used fallback provider {name}")
+            return name, results
+        last_error = results
+
+    return provider, last_error
 
 # --- Discovery Engine (Simulated) ---
 def discover_targets():
     """
     Simulates the discovery of new partners and competitors.
     In a real production agent, this would crawl thetalake.com/partners.
+    The lists below seed the watchlist store; enabled watchlist targets are returned.
     """
     # Seed List (Hardcoded for reliability as per plan)
     partners = [
@@ -290,7 +386,38 @@ def discover_targets():
         "LeapXpert"
     ]
     
-    return partners, competitors
+    watchlist.seed(partners, competitors)
+    return watchlist.names("partner"), watchlist.names("competitor")
+
+def poll_targets(spool: RunSpool):
+    """
+    Watchlist targets to search in this run, or None for all of them.
+    A resumed run reuses the selection recorded in its manifest.
+    """
+    manifest = spool.load_manifest()
+    if manifest and "targets" in manifest:
+        return manifest["targets"]
+    if ADAPTIVE_POLLING:
+        return watchlist.select()
+    return None
+
+def record_target_polls(plan, spool: RunSpool, executed_keys):
+    """
+    Feeds the outcome of each target search run by this invocation back into the
+    watchlist polling stats. Results replayed from the spool (a resumed or re-run
+    scan) were already counted when they ran.
+    """
+    executed_keys = set(executed_keys)
+    target_keys = {entry["key"]: entry["target"] for entry in plan if entry.get("target") and entry["key"] in executed_keys}
+    polls = {}
+    for record in spool.read_records(list(target_keys)):
+        if record["status"] == "error":
+            polls[target_keys[record["key"]]] = None
+        elif record["status"] == "empty":
+            polls[target_keys[record["key"]]] = {"results": []}
+        else:
+            polls[target_keys[record["key"]]] = record["result"]
+    watchlist.record_polls(polls)
 
 def add_header_footer(canvas, doc):
     """
@@ -557,241 +684,248 @@ def generate_pdf(markdown_content, filename="dcga_report.pdf", sections=None, ti
     doc.build(story, onFirstPage=add_header_footer, onLaterPages=add_header_footer)
     return filename
 
-def run_agent(time_range: str, search_provider: str = "tavily", use_mock_data: bool = False, search_mode: str = "deep"):
-    if search_provider == "tavily" and not tavily:
-        return "Error: TAVILY_API_KEY not found in .env"
-    if search_provider == "perplexity" and not perplexity_api_key:
-        return "Error: PERPLEXITY_API_KEY not found in .env"
-    if search_provider == "websearch" and not websearch_api_key:
-        return "Error: WEBSEARCH_API_KEY not found in .env"
-    if search_provider == "exa" and not exa_api_key:
-        return "Error: EXA_API_KEY not found in .env"
-    if search_provider == "you" and not you_api_key:
-        return "Error: YOU_API_KEY not found in .env"
+TIME_RANGE_DAYS = {
+    "24h": 1,
+    "7d": 7,
+    "14d": 14,
+    "30d": 30,
+}
 
-    # 1. Discovery Phase
-    partners, competitors = discover_targets()
-    
-    # Map time_range
-    tavily_time = "week"
-    days_back = 7
-    
-    if time_range == "24h":
-        tavily_time = "day"
-        days_back = 1
-    elif time_range == "7d":
-        tavily_time = "week"
-        days_back = 7
-    elif time_range == "14d":
-        tavily_time = "month"
-        days_back = 14
-    elif time_range == "30d":
-        tavily_time = "month"
-        days_back = 30
+def plan_queries(partners, competitors, days_back: int, use_mock_data: bool = False, search_mode: str = "deep", targets=None):
+    """
+    Builds the ordered list of searches for one scan.
+    Every entry has a stable 'key' so a spooled run can skip what already finished.
+    Entries marked 'windowed' follow the requested time range; the rest use a fixed 30 days.
+    If `targets` is given, only those partners/competitors get their own search.
+    """
+    plan = []
 
-    # 2. Data Gathering (Expanded Pillars)
-    raw_data = []
-    
     # Pillar A: Partner Ecosystem (Deep Dive)
     # Instead of one big query, we search for key partners individually to ensure depth
-    # key_partners = ["Zoom", "Microsoft Teams", "Cisco Webex", "Salesforce", "Slack"]
-    # Use the partners list from discover_targets()
     for partner in partners:
-        try:
-            query = f"{partner} API developer changelog new features compliance export"
-            results = perform_search(query=query, topic="news", days=days_back, max_results=5, provider=search_provider, use_mock_data=use_mock_data, search_mode=search_mode)
-            raw_data.append(f"--- {partner} Updates ---\n{results}")
-        except Exception as e:
-            print(f"Error searching {partner}: {e}")
+        if targets is not None and partner not in targets:
+            continue
+        plan.append({
+            "key": f"partner:{partner}",
+            "target": partner,
+            "label": f"{partner} Updates",
+            "query": f"{partner} API developer changelog new features compliance export",
+            "topic": "news",
+            "days": days_back,
+            "windowed": True,
+            "max_results": 5,
+            "use_mock_data": use_mock_data,
+            "search_mode": search_mode,
+        })
 
     # Pillar B: Competitive Landscape (Broad Sweep)
     # Search for competitors individually to ensure no news is buried
     for comp in competitors:
-        try:
-            # 1. General News Search
+        if targets is not None and comp not in targets:
+            continue
+        plan.append({
+            "key": f"competitor:{comp}",
+            "target": comp,
+            "label": f"{comp} Activity",
             # We add specific terms like "ISO", "Certification", "AI" to catch the Behavox news
             # [UPDATED] Broadened to include announcements and partnerships, EXCLUDING fines/enforcement
-            comp_query = f"{comp} product launch new feature partnership announcement AI governance -fine -penalty -settlement"
-            
+            "query": f"{comp} product launch new feature partnership announcement AI governance -fine -penalty -settlement",
             # Use topic="general" for broader coverage (BusinessWire often appears in general search)
-            # Increase max_results to ensure we catch it
-            comp_results = perform_search(query=comp_query, topic="general", days=days_back, max_results=3, provider=search_provider)
-            
-            if comp_results: # Check if results exist (Perplexity returns string, Tavily returns dict)
-                # For Tavily, check 'results' list. For Perplexity, string is truthy.
-                if isinstance(comp_results, dict) and 'results' in comp_results and len(comp_results['results']) == 0:
-                    pass # Empty Tavily results
-                else:
-                    raw_data.append(f"--- {comp} Activity ---\n{comp_results}")
-                
-        except Exception as e:
-            print(f"Error fetching Competitor {comp}: {e}")
+            "topic": "general",
+            "days": days_back,
+            "windowed": True,
+            "max_results": 3,
+            "skip_empty": True,
+        })
 
     # Pillar C1: Regulatory Enforcement (Existing - Focused on Fines & AI)
-    try:
-        # Added "AI" and "Generative" to catch new tech regulations
-        # [UPDATED] Focus on Financial Institutions (Banks, Broker-Dealers) not Vendors
-        reg_query = "SEC FINRA FCA CFTC fine penalty settlement broker-dealer investment adviser recordkeeping off-channel communications AI regulation"
-        # Fetch 15 items for enforcement
-        reg_results = perform_search(query=reg_query, topic="news", days=days_back, max_results=15, provider=search_provider)
-        raw_data.append(f"--- Regulatory Enforcement ---\n{reg_results}")
-    except Exception as e:
-        raw_data.append(f"Error fetching Regulatory Enforcement: {e}")
+    # [UPDATED] Focus on Financial Institutions (Banks, Broker-Dealers) not Vendors
+    plan.append({
+        "key": "regulatory:enforcement",
+        "label": "Regulatory Enforcement",
+        "query": "SEC FINRA FCA CFTC fine penalty settlement broker-dealer investment adviser recordkeeping off-channel communications AI regulation",
+        "topic": "news",
+        "days": days_back,
+        "windowed": True,
+        "max_results": 15,
+        "error_label": "Regulatory Enforcement",
+    })
 
     # [NEW] Pillar C2: Regulatory Strategy & Priorities (The "Missing Link")
-    try:
-        # Hyper-targeted query for the specific missing item + general strategy
-        strat_query = "SEC Division of Examinations 2026 Priorities press release AI regulation guidance"
-        # Use topic="general" to hit sec.gov, finra.org directly
-        strat_results = perform_search(query=strat_query, topic="general", days=30, max_results=10, provider=search_provider)
-        raw_data.append(f"--- Regulatory Strategic Announcements ---\n{strat_results}")
-    except Exception as e:
-        raw_data.append(f"Error fetching Regulatory Strategy: {e}")
+    # Use topic="general" to hit sec.gov, finra.org directly
+    plan.append({
+        "key": "regulatory:strategy",
+        "label": "Regulatory Strategic Announcements",
+        "query": "SEC Division of Examinations 2026 Priorities press release AI regulation guidance",
+        "topic": "general",
+        "days": 30,
+        "max_results": 10,
+        "error_label": "Regulatory Strategy",
+    })
 
     # [NEW] Pillar D: Social & Professional Signals (LinkedIn)
-    try:
-        # Search for "Pulse" articles and posts to get professional "grounding"
-        social_query = f"site:linkedin.com/pulse OR site:linkedin.com/posts ({' OR '.join(competitors[:3])} OR Theta Lake) compliance AI"
-        # Use topic="general" because LinkedIn content isn't always indexed as "news"
-        social_results = perform_search(query=social_query, topic="general", days=30, max_results=10, provider=search_provider)
-        raw_data.append(f"--- LinkedIn/Social Discussions ---\n{social_results}")
-    except Exception as e:
-        raw_data.append(f"Error fetching Social signals: {e}")
+    # Use topic="general" because LinkedIn content isn't always indexed as "news"
+    plan.append({
+        "key": "social:linkedin",
+        "label": "LinkedIn/Social Discussions",
+        "query": f"site:linkedin.com/pulse OR site:linkedin.com/posts ({' OR '.join(competitors[:3])} OR Theta Lake) compliance AI",
+        "topic": "general",
+        "days": 30,
+        "max_results": 10,
+        "error_label": "Social signals",
+    })
 
     # [NEW] Pillar E: Industry Analysis & Blogs
+    # Broad search for analysis, opinions, and blogs (excluding LinkedIn to avoid dupes)
+    plan.append({
+        "key": "industry:blogs",
+        "label": "Industry Analysis & Blogs",
+        "query": f"{' OR '.join(competitors[:3])} compliance AI analysis opinion -site:linkedin.com",
+        "topic": "general",
+        "days": 30,
+        "max_results": 10,
+        "error_label": "Blogs",
+    })
+
+    return plan
+
+def execute_entry(entry, spool: RunSpool, search_provider: str = "tavily", allow_fallback: bool = True):
+    """
+    Runs one planned search and appends its result, and the provider that served it, to the spool.
+    """
+    served_by = search_provider
     try:
-        # Broad search for analysis, opinions, and blogs (excluding LinkedIn to avoid dupes)
-        blog_query = f"{' OR '.join(competitors[:3])} compliance AI analysis opinion -site:linkedin.com"
-        blog_results = perform_search(query=blog_query, topic="general", days=30, max_results=10, provider=search_provider)
-        raw_data.append(f"--- Industry Analysis & Blogs ---\n{blog_results}")
+        served_by, results = search_with_fallback(
+            query=entry["query"],
+            topic=entry["topic"],
+            days=entry["days"],
+            max_results=entry["max_results"],
+            provider=search_provider,
+            use_mock_data=entry.get("use_mock_data", False),
+            search_mode=entry.get("search_mode", "deep"),
+            allow_fallback=allow_fallback,
+        )
     except Exception as e:
-        raw_data.append(f"Error fetching Blogs: {e}")
+        results = f"Error: {e}"
 
-    # 3. Intelligence Processing (Theta Lake Perspective)
-    if model:
-        prompt = f"""
-        You are the Chief Strategy Officer for Theta Lake.
-        We believe in enabling collaboration, not blocking it.
-        We believe 'Unified Capture' is superior to legacy email archiving.
-        We believe AI requires 'Human in the loop' supervision.
-        
-        Analyze the following raw data and generate a "DCGA Scout 4.0 Strategic Report".
-        
-        **CRITICAL INSTRUCTION: CURATION & SCORING**
-        1. You have been provided with a large set of raw news items (approx 10-20 per section), PLUS new "Grounding Sources" (LinkedIn, Blogs).
-        2. You must **analyze and score** each item based on its strategic relevance to Theta Lake.
-        3. **SELECT ONLY THE TOP 5** highest-scoring items for each section.
-        4. **PRIORITIZE DIVERSITY:** Try to include at least one insight from a non-traditional source (LinkedIn, Blog, Analyst Report) if it is high quality.
-        5. **NO DUPLICATES:** Do not list the same news item in multiple sections. Choose the *single best* section for it.
-        6. **COMPETITOR ALERT:** Treat "Microsoft Purview" as a COMPETITOR, not a partner, for the purpose of this report.
-        7. **SELF-EXCLUSION:** Do NOT include "Theta Lake" press releases or news in the "Competitive Intelligence" section. Place them in "Cooperative & Partner Updates" if relevant, or omit if minor.
-        
-        **STRICT INCLUSION CRITERIA (MUST MATCH ONE):**
-        - **Compliance & Governance:** News about recordkeeping, archiving, eDiscovery, or supervision.
-        - **AI Safety & Regulation:** News about AI bias, hallucinations, "human in the loop", or AI governance rules.
-        - **New Communication Modalities:** News about *new* features in Zoom/Teams/Webex that create *new* compliance risks (e.g., Whiteboards, Huddles, AI Summaries).
-        - **Major Corporate Moves:** Significant M&A, Funding (> $50M), or C-level executive changes at Competitors/Partners.
-
-        **STRICT NEGATIVE CONSTRAINTS (DO NOT INCLUDE):**
-        - **Generic Security News:** Exclude general vulnerabilities (CVEs), patches, ransomware, or "zero-day" exploits UNLESS they specifically mention "compliance failure" or "recordkeeping".
-        - **Stock Market Noise:** Exclude daily stock price fluctuations or quarterly earnings reports (unless they mention specific product strategy shifts).
-        - **Marketing Fluff:** Exclude generic "we are excited to announce" awards or minor partnership fluff without substance.
-        - **Irrelevant Features:** Exclude minor UI updates (e.g., "Dark Mode", "New Emojis") unless they impact data capture.
-
-        **REGULATORY PRIORITIZATION:**
-           - **HIGH PRIORITY:** Communication Compliance (recordkeeping, off-channel comms), AI Governance/Regulation, and Digital Communications Governance (DCGA).
-           - **EXAMPLES:** "SEC Division of Examinations 2026 Priorities" (if relevant), new AI rules, or major fines.
-        
-        **MUTUALLY EXCLUSIVE CATEGORIZATION (CRITICAL):**
-           - **Regulatory Radar:** STRICTLY for news driven by **Agencies** (SEC, FINRA, FCA, etc.) targeting **Financial Institutions** (Banks, Broker-Dealers). This includes fines, penalties, settlements, and new rules.
-           - **Competitive Intelligence:** STRICTLY for news driven by **Vendors** (Competitors). This includes product launches, features, partnerships, and funding.
-           - **OVERLAP RULE:** If a Competitor is fined, place this **ONLY in Regulatory Radar**.
-           - **NO DUPLICATES:** A story must appear in ONE section only.
-           - **NOTE:** It is rare for a Vendor to be fined. Focus Regulatory Radar on the *customers* (Banks) getting fined.
-        
-        **COMPETITOR WEIGHTING:**
-           - **CRITICAL:** Prioritize **ANY significant news** from direct competitors (e.g., Product Launches, Major Partnerships, Certifications, Funding, Acquisitions).
-           - **Certifications** (ISO, SOC2, FedRAMP) and **AI Governance** features are particularly high-threat and MUST be included.
-           - Ensure the "Behavox ISO/IEC 42001 Certification" is included if present in the raw data.
-        
-        Time Period: {time_range}
-        
-        Raw Data:
-        {str(raw_data)[:40000]}
-        
-        **LOGIC FOR MICROSOFT:**
-        - **Microsoft Purview** is a direct competitor. Updates to Purview are generally a **[Threat]** or **[Risk]**.
-        - **Microsoft AI / Copilot / Teams** features are **[Opportunity]**. New modalities create a need for Theta Lake's specialized governance.
-
-        **FORMATTING RULES:**
-        - Use Markdown.
-        - Start with a "TL;DR: The Weekly Pulse" (Executive Summary).
-        - Group by: "Cooperative & Partner Updates", "Competitive Landscape", "Regulatory Radar".
-        - **MANDATORY:** END EVERY BULLET POINT WITH THE DATE/TIME: ... `[Nov 25, 2025 10:00 AM EST]`
-        - **MANDATORY:** EVERY NEWS ITEM (OR GROUP) MUST HAVE A "THETA LAKE TAKE". NO EXCEPTIONS.
-        - **INTELLIGENT GROUPING:** You MAY group similar items together (e.g., multiple new features for Microsoft Teams).
-        - **CRITICAL FORMATTING RULE FOR GROUPS:** If you group items, you MUST combine them into a SINGLE bullet point paragraph. Do NOT list them on separate lines.
-        - Example of BAD grouping (Do NOT do this):
-          * News A
-          * News B
-          > Take
-        - Example of GOOD grouping (DO THIS):
-          * **News:** Microsoft Teams introduced Feature A AND Feature B. ([Source](url))
-          > **Theta Lake Take:** ...
-        - If grouped, provide a SINGLE "Theta Lake Take" that covers the entire group.
-        - **NO SUMMARY LISTS:** Do NOT provide a list of news items at the start of a section. Combine the news and the analysis into a single block for each item immediately.
-        - For each item (or group), provide the news/update first.
-        - Then, IMMEDIATELY follow with a "Theta Lake Take" blockquote: `> **Theta Lake Take:** [Badge] Analysis...`
-        - Badges must be one of: [Sales Validation], [Opportunity], [Risk], [Threat], [Validation].
-        - Cite sources with links: `([Source Name](url))`.
-        
-        **ONE-SHOT EXAMPLE (SINGLE ITEM):**
-        
-        ## Cooperative & Partner Updates
-        * **News:** Zoom launched "AI Companion 2.0" with new federation capabilities for external meetings. ([Zoom Blog](https://blog.zoom.us)) [Nov 28, 2025 09:00 AM EST]
-        > **💡 Theta Lake Take:** **[Opportunity]** This expansion of AI into external federation creates a massive compliance gap. Legacy archivers cannot see into these ephemeral, cross-tenant AI interactions. This is a prime upsell trigger for our "Unified Capture" to ensure full visibility.
-        
-        **ONE-SHOT EXAMPLE (GROUPED ITEMS):**
+    if is_error_result(results):
+        print(f"Error searching {entry['label']}: {results}")
+        message = f"Error fetching {entry['error_label']}: {results}" if entry.get("error_label") else results
+        spool.append(entry["key"], entry["label"], "error", message, provider=served_by)
+        return
 
-        * **News:** Microsoft Teams introduced "Mesh" for immersive 3D meetings ([The Verge](https://theverge.com)) AND announced new "Copilot" integration for Whiteboard ([Microsoft News](https://news.microsoft.com)). [Nov 27, 2025 02:00 PM EST]
-        > **💡 Theta Lake Take:** **[Risk]** Both 3D avatars and AI-generated whiteboard content present a nightmare for traditional supervision. Whether a trader nods "yes" in a 3D space or Copilot summarizes a brainstorm, legacy tools miss this context. Theta Lake's ability to capture and replay the full visual context is the ONLY viable solution here.
+    status = "ok"
+    if entry.get("skip_empty"):
+        # Perplexity returns string, Tavily returns dict. For Tavily, check 'results' list.
+        if not results or (isinstance(results, dict) and 'results' in results and len(results['results']) == 0):
+            status = "empty"
+    spool.append(entry["key"], entry["label"], status, results, provider=served_by)
 
-        Format the output EXACTLY as follows (Markdown):
-        
-        # 🚨 TL;DR: The Weekly Pulse
-        (A narrative summary of the top 3-5 most critical events. Be punchy and executive.)
-        
-        ## Cooperative & Partner Updates
-        (Select TOP 5 most impactful updates:)
-        * **News:** [Summary] ([Source](URL))
-        > **💡 Theta Lake Take:** **[Opportunity/Risk/Threat]** [Strategic Perspective]
-        
-        ## Competitive Intelligence
-        (Select TOP 5-10 most threatening or notable competitor moves. **DO NOT INCLUDE THETA LAKE NEWS HERE.**)
-        * **News:** [Summary] ([Source](URL))
-        > **💡 Theta Lake Take:** **[Threat/Validation]** [Strategic Perspective]
-        
-        ## Regulatory Radar
-        (Select TOP 5 most relevant fines or rule changes:)
-        * **Event:** [Description] ([Source](URL))
-        > **💡 Theta Lake Take:** **[Sales Validation]** [Sales enablement angle]
-        
-        Keep it professional, insightful, and perfectly formatted. Ensure every news item has a source link. Use the blockquote (>) for the Theta Lake Take to indent it.
-        """
+def execute_plan(plan, spool: RunSpool, search_provider: str = "tavily"):
+    """
+    Runs every planned search that the spool hasn't already finished,
+    appending each result to disk as it arrives. Returns the keys it ran.
+    """
+    done = spool.completed_keys()
+    executed = []
+    for entry in plan:
+        if entry["key"] not in done:
+            execute_entry(entry, spool, search_provider)
+            executed.append(entry["key"])
+    return executed
+
+def check_search_provider(search_provider: str):
+    """
+    Returns an error message if the provider's API key is missing, else None.
+    """
+    if search_provider == "tavily" and not tavily:
+        return "Error: TAVILY_API_KEY not found in .env"
+    if search_provider == "perplexity" and not perplexity_api_key:
+        return "Error: PERPLEXITY_API_KEY not found in .env"
+    if search_provider == "websearch" and not websearch_api_key:
+        return "Error: WEBSEARCH_API_KEY not found in .env"
+    if search_provider == "exa" and not exa_api_key:
+        return "Error: EXA_API_KEY not found in .env"
+    if search_provider == "you" and not you_api_key:
+        return "Error: YOU_API_KEY not found in .env"
+    return None
+
+def synthesize_report(time_range: str, read_raw_text):
+    """
+    Turns gathered search results into the markdown report.
+    `read_raw_text(limit)` returns the raw data text, capped at `limit` characters (None = everything).
+    """
+    # 3. Intelligence Processing (Theta Lake Perspective)
+    if router:
+        prompt = report_prompt(time_range, read_raw_text(40000))
         
         try:
-            report_markdown = model.generate_content(prompt).text
+            return router.generate("report", prompt).text
         except Exception as e:
-            report_markdown = f"Error generating report with Gemini: {e}\n\nFallback Raw Data:\n{str(raw_data)}"
-    else:
-        report_markdown = "Error: GEMINI_API_KEY not found. Returning raw data...\n" + str(raw_data)
+            return f"Error generating report with Gemini: {e}\n\nFallback Raw Data:\n{read_raw_text(None)}"
+    return "Error: GEMINI_API_KEY not found. Returning raw data...\n" + read_raw_text(None)
+
+def store_report(report_markdown: str, report_id: str, time_range: str, search_provider: str, search_mode: str):
+    """
+    Parses and stores the structured report. Returns its id, or None for error reports.
+    """
+    if report_markdown.startswith("Error"):
+        return None
+    report = parse_report(report_markdown, report_id, {
+        "time_range": time_range,
+        "search_provider": search_provider,
+        "search_mode": search_mode,
+    })
+    return save_report(report)
 
-    # 4. PDF Generation
-    pdf_filename = "dcga_report_v2.pdf"
+def archive_run(spool: RunSpool, plan, report_ids, entities):
+    """
+    Copies the run's reports and search results into the searchable archive.
+    """
+    entity_by_key = {entry["key"]: entry["target"] for entry in plan if entry.get("target")}
+    records = spool.read_records([entry["key"] for entry in plan])
+    archive.add_run(spool.run_id, report_ids, records, entity_by_key, entities)
+
+def run_agent(time_range: str, search_provider: str = "tavily", use_mock_data: bool = False, search_mode: str = "deep", run_id: str = None):
+    provider_error = check_search_provider(search_provider)
+    if provider_error:
+        return provider_error
+
+    # 1. Discovery Phase
+    partners, competitors = discover_targets()
+    
+    # Map time_range
+    days_back = TIME_RANGE_DAYS.get(time_range, 7)
+
+    # 2. Data Gathering (Expanded Pillars)
+    # Results are spooled to disk as they arrive so a crashed run can resume with the same run id.
+    # With adaptive polling, only the watchlist targets that are due get searched.
     try:
-        generate_pdf(report_markdown, pdf_filename)
-    except Exception as e:
-        print(f"PDF Generation failed: {e}")
+        spool = RunSpool(run_id or new_run_id())
+        targets = poll_targets(spool)
+        plan = plan_queries(partners, competitors, days_back, use_mock_data=use_mock_data, search_mode=search_mode, targets=targets)
+        spool.start({
+            "time_range": time_range,
+            "search_provider": search_provider,
+            "use_mock_data": use_mock_data,
+            "search_mode": search_mode,
+        }, planned=len(plan), targets=targets)
+    except ValueError as e:
+        return f"Error: {e}"
+
+    executed_keys = execute_plan(plan, spool, search_provider)
+    if not use_mock_data:
+        record_target_polls(plan, spool, executed_keys)
+    plan_keys = [entry["key"] for entry in plan]
+
+    # 3. Intelligence Processing (Theta Lake Perspective)
+    report_markdown = synthesize_report(time_range, lambda limit: spool.read_text(plan_keys, limit=limit))
+
+    # 4. Structured report (sections/items), stored under the run id; its PDF is built per report id by the caller
+    report_id = store_report(report_markdown, spool.run_id, time_range, search_provider, search_mode)
+    spool.finish("complete", report_id=report_id)
+    if not use_mock_data:
+        archive_run(spool, plan, [report_id], partners + competitors)
 
     return report_markdown
 
@@ -802,22 +936,12 @@ def chat_with_report(report_context: str, user_message: str):
     Feature 1: Scout Chat (RAG)
     Uses Gemini to answer questions based on the report context.
     """
-    if not model:
+    if not router:
         return "Error: Gemini API key not configured."
     
-    prompt = f"""
-    You are an intelligent assistant for the DCGA Scout.
-    Your goal is to answer user questions based ONLY on the provided report context.
-    
-    Report Context:
-    {report_context}
-    
-    User Question: {user_message}
-    
-    Answer concisely and professionally.
-    """
+    prompt = chat_prompt(report_context, user_message)
     try:
-        response = model.generate_content(prompt).text
+        response = router.generate("chat", prompt).text
         return response
     except Exception as e:
         return f"Error generating chat response: {e}"
@@ -827,28 +951,12 @@ def generate_sales_email(insight_text: str, recipient_name: str):
     Feature 2: Sales Co-Pilot
     Generates a sales outreach email based on a specific insight.
     """
-    if not model:
+    if not router:
         return "Error: Gemini API key not configured."
         
-    prompt = f"""
-    You are a top-tier enterprise sales representative for Theta Lake.
-    Write a short, punchy, and professional outreach email to a prospect named {recipient_name}.
-    
-    The email should be based on this specific market insight:
-    "{insight_text}"
-    
-    Value Proposition to weave in:
-    - Theta Lake provides "Unified Capture" and "Proactive Compliance".
-    - We help firms enable modern collaboration (Zoom, Teams) without compliance risks.
-    
-    Structure:
-    1. Subject Line (Catchy but professional)
-    2. Hook (The insight)
-    3. The "So What?" (Why they should care)
-    4. Call to Action (Meeting request)
-    """
+    prompt = email_prompt(insight_text, recipient_name)
     try:
-        email = model.generate_content(prompt).text
+        email = router.generate("email", prompt).text
         return email
     except Exception as e:
         return f"Error generating email: {e}"
@@ -867,15 +975,9 @@ def deep_dive_search(topic: str, search_provider: str = "tavily"):
         results = perform_search(query=query, topic="general", days=30, max_results=5, provider=search_provider)
         
         # Summarize with Gemini
-        if model:
-            prompt = f"""
-            Summarize the following search results into a detailed "Deep Dive" briefing on the topic: "{topic}".
-            Focus on strategic implications for compliance and risk teams.
-            
-            Search Results:
-            {results}
-            """
-            summary = model.generate_content(prompt).text
+        if router:
+            prompt = deep_dive_prompt(topic, results)
+            summary = router.generate("deep_dive", prompt).text
             return summary
         else:
             return f"Search Results:\n{results}"
@@ -883,29 +985,30 @@ def deep_dive_search(topic: str, search_provider: str = "tavily"):
     except Exception as e:
         return f"Error performing deep dive: {e}"
 
-def generate_audio_summary(report_text: str):
+def synthesize_speech(text: str, filename: str, lang: str = "en"):
+    """
+    Writes spoken text to an MP3, via SCOUT_TTS_URL when set, otherwise gTTS.
+    """
+    if TTS_API_URL:
+        response = requests.post(TTS_API_URL, json={"text": text, "lang": lang}, timeout=PROVIDER_TIMEOUT)
+        response.raise_for_status()
+        with open(filename, "wb") as f:
+            f.write(response.content)
+        return filename
+    tts = gTTS(text=text, lang=lang, tld='com')
+    tts.save(filename)
+    return filename
+
+def generate_audio_summary(report_text: str, filename: str = "briefing.mp3"):
     """
     Feature 4: Audio Briefing
     Generates an MP3 summary of the report using gTTS.
     """
     try:
         # 1. Summarize the report first (Audio needs to be shorter than the full text)
-        if model:
-            prompt = f"""
-            Convert the following report into a 2-minute "Podcast Script" for an audio briefing.
-            
-            CRITICAL INSTRUCTIONS:
-            - Use PLAIN TEXT ONLY - no markdown, no asterisks, no special characters
-            - Write it exactly as a narrator would speak it
-            - Keep it conversational and engaging
-            - Focus on the top 3 most important takeaways
-            - Start with "Welcome to your DCGA Scout Daily Briefing."
-            - Do NOT use any formatting like *, **, #, >, or bullet points
-            
-            Report:
-            {report_text[:10000]}
-            """
-            script = model.generate_content(prompt).text
+        if router:
+            prompt = audio_script_prompt(report_text)
+            script = router.generate("audio_script", prompt).text
             
             # Safety: Strip any remaining markdown characters
             import re
@@ -923,66 +1026,76 @@ def generate_audio_summary(report_text: str):
             script = "Gemini not available. Reading first 500 characters of report. " + report_text[:500]
             
         # 2. Convert to Audio
-        tts = gTTS(text=script, lang='en', tld='com')
-        filename = "briefing.mp3"
-        tts.save(filename)
+        synthesize_speech(script, filename)
         return filename
     except Exception as e:
         print(f"Error generating audio: {e}")
         return "error.mp3"
 
-def generate_swot(competitors: list[str]):
+def swot_news(competitor: str):
+    """
+    Recent news for one competitor's battlecard, capped to keep the prompt small.
+    """
+    query = f"{competitor} problems lawsuits features growth strategy"
+    results = tavily.search(query=query, topic="news", days=30, max_results=5)
+    return "\n".join([r.get('content', '') for r in results.get('results', [])])[:2000]
+
+def request_swot_cards(news_by_competitor: dict):
+    """
+    One structured-output Gemini call for several competitors.
+    Returns {competitor: card, or None if it came back missing or malformed}.
+    """
+    prompt = swot_batch_prompt(news_by_competitor)
+    response = router.generate("swot", prompt, generation_config=SWOT_GENERATION_CONFIG).text
+    return parse_swot_batch(response, list(news_by_competitor))
+
+def generate_swot(competitors: list[str], batch_size: int = None):
     """
     Feature 5: Competitor Battlecards
     Generates a structured SWOT analysis for the given competitors.
+    Competitors are packed batch_size at a time into schema-constrained requests;
+    every card is validated on its own and only the failed ones are re-requested.
     """
-    if not model or not tavily:
+    if not router or not tavily:
         return {comp: {"error": "APIs not configured"} for comp in competitors}
-        
+
+    competitors = list(dict.fromkeys(competitors))
+    batch_size = max(batch_size or SWOT_BATCH_SIZE, 1)
     cards = {}
+    errors = {}
+    news = {}
     for comp in competitors:
         try:
             # Quick search for recent news to make it fresh
-            query = f"{comp} problems lawsuits features growth strategy"
-            results = tavily.search(query=query, topic="news", days=30, max_results=5)
-            
-            # Extract just the content from results
-            news_text = "\n".join([r.get('content', '') for r in results.get('results', [])])[:2000]
-            
-            prompt = f"""
-            Based on general knowledge and the following recent news, generate a structured SWOT analysis for {comp}.
-            
-            Recent News:
-            {news_text}
-            
-            CRITICAL: Return ONLY valid JSON in this exact format, with NO markdown formatting:
-            {{
-                "strengths": ["point 1", "point 2", "point 3"],
-                "weaknesses": ["point 1", "point 2", "point 3"],
-                "opportunities": ["point 1", "point 2", "point 3"],
-                "threats": ["point 1", "point 2", "point 3"]
-            }}
-            
-            Each category should have 3-4 specific, actionable points.
-            """
-            response = model.generate_content(prompt).text.strip()
-            
-            # Clean up potential markdown formatting
-            response = response.replace("```json", "").replace("```", "").strip()
-            
-            # Try to extract JSON if there's extra text
-            import re
-            json_match = re.search(r'\{[\s\S]*\}', response)
-            if json_match:
-                response = json_match.group(0)
-            
-            cards[comp] = json.loads(response)
-        except json.JSONDecodeError as e:
-            print(f"JSON decode error for {comp}: {e}")
-            print(f"Response was: {response[:200]}")
-            cards[comp] = {"error": f"Failed to parse response: {str(e)}"}
+            news[comp] = swot_news(comp)
         except Exception as e:
             print(f"Error generating SWOT for {comp}: {e}")
             cards[comp] = {"error": str(e)}
-            
-    return cards
+
+    pending = list(news)
+    for attempt in range(SWOT_RETRIES + 1):
+        failed = []
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            try:
+                parsed = request_swot_cards({comp: news[comp] for comp in batch})
+            except Exception as e:
+                print(f"Error generating SWOT for {', '.join(batch)}: {e}")
+                parsed = {}
+                errors.update({comp: str(e) for comp in batch})
+            for comp in batch:
+                if parsed.get(comp):
+                    cards[comp] = parsed[comp]
+                else:
+                    errors.setdefault(comp, "Missing or malformed card in response")
+                    failed.append(comp)
+        if not failed:
+            break
+        if attempt < SWOT_RETRIES:
+            print(f"DEBUG: Re-requesting SWOT cards for {', '.join(failed)}")
+        pending = failed
+
+    for comp in competitors:
+        if comp not in cards:
+            cards[comp] = {"error": f"Failed to generate card: {errors.get(comp)}"}
+    return {comp: cards[comp] for comp in competitors}
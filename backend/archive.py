@@ -0,0 +1,501 @@
+import os
+import re
+import json
+import sqlite3
+import argparse
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from report_model import load_report
+from spool import RUNS_DIR, RunSpool, RUN_ID_PATTERN
+
+# --- Report & Evidence Archive ---
+# Every stored report, its items and their sources, plus the raw search results
+# ("evidence") of the run that produced it, are copied into one SQLite database
+# with FTS5 full-text indexes and entity/date indexes. Questions like "what did
+# Smarsh announce last quarter" and mention trends are then answered locally in
+# milliseconds, without another paid search. Entities are the watchlist targets:
+# evidence from a target's own search is tagged with it, and items and evidence
+# that mention a target by name are tagged as well.
+# Existing reports and runs can be (re)loaded with `python archive.py reindex`.
+ARCHIVE_PATH = os.getenv("SCOUT_ARCHIVE_PATH", "archive.db")
+ARCHIVE_ENABLED = os.getenv("SCOUT_ARCHIVE_ENABLED", "true").lower() == "true"
+SEARCH_LIMIT_MAX = 100
+
+SCOPES = ("all", "items", "evidence")
+BUCKETS = {"day": "%Y-%m-%d", "week": "%Y-W%W", "month": "%Y-%m"}
+
+# Exa / You.com / WebSearchAPI results are spooled as "- **Title** (url) [Date: ...]: text"
+EVIDENCE_LINE_PATTERN = re.compile(r'^- \*\*(.*?)\*\* \((https?://[^)\s]+)\)(?: \[Date: ([^\]]+)\])?: ?(.*)$')
+# Report item timestamps, e.g. "Nov 25, 2025 10:00 AM EST"
+ITEM_DATE_PATTERN = re.compile(r'([A-Z][a-z]{2,8})\.? (\d{1,2}), (\d{4})')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id TEXT PRIMARY KEY,
+    run_id TEXT,
+    generated_at TEXT,
+    time_range TEXT,
+    search_provider TEXT,
+    search_mode TEXT,
+    markdown TEXT
+);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    report_id TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    section_key TEXT,
+    kind TEXT,
+    text TEXT,
+    take TEXT,
+    badges TEXT,
+    published_at TEXT,
+    seen_at TEXT,
+    UNIQUE (report_id, item_id)
+);
+CREATE TABLE IF NOT EXISTS sources (
+    item_rowid INTEGER NOT NULL,
+    name TEXT,
+    url TEXT
+);
+CREATE TABLE IF NOT EXISTS evidence (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    query_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    label TEXT,
+    title TEXT,
+    url TEXT,
+    content TEXT,
+    published_at TEXT,
+    seen_at TEXT,
+    UNIQUE (run_id, query_key, position)
+);
+CREATE TABLE IF NOT EXISTS mentions (
+    entity TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    ref INTEGER NOT NULL,
+    at TEXT,
+    UNIQUE (entity, scope, ref)
+);
+CREATE INDEX IF NOT EXISTS items_report ON items (report_id);
+CREATE INDEX IF NOT EXISTS items_published ON items (published_at);
+CREATE INDEX IF NOT EXISTS sources_item ON sources (item_rowid);
+CREATE INDEX IF NOT EXISTS sources_url ON sources (url);
+CREATE INDEX IF NOT EXISTS evidence_run ON evidence (run_id);
+CREATE INDEX IF NOT EXISTS evidence_published ON evidence (published_at);
+CREATE INDEX IF NOT EXISTS evidence_url ON evidence (url);
+CREATE INDEX IF NOT EXISTS mentions_entity ON mentions (entity, at);
+CREATE INDEX IF NOT EXISTS mentions_ref ON mentions (scope, ref);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5 (text, take, tokenize = 'porter unicode61');
+CREATE VIRTUAL TABLE IF NOT EXISTS evidence_fts USING fts5 (title, content, tokenize = 'porter unicode61');
+"""
+
+
+def to_iso(value):
+    """
+    Normalizes ISO 8601, RFC 2822 and report item dates to UTC "YYYY-MM-DDTHH:MM:SS". None if unknown.
+    """
+    if not value or not isinstance(value, str) or value == "Unknown Date":
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        parsed = None
+    match = ITEM_DATE_PATTERN.search(value) if parsed is None else None
+    if match:
+        # Only the date is kept: the report's times carry a loose "EST"/"ET" suffix
+        for fmt in ("%b %d %Y", "%B %d %Y"):
+            try:
+                parsed = datetime.strptime(" ".join(match.groups()), fmt)
+                break
+            except ValueError:
+                continue
+    if parsed is None:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat(timespec="seconds")
+
+
+def parse_bound(value, name: str):
+    """
+    Validates a since/until query value. Raises ValueError on garbage.
+    """
+    if not value:
+        return None
+    iso = to_iso(value)
+    if iso is None:
+        raise ValueError(f"{name} must be a date, e.g. 2025-09-01")
+    return iso
+
+
+def fts_query(text: str):
+    """
+    Turns free text into an FTS5 query: every word must match (as a prefix for trailing '*').
+    """
+    terms = []
+    for word in re.findall(r'[\w*]+', text or ""):
+        prefix = word.endswith("*")
+        word = word.strip("*")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def evidence_records(result):
+    """
+    Splits one spooled search result into evidence rows (title, url, content, published).
+    """
+    if isinstance(result, dict) and isinstance(result.get("results"), list):
+        return [
+            (r.get("title"), r.get("url"), r.get("content") or r.get("text") or "", r.get("published_date") or r.get("publishedDate"))
+            for r in result["results"] if isinstance(r, dict)
+        ]
+    if not isinstance(result, str) or not result.strip() or result.strip() == "No results found.":
+        return []
+    rows = []
+    for line in result.split("\n"):
+        match = EVIDENCE_LINE_PATTERN.match(line.strip())
+        if match:
+            rows.append((match.group(1), match.group(2), match.group(4).rstrip("."), match.group(3)))
+    # Perplexity-style prose: the summary itself is the evidence
+    return rows or [(None, None, result.strip(), None)]
+
+
+def entity_matcher(entities):
+    """
+    Returns a function that finds the entities named in a text, or None without entities.
+    Matching is case-sensitive: many targets (NICE, Box, Slack, Zoom, Mural) are also
+    ordinary words, and only the capitalised proper noun refers to the company.
+    """
+    names = sorted({e for e in entities if e}, key=len, reverse=True)
+    if not names:
+        return None
+    pattern = re.compile(r'(?<!\w)(' + "|".join(re.escape(n) for n in names) + r')(?!\w)')
+    return lambda text: set(pattern.findall(text or ""))
+
+
+class Archive:
+    """
+    SQLite store of every report, item, source and piece of evidence.
+    """
+
+    def __init__(self, path: str = ARCHIVE_PATH):
+        self.path = path
+        self.write_lock = threading.Lock()
+        self.ready = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        if not self.ready:
+            with self.write_lock:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+                self.ready = True
+        return conn
+
+    # --- Writing ---
+
+    def _add_report(self, conn, report: dict, run_id: str, tag):
+        report_id = report["id"]
+        generated_at = to_iso(report.get("generated_at"))
+        old = [row["id"] for row in conn.execute("SELECT id FROM items WHERE report_id = ?", (report_id,))]
+        if old:
+            marks = ",".join("?" * len(old))
+            conn.execute(f"DELETE FROM items_fts WHERE rowid IN ({marks})", old)
+            conn.execute(f"DELETE FROM sources WHERE item_rowid IN ({marks})", old)
+            conn.execute(f"DELETE FROM mentions WHERE scope = 'item' AND ref IN ({marks})", old)
+            conn.execute("DELETE FROM items WHERE report_id = ?", (report_id,))
+        conn.execute(
+            "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (report_id, run_id, generated_at, report.get("time_range"), report.get("search_provider"), report.get("search_mode"), report["markdown"]),
+        )
+        for section in report["sections"]:
+            for item in section["items"]:
+                published_at = to_iso(item.get("timestamp"))
+                cursor = conn.execute(
+                    "INSERT INTO items (report_id, item_id, section_key, kind, text, take, badges, published_at, seen_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (report_id, item["id"], section["key"], item.get("kind"), item["text"], item["take"], ",".join(item["badges"]), published_at, generated_at),
+                )
+                rowid = cursor.lastrowid
+                conn.execute("INSERT INTO items_fts (rowid, text, take) VALUES (?, ?, ?)", (rowid, item["text"], item["take"]))
+                conn.executemany(
+                    "INSERT INTO sources VALUES (?, ?, ?)",
+                    [(rowid, s["name"], s["url"]) for s in item["sources"]],
+                )
+                entities = tag(item["text"] + " " + item["take"]) if tag else set()
+                conn.executemany(
+                    "INSERT OR IGNORE INTO mentions VALUES (?, 'item', ?, ?)",
+                    [(entity, rowid, published_at or generated_at) for entity in entities],
+                )
+
+    def _add_evidence(self, conn, run_id: str, records, entity_by_key, tag):
+        count = 0
+        for record in records:
+            if record.get("status") != "ok":
+                continue
+            key = record["key"]
+            seen_at = to_iso(record.get("at"))
+            for position, (title, url, content, published) in enumerate(evidence_records(record["result"])):
+                published_at = to_iso(published)
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO evidence (run_id, query_key, position, label, title, url, content, published_at, seen_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, key, position, record.get("label"), title, url, content, published_at, seen_at),
+                )
+                if not cursor.rowcount:
+                    continue  # Already archived (e.g. by another window of the same run)
+                rowid = cursor.lastrowid
+                conn.execute("INSERT INTO evidence_fts (rowid, title, content) VALUES (?, ?, ?)", (rowid, title or "", content))
+                entities = tag(f"{title or ''} {content}") if tag else set()
+                if entity_by_key.get(key):
+                    entities.add(entity_by_key[key])
+                conn.executemany(
+                    "INSERT OR IGNORE INTO mentions VALUES (?, 'evidence', ?, ?)",
+                    [(entity, rowid, published_at or seen_at) for entity in entities],
+                )
+                count += 1
+        return count
+
+    def add_run(self, run_id: str, report_ids, records, entity_by_key=None, entities=()):
+        """
+        Archives a run's reports and its spooled search results. Never raises:
+        a failing archive must not fail the scan.
+        """
+        if not ARCHIVE_ENABLED:
+            return False
+        try:
+            tag = entity_matcher(entities)
+            reports = [r for r in (load_report(report_id) for report_id in report_ids if report_id) if r]
+            conn = self._connect()
+            try:
+                with self.write_lock, conn:
+                    for report in reports:
+                        self._add_report(conn, report, run_id, tag)
+                    count = self._add_evidence(conn, run_id, records, entity_by_key or {}, tag)
+            finally:
+                conn.close()
+            print(f"DEBUG: Archived run {run_id}: {len(reports)} report(s), {count} evidence record(s)")
+            return True
+        except Exception as e:
+            print(f"Archiving run {run_id} failed: {e}")
+            return False
+
+    # --- Queries ---
+
+    def _filters(self, alias: str, scope: str, entity, since, until):
+        clauses, params = [], []
+        date = f"COALESCE({alias}.published_at, {alias}.seen_at)"
+        if entity:
+            clauses.append(f"{alias}.id IN (SELECT ref FROM mentions WHERE scope = ? AND entity = ? COLLATE NOCASE)")
+            params += [scope, entity]
+        if since:
+            clauses.append(f"{date} >= ?")
+            params.append(since)
+        if until:
+            clauses.append(f"{date} < ?")
+            params.append(until)
+        return "".join(f" AND {c}" for c in clauses), params
+
+    def search(self, query: str = "", entity: str = None, since: str = None, until: str = None, scope: str = "all", limit: int = 20):
+        """
+        Full-text search over items and/or evidence, best match first
+        (newest first when there is no query text).
+        """
+        if scope not in SCOPES:
+            raise ValueError(f"scope must be one of {', '.join(SCOPES)}")
+        since, until = parse_bound(since, "since"), parse_bound(until, "until")
+        limit = min(max(int(limit), 1), SEARCH_LIMIT_MAX)
+        match = fts_query(query)
+        results = []
+        conn = self._connect()
+        try:
+            if scope in ("all", "items"):
+                where, params = self._filters("i", "item", entity, since, until)
+                if match:
+                    sql = (
+                        "SELECT i.*, bm25(items_fts) AS rank, snippet(items_fts, 0, '**', '**', '…', 16) AS snippet "
+                        "FROM items_fts JOIN items i ON i.id = items_fts.rowid "
+                        f"WHERE items_fts MATCH ?{where} ORDER BY rank LIMIT ?"
+                    )
+                    params = [match] + params
+                else:
+                    sql = (
+                        "SELECT i.*, 0 AS rank, NULL AS snippet FROM items i "
+                        f"WHERE 1{where} ORDER BY COALESCE(i.published_at, i.seen_at) DESC LIMIT ?"
+                    )
+                for row in conn.execute(sql, params + [limit]):
+                    sources = conn.execute("SELECT name, url FROM sources WHERE item_rowid = ?", (row["id"],))
+                    results.append({
+                        "type": "item",
+                        "report_id": row["report_id"],
+                        "item_id": row["item_id"],
+                        "section": row["section_key"],
+                        "kind": row["kind"],
+                        "text": row["text"],
+                        "take": row["take"],
+                        "badges": [b for b in row["badges"].split(",") if b],
+                        "sources": [dict(s) for s in sources],
+                        "published_at": row["published_at"],
+                        "seen_at": row["seen_at"],
+                        "snippet": row["snippet"],
+                        "rank": row["rank"],
+                    })
+            if scope in ("all", "evidence"):
+                where, params = self._filters("e", "evidence", entity, since, until)
+                if match:
+                    sql = (
+                        "SELECT e.*, bm25(evidence_fts) AS rank, snippet(evidence_fts, 1, '**', '**', '…', 24) AS snippet "
+                        "FROM evidence_fts JOIN evidence e ON e.id = evidence_fts.rowid "
+                        f"WHERE evidence_fts MATCH ?{where} ORDER BY rank LIMIT ?"
+                    )
+                    params = [match] + params
+                else:
+                    sql = (
+                        "SELECT e.*, 0 AS rank, NULL AS snippet FROM evidence e "
+                        f"WHERE 1{where} ORDER BY COALESCE(e.published_at, e.seen_at) DESC LIMIT ?"
+                    )
+                for row in conn.execute(sql, params + [limit]):
+                    results.append({
+                        "type": "evidence",
+                        "run_id": row["run_id"],
+                        "query": row["query_key"],
+                        "label": row["label"],
+                        "title": row["title"],
+                        "url": row["url"],
+                        "content": row["content"],
+                        "published_at": row["published_at"],
+                        "seen_at": row["seen_at"],
+                        "snippet": row["snippet"],
+                        "rank": row["rank"],
+                    })
+        finally:
+            conn.close()
+        if match:
+            # bm25() is lower-is-better; scores of the two tables are comparable enough to interleave
+            results.sort(key=lambda r: r["rank"])
+        else:
+            results.sort(key=lambda r: r["published_at"] or r["seen_at"] or "", reverse=True)
+        return results[:limit]
+
+    def trends(self, entities=None, since: str = None, until: str = None, bucket: str = "week"):
+        """
+        Mentions per entity per time bucket, counted separately for report items and evidence.
+        """
+        if bucket not in BUCKETS:
+            raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+        since, until = parse_bound(since, "since"), parse_bound(until, "until")
+        clauses, params = ["at IS NOT NULL"], []
+        if entities:
+            clauses.append(f"entity COLLATE NOCASE IN ({','.join('?' * len(entities))})")
+            params += list(entities)
+        if since:
+            clauses.append("at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("at < ?")
+            params.append(until)
+        sql = (
+            f"SELECT entity, strftime('{BUCKETS[bucket]}', at) AS bucket, scope, COUNT(*) AS mentions "
+            f"FROM mentions WHERE {' AND '.join(clauses)} GROUP BY entity, bucket, scope ORDER BY entity, bucket"
+        )
+        series = {}
+        conn = self._connect()
+        try:
+            for row in conn.execute(sql, params):
+                points = series.setdefault(row["entity"], {})
+                point = points.setdefault(row["bucket"], {"bucket": row["bucket"], "items": 0, "evidence": 0})
+                point["items" if row["scope"] == "item" else "evidence"] = row["mentions"]
+        finally:
+            conn.close()
+        return {entity: list(points.values()) for entity, points in series.items()}
+
+    def entities(self):
+        """
+        Every archived entity with its mention counts and last sighting.
+        """
+        sql = (
+            "SELECT entity, SUM(scope = 'item') AS items, SUM(scope = 'evidence') AS evidence, MAX(at) AS last_seen "
+            "FROM mentions GROUP BY entity ORDER BY items + evidence DESC"
+        )
+        conn = self._connect()
+        try:
+            return [dict(row) for row in conn.execute(sql)]
+        finally:
+            conn.close()
+
+    def stats(self):
+        conn = self._connect()
+        try:
+            counts = {
+                table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("reports", "items", "sources", "evidence", "mentions")
+            }
+        finally:
+            conn.close()
+        return {"enabled": ARCHIVE_ENABLED, "path": self.path, **counts}
+
+
+archive = Archive()
+
+
+def reindex(runs_dir: str = RUNS_DIR):
+    """
+    Loads every finished run (and the reports it produced) into the archive.
+    """
+    from watchlist import watchlist
+    entities = [t["name"] for t in watchlist.targets()]
+    if not os.path.isdir(runs_dir):
+        print(f"No runs found in {runs_dir}")
+        return 0
+    archived = 0
+    for run_id in sorted(os.listdir(runs_dir)):
+        if not RUN_ID_PATTERN.match(run_id):
+            continue
+        spool = RunSpool(run_id, runs_dir)
+        manifest = spool.load_manifest() or {}
+        if manifest.get("status") != "complete" or manifest.get("config", {}).get("use_mock_data"):
+            continue
+        # Single scans record report_id, windowed scans {time_range: id}, batches a list of ids
+        report_ids = manifest.get("report_ids") or []
+        if isinstance(report_ids, dict):
+            report_ids = list(report_ids.values())
+        report_ids = [manifest.get("report_id")] + report_ids
+        latest = {}
+        for record in spool.iter_records():
+            latest[record["key"]] = record
+        # Target searches are keyed "partner:<name>" / "competitor:<name>" (see agent.plan_queries)
+        entity_by_key = {key: key.split(":", 1)[1] for key in latest if key.startswith(("partner:", "competitor:"))}
+        if archive.add_run(run_id, report_ids, latest.values(), entity_by_key, entities):
+            archived += 1
+    print(f"Archived {archived} run(s) into {archive.path}")
+    return archived
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DCGA Scout report archive")
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("reindex", help="Load all finished runs and their reports into the archive")
+    search_parser = sub.add_parser("search", help="Full-text search the archive")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--entity")
+    search_parser.add_argument("--since")
+    search_parser.add_argument("--until")
+    search_parser.add_argument("--scope", default="all", choices=SCOPES)
+    search_parser.add_argument("--limit", type=int, default=10)
+    sub.add_parser("stats", help="Row counts")
+    args = parser.parse_args()
+
+    if args.command == "reindex":
+        reindex()
+    elif args.command == "search":
+        for result in archive.search(args.query, args.entity, args.since, args.until, args.scope, args.limit):
+            print(json.dumps(result, ensure_ascii=False))
+    else:
+        print(json.dumps(archive.stats(), indent=2))
@@ -0,0 +1,143 @@
+import os
+import json
+import uuid
+import shutil
+import threading
+from datetime import datetime
+
+from spool import RUN_ID_PATTERN
+from agent import generate_pdf, generate_audio_summary, generate_swot, SWOT_BATCH_SIZE
+
+# --- Report Artifacts ---
+# Prebuilt exports are stored per report id:
+#   artifacts/<report_id>/report.pdf
+#   artifacts/<report_id>/briefing.mp3
+#   artifacts/<report_id>/battlecards.json
+ARTIFACTS_DIR = os.getenv("SCOUT_ARTIFACTS_DIR", "artifacts")
+
+PDF = "report.pdf"
+AUDIO = "briefing.mp3"
+BATTLECARDS = "battlecards.json"
+
+_battlecards_lock = threading.Lock()
+
+
+def artifact_path(report_id: str, name: str):
+    if not RUN_ID_PATTERN.match(report_id or ""):
+        raise ValueError(f"Invalid report id: {report_id!r}")
+    return os.path.join(ARTIFACTS_DIR, report_id, name)
+
+
+def has_artifact(report_id: str, name: str):
+    try:
+        return os.path.exists(artifact_path(report_id, name))
+    except ValueError:
+        return False
+
+
+def delete_artifacts(report_id: str):
+    """
+    Removes every artifact built for a report. Returns True if there were any.
+    """
+    try:
+        path = os.path.dirname(artifact_path(report_id, PDF))
+    except ValueError:
+        return False
+    if not os.path.isdir(path):
+        return False
+    shutil.rmtree(path)
+    return True
+
+
+def _temp_path(path: str):
+    # Build under a unique temp name so readers never see a half-written file and
+    # two builders (e.g. a prefetch and a user request) never share one
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+
+
+def build_pdf(report_id: str, markdown_text: str):
+    path = artifact_path(report_id, PDF)
+    tmp_path = _temp_path(path)
+    try:
+        generate_pdf(markdown_text, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def build_audio(report_id: str, markdown_text: str):
+    path = artifact_path(report_id, AUDIO)
+    tmp_path = _temp_path(path)
+    result = generate_audio_summary(markdown_text, filename=tmp_path)
+    if result != tmp_path:
+        # generate_audio_summary returns "error.mp3" on failure
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_battlecards(report_id: str):
+    """
+    Prebuilt SWOT cards for a report: {competitor: card}, or {} if none were built.
+    """
+    try:
+        path = artifact_path(report_id, BATTLECARDS)
+    except ValueError:
+        return {}
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("cards", {})
+
+
+def build_battlecards(report_id: str, competitors, should_stop=None):
+    """
+    Builds SWOT cards one batch of competitors at a time, adding to any already stored.
+    Stops early when should_stop() returns True. Returns the stored cards.
+    """
+    cards = load_battlecards(report_id)
+    missing = [c for c in competitors if c not in cards]
+    for start in range(0, len(missing), max(SWOT_BATCH_SIZE, 1)):
+        if should_stop and should_stop():
+            break
+        built = {}
+        for competitor, card in generate_swot(missing[start:start + SWOT_BATCH_SIZE]).items():
+            if "error" in card:
+                print(f"Battlecard prebuild for {competitor} failed: {card['error']}")
+            else:
+                built[competitor] = card
+        if not built:
+            continue
+        with _battlecards_lock:
+            # Merge with whatever another builder stored meanwhile
+            cards = {**load_battlecards(report_id), **built}
+            path = artifact_path(report_id, BATTLECARDS)
+            tmp_path = _temp_path(path)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"generated_at": datetime.now().isoformat(), "cards": cards}, f, indent=2)
+            os.replace(tmp_path, path)
+    return cards
+
+
+def build_report_artifacts(report_id: str, markdown_text: str):
+    """
+    Builds the PDF and audio briefing for a report, skipping any that already exist.
+    Returns the names of the artifacts that are available.
+    """
+    built = []
+    if has_artifact(report_id, PDF):
+        built.append(PDF)
+    else:
+        try:
+            build_pdf(report_id, markdown_text)
+            built.append(PDF)
+        except Exception as e:
+            print(f"PDF prebuild failed for {report_id}: {e}")
+    if has_artifact(report_id, AUDIO) or build_audio(report_id, markdown_text):
+        built.append(AUDIO)
+    return built
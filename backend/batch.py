@@ -0,0 +1,157 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from agent import (
+    TIME_RANGE_DAYS, check_search_provider, discover_targets, plan_queries,
+    execute_entry, synthesize_report, store_report, archive_run,
+)
+from spool import RunSpool, new_run_id
+from artifacts import build_pdf
+from windows import derive_window
+
+# --- Batch Scans ---
+# Several scan configurations run as one job: the union of their planned searches is
+# deduplicated on (provider, query, topic, days, max_results, mode, mock), each unique
+# search runs once on a shared worker pool, and every report is built from the shared results.
+BATCH_CONCURRENCY = int(os.getenv("SCOUT_BATCH_CONCURRENCY", "4"))
+BATCH_MAX_CONFIGS = int(os.getenv("SCOUT_BATCH_MAX_CONFIGS", "12"))
+
+
+def search_signature(provider: str, entry: dict):
+    """
+    Identifies a unique unit of search work. Returns (spool_key, signature).
+    """
+    signature = [
+        provider,
+        entry["query"],
+        entry["topic"],
+        entry["days"],
+        entry["max_results"],
+        entry.get("search_mode", "deep"),
+        entry.get("use_mock_data", False),
+    ]
+    digest = hashlib.sha1(json.dumps(signature).encode("utf-8")).hexdigest()[:16]
+    return f"q:{digest}", signature
+
+
+def plan_batch(configs, derive_windows: bool = False):
+    """
+    Plans every config and dedupes the searches they share.
+    Each config is a dict with timeRange, searchProvider, useMockData and searchMode.
+    Returns (jobs, work) where jobs holds each config's ordered spool keys and
+    work maps spool key -> (provider, entry) for the unique searches.
+    """
+    partners, competitors = discover_targets()
+
+    # With derive_windows, configs that differ only in timeRange share one sweep of their widest window
+    widest = {}
+    for config in configs:
+        group = (config["searchProvider"], config["searchMode"], config["useMockData"])
+        widest[group] = max(widest.get(group, 0), TIME_RANGE_DAYS[config["timeRange"]])
+
+    jobs = []
+    work = {}
+    for config in configs:
+        provider = config["searchProvider"]
+        days = TIME_RANGE_DAYS[config["timeRange"]]
+        group = (provider, config["searchMode"], config["useMockData"])
+        sweep_days = widest[group] if derive_windows else days
+
+        plan = plan_queries(partners, competitors, sweep_days, use_mock_data=config["useMockData"], search_mode=config["searchMode"])
+        keys = []
+        for entry in plan:
+            key, _ = search_signature(provider, entry)
+            keys.append(key)
+            work.setdefault(key, (provider, {**entry, "key": key}))
+
+        jobs.append({
+            "config": config,
+            "keys": keys,
+            "planned": len(plan),
+            "days": days if days < sweep_days else None,  # Derived from a wider sweep
+            "transform": None,
+        })
+    return jobs, work
+
+
+def run_batch(configs, batch_id: str = None, derive_windows: bool = False, concurrency: int = BATCH_CONCURRENCY):
+    """
+    Runs several scan configurations as one job.
+    Returns {"batch_id", "stats", "results"} or an error string.
+    """
+    if not configs:
+        return "Error: No configurations given."
+    if len(configs) > BATCH_MAX_CONFIGS:
+        return f"Error: A batch may contain at most {BATCH_MAX_CONFIGS} configurations."
+    for config in configs:
+        if config["timeRange"] not in TIME_RANGE_DAYS:
+            return f"Error: Unknown time range: {config['timeRange']}"
+        provider_error = check_search_provider(config["searchProvider"])
+        if provider_error:
+            return provider_error
+
+    jobs, work = plan_batch(configs, derive_windows)
+    try:
+        spool = RunSpool(batch_id or new_run_id())
+        spool.start({"configs": configs, "derive_windows": derive_windows}, planned=len(work))
+    except ValueError as e:
+        return f"Error: {e}"
+
+    # 1. Shared search phase: each unique search runs once
+    done = spool.completed_keys()
+    pending = [(provider, entry) for key, (provider, entry) in work.items() if key not in done]
+    print(f"DEBUG: Batch {spool.run_id}: {sum(j['planned'] for j in jobs)} planned searches, {len(work)} unique, {len(pending)} to run")
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+        # Each config pins its provider (batches compare providers), so no fallback
+        list(pool.map(lambda item: execute_entry(item[1], spool, item[0], allow_fallback=False), pending))
+
+        # Derived windows: filter the sweep by date, re-running searches whose results are undated
+        for job in jobs:
+            if not job["days"]:
+                continue
+            provider = job["config"]["searchProvider"]
+            job["keys"], job["transform"] = derive_window(
+                spool, [work[key][1] for key in job["keys"]], job["days"],
+                run=lambda entries, provider=provider: list(pool.map(
+                    lambda entry: execute_entry(entry, spool, provider, allow_fallback=False), entries
+                )),
+                rekey=lambda entry, provider=provider: search_signature(provider, entry)[0],
+            )
+
+        # 2. One report per config, built from the shared results
+        def build(indexed_job):
+            index, job = indexed_job
+            config = job["config"]
+            report_markdown = synthesize_report(
+                config["timeRange"],
+                lambda limit: spool.read_text(job["keys"], limit=limit, transform=job["transform"]),
+            )
+            report_id = store_report(report_markdown, f"{spool.run_id}-{index + 1}", config["timeRange"], config["searchProvider"], config["searchMode"])
+            pdf_url = None
+            if report_id:
+                try:
+                    build_pdf(report_id, report_markdown)
+                    pdf_url = f"/api/artifacts/{report_id}/pdf"
+                except Exception as e:
+                    print(f"PDF Generation failed for {report_id}: {e}")
+            return {"config": config, "report": report_markdown, "report_id": report_id, "pdf_url": pdf_url}
+
+        results = list(pool.map(build, enumerate(jobs)))
+
+    stats = {
+        "configs": len(configs),
+        "planned_searches": sum(job["planned"] for job in jobs),
+        "unique_searches": len(work),
+        "executed_searches": len(pending),
+    }
+    spool.finish("complete", stats=stats, report_ids=[r["report_id"] for r in results])
+    partners, competitors = discover_targets()
+    archive_run(
+        spool,
+        [entry for _, entry in work.values() if not entry.get("use_mock_data")],
+        [r["report_id"] for r in results if not r["config"]["useMockData"]],
+        partners + competitors,
+    )
+    return {"batch_id": spool.run_id, "stats": stats, "results": results}
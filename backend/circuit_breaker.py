@@ -0,0 +1,132 @@
+import os
+import time
+import threading
+from collections import deque
+
+# --- Per-Provider Circuit Breakers ---
+# A breaker watches a rolling window of recent calls to one search provider.
+# CLOSED    -> calls flow normally
+# OPEN      -> provider is failing or too slow; calls are rejected immediately
+# HALF_OPEN -> cooldown elapsed; a single probe call decides whether to close again
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+BREAKER_WINDOW = int(os.getenv("SCOUT_BREAKER_WINDOW", "20"))  # Max calls kept in the window
+BREAKER_WINDOW_SECONDS = float(os.getenv("SCOUT_BREAKER_WINDOW_SECONDS", "300"))  # Calls older than this are dropped
+BREAKER_MIN_CALLS = int(os.getenv("SCOUT_BREAKER_MIN_CALLS", "4"))  # Don't judge a provider on fewer calls
+BREAKER_ERROR_RATE = float(os.getenv("SCOUT_BREAKER_ERROR_RATE", "0.5"))
+BREAKER_SLOW_SECONDS = float(os.getenv("SCOUT_BREAKER_SLOW_SECONDS", "20"))
+BREAKER_SLOW_RATE = float(os.getenv("SCOUT_BREAKER_SLOW_RATE", "0.8"))
+BREAKER_COOLDOWN = float(os.getenv("SCOUT_BREAKER_COOLDOWN", "30"))
+
+
+class CircuitBreaker:
+    """
+    Tracks error and latency rates for one provider and fails fast while it is unhealthy.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.calls = deque(maxlen=BREAKER_WINDOW)  # (timestamp, ok, latency)
+        self.opened_at = None
+        self.probe_in_flight = False
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def _trim(self, now):
+        while self.calls and now - self.calls[0][0] > BREAKER_WINDOW_SECONDS:
+            self.calls.popleft()
+
+    def _rates(self):
+        total = len(self.calls)
+        if not total:
+            return 0.0, 0.0
+        errors = sum(1 for _, ok, _ in self.calls if not ok)
+        slow = sum(1 for _, _, latency in self.calls if latency >= BREAKER_SLOW_SECONDS)
+        return errors / total, slow / total
+
+    def allow(self) -> bool:
+        """
+        Returns True if a call may be sent to the provider right now.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now - self.opened_at < BREAKER_COOLDOWN:
+                    self.rejected += 1
+                    return False
+                self.state = HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == HALF_OPEN:
+                if self.probe_in_flight:
+                    self.rejected += 1
+                    return False
+                self.probe_in_flight = True
+            return True
+
+    def record(self, ok: bool, latency: float):
+        """
+        Records the outcome of a call and moves the breaker between states.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                self.probe_in_flight = False
+                if ok and latency < BREAKER_SLOW_SECONDS:
+                    print(f"DEBUG: Circuit for {self.name} closed after successful probe")
+                    self.state = CLOSED
+                    self.calls.clear()
+                else:
+                    self._open(now)
+                return
+
+            self.calls.append((now, ok, latency))
+            self._trim(now)
+            if self.state == CLOSED and len(self.calls) >= BREAKER_MIN_CALLS:
+                error_rate, slow_rate = self._rates()
+                if error_rate >= BREAKER_ERROR_RATE or slow_rate >= BREAKER_SLOW_RATE:
+                    self._open(now)
+
+    def _open(self, now):
+        print(f"DEBUG: Circuit for {self.name} opened")
+        self.state = OPEN
+        self.opened_at = now
+
+    def snapshot(self):
+        with self.lock:
+            now = time.monotonic()
+            self._trim(now)
+            error_rate, slow_rate = self._rates()
+            latencies = [latency for _, _, latency in self.calls]
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = round(max(BREAKER_COOLDOWN - (now - self.opened_at), 0), 1)
+            return {
+                "state": self.state,
+                "calls": len(self.calls),
+                "error_rate": round(error_rate, 3),
+                "slow_rate": round(slow_rate, 3),
+                "avg_latency": round(sum(latencies) / len(latencies), 3) if latencies else None,
+                "max_latency": round(max(latencies), 3) if latencies else None,
+                "rejected": self.rejected,
+                "retry_in": retry_in,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider)
+        return _breakers[provider]
+
+
+def breaker_states():
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.snapshot() for name, breaker in breakers.items()}
@@ -0,0 +1,336 @@
+import re
+import json
+import math
+import time
+import random
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Local Provider Stand-ins ---
+# Minimal fakes of the Tavily, Exa, Perplexity, Gemini (REST, including cached content)
+# and TTS APIs, used by loadtest.py so the app can be exercised with no network. Each provider gets a
+# lognormal latency distribution and an error rate. Latency and failures are drawn
+# from a generator seeded by (seed, provider, request body, repeat count), so the
+# same workload sees the same provider behaviour on every run.
+
+# provider -> (median latency ms, lognormal sigma, error rate)
+DEFAULT_PROFILES = {
+    "tavily": (400, 0.5, 0.02),
+    "exa": (600, 0.5, 0.02),
+    "perplexity": (1500, 0.4, 0.02),
+    "gemini": (2500, 0.6, 0.01),
+    "tts": (800, 0.3, 0.0),
+}
+
+TOPICS = ["Zoom", "Microsoft Teams", "Smarsh", "Global Relay", "FINRA", "SEC", "Slack", "Webex"]
+
+# Share of cards in a batched SWOT answer that come back malformed (exercises per-card retries)
+MALFORMED_CARD_RATE = 0.05
+
+# A tiny but valid MP3 frame header followed by silence
+FAKE_MP3 = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+
+class ProviderProfile:
+    def __init__(self, median_ms: float, sigma: float, error_rate: float):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+
+    def to_dict(self):
+        return {"median_ms": self.median_ms, "sigma": self.sigma, "error_rate": self.error_rate}
+
+
+def parse_profiles(latency_specs=(), error_specs=()):
+    """
+    Builds provider profiles from "provider=median_ms[:sigma]" and "provider=rate" overrides.
+    """
+    profiles = {name: ProviderProfile(*settings) for name, settings in DEFAULT_PROFILES.items()}
+    for spec in latency_specs:
+        name, _, value = spec.partition("=")
+        if name not in profiles:
+            raise ValueError(f"Unknown provider in --latency: {name}")
+        median, _, sigma = value.partition(":")
+        profiles[name].median_ms = float(median)
+        if sigma:
+            profiles[name].sigma = float(sigma)
+    for spec in error_specs:
+        name, _, value = spec.partition("=")
+        if name not in profiles:
+            raise ValueError(f"Unknown provider in --error-rate: {name}")
+        profiles[name].error_rate = float(value)
+    return profiles
+
+
+# --- Canned responses ---
+
+def _published(rng, days: int):
+    return datetime.now(timezone.utc) - timedelta(hours=rng.uniform(1, max(days, 1) * 24))
+
+
+def tavily_response(body: dict, rng):
+    days = int(body.get("days") or 7)
+    results = []
+    for _ in range(int(body.get("max_results") or 5)):
+        topic = rng.choice(TOPICS)
+        published = _published(rng, days)
+        results.append({
+            "title": f"{topic} announces update #{rng.randint(1, 999)}",
+            "url": f"https://news.example.com/{topic.lower().replace(' ', '-')}/{rng.randint(1000, 9999)}",
+            "content": f"{topic} released new compliance and collaboration features. " * 3,
+            "score": round(rng.random(), 3),
+            "published_date": published.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+        })
+    return {"query": body.get("query", ""), "results": results, "response_time": 0.1}
+
+
+def exa_response(body: dict, rng):
+    results = []
+    text_options = (body.get("contents") or {}).get("text")
+    max_chars = text_options.get("maxCharacters") if isinstance(text_options, dict) else None
+    for _ in range(int(body.get("numResults") or 5)):
+        topic = rng.choice(TOPICS)
+        # Full article text unless the request caps it, like the real API
+        text = f"{topic} shipped a new capability relevant to regulated industries. " * 60
+        results.append({
+            "title": f"{topic} expands its platform",
+            "url": f"https://blog.example.com/{topic.lower().replace(' ', '-')}/{rng.randint(1000, 9999)}",
+            "publishedDate": _published(rng, 14).isoformat().replace("+00:00", "Z"),
+            "text": text[:max_chars] if max_chars else text,
+        })
+    return {"results": results}
+
+
+def perplexity_response(body: dict, rng):
+    topic = rng.choice(TOPICS)
+    content = (
+        f"{topic} announced new archiving integrations this week [1]. "
+        f"Analysts expect further regulatory scrutiny of off-channel communications [2]."
+    )
+    return {
+        "id": f"fake-{rng.randint(0, 10**6)}",
+        "model": body.get("model", "sonar-pro"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+    }
+
+
+def fake_report(rng):
+    """
+    A report in the shape the synthesis prompt asks for, so parse_report() finds every section.
+    """
+    stamp = datetime.now().strftime("%b %d, %Y %I:%M %p EST")
+    lines = ["# DCGA Scout Report", ""]
+    sections = [
+        "TL;DR: The Weekly Pulse",
+        "Cooperative & Partner Updates",
+        "Competitive Intelligence",
+        "Regulatory Radar",
+        "Industry Analysis & Blogs",
+    ]
+    for header in sections:
+        lines += [f"## {header}", ""]
+        for n in range(rng.randint(2, 4)):
+            topic = rng.choice(TOPICS)
+            badge = rng.choice(["Opportunity", "Risk", "Threat", "Sales Validation"])
+            lines.append(
+                f"* **News:** {topic} announced a new capability ([Source](https://news.example.com/{n})) [{stamp}] [{badge}]"
+            )
+            lines.append(f"    * **DCGA Take:** This matters for capture coverage of {topic}.")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def swot_card(rng):
+    return {
+        key: [f"{key[:-1]} point {n}" for n in range(1, 4)]
+        for key in ("strengths", "weaknesses", "opportunities", "threats")
+    }
+
+
+def gemini_text(prompt: str, rng):
+    if "SWOT" in prompt and "EACH competitor" in prompt:
+        cards = []
+        for competitor in re.findall(r'^Competitor: (.+)$', prompt, re.MULTILINE):
+            card = {"competitor": competitor, **swot_card(rng)}
+            if rng.random() < MALFORMED_CARD_RATE:
+                card["threats"] = []
+            cards.append(card)
+        return json.dumps({"cards": cards})
+    if "SWOT" in prompt:
+        return json.dumps(swot_card(rng))
+    if "Podcast Script" in prompt:
+        return "Welcome to your DCGA Scout Daily Briefing. Here are the top three takeaways for this week."
+    if "Strategic Report" in prompt:
+        return fake_report(rng)
+    if "email" in prompt.lower():
+        return "Subject: Quick update\n\nHi there,\n\nSharing a relevant update from this week's report.\n\nBest regards"
+    return "Based on the report, the most important development is the new archiving integration."
+
+
+def _parts_text(content):
+    return " ".join(part.get("text", "") for part in (content or {}).get("parts", []))
+
+
+# Cached content name -> static prompt text (see gemini_cache_response)
+CACHED_CONTENTS = {}
+
+
+def gemini_cache_response(body: dict, rng):
+    name = f"cachedContents/fake-{rng.randint(0, 16**12):012x}"
+    CACHED_CONTENTS[name] = _parts_text(body.get("systemInstruction"))
+    now = datetime.now(timezone.utc)
+    ttl = float(str(body.get("ttl", "3600s")).rstrip("s"))
+    return {
+        "name": name,
+        "model": body.get("model", ""),
+        "displayName": body.get("displayName", ""),
+        "createTime": now.isoformat().replace("+00:00", "Z"),
+        "updateTime": now.isoformat().replace("+00:00", "Z"),
+        "expireTime": (now + timedelta(seconds=ttl)).isoformat().replace("+00:00", "Z"),
+        "usageMetadata": {"totalTokenCount": len(CACHED_CONTENTS[name]) // 4},
+    }
+
+
+def gemini_response(body: dict, rng):
+    # The static part of a prompt arrives as a system instruction or a cached content reference
+    prompt = " ".join([
+        CACHED_CONTENTS.get(body.get("cachedContent"), ""),
+        _parts_text(body.get("systemInstruction")),
+    ] + [_parts_text(content) for content in body.get("contents", [])])
+    text = gemini_text(prompt, rng)
+    return {
+        "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP", "index": 0}],
+        "usageMetadata": {
+            "promptTokenCount": len(prompt) // 4,
+            "candidatesTokenCount": len(text) // 4,
+            "totalTokenCount": (len(prompt) + len(text)) // 4,
+        },
+    }
+
+
+# (method, path prefix) -> (provider, response builder)
+ROUTES = [
+    ("POST", "/tavily/search", "tavily", tavily_response),
+    ("POST", "/exa/search", "exa", exa_response),
+    ("POST", "/perplexity/chat/completions", "perplexity", perplexity_response),
+    ("POST", "/gemini/v1beta/models/", "gemini", gemini_response),
+    ("POST", "/gemini/v1beta/cachedContents", "gemini", gemini_cache_response),
+    ("POST", "/tts", "tts", None),
+]
+
+
+class FakeProviders:
+    """
+    Serves every fake provider from one threaded HTTP server under its own path prefix.
+    """
+
+    def __init__(self, profiles=None, seed: int = 0, host: str = "127.0.0.1", port: int = 0):
+        self.profiles = profiles or parse_profiles()
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.repeats = {}
+        self.counts = {name: {"requests": 0, "errors": 0} for name in self.profiles}
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        """
+        Environment variables that point the app at these stand-ins.
+        """
+        return {
+            "TAVILY_API_KEY": "fake-tavily",
+            "EXA_API_KEY": "fake-exa",
+            "PERPLEXITY_API_KEY": "fake-perplexity",
+            "GEMINI_API_KEY": "fake-gemini",
+            "WEBSEARCH_API_KEY": "",
+            "YOU_API_KEY": "",
+            "TAVILY_API_URL": f"{self.base_url}/tavily",
+            "EXA_API_URL": f"{self.base_url}/exa",
+            "PERPLEXITY_API_URL": f"{self.base_url}/perplexity",
+            "GEMINI_API_ENDPOINT": f"{self.base_url}/gemini",
+            "SCOUT_TTS_URL": f"{self.base_url}/tts",
+        }
+
+    def _rng(self, provider: str, body: bytes):
+        # Identical requests get a fresh, but reproducible, draw each time they repeat
+        digest = hashlib.sha1(body).hexdigest()
+        with self.lock:
+            repeat = self.repeats.get((provider, digest), 0)
+            self.repeats[(provider, digest)] = repeat + 1
+        return random.Random(f"{self.seed}:{provider}:{digest}:{repeat}")
+
+    def _record(self, provider: str, failed: bool):
+        with self.lock:
+            self.counts[provider]["requests"] += 1
+            if failed:
+                self.counts[provider]["errors"] += 1
+
+    def handle(self, method: str, path: str, body: bytes):
+        """
+        Returns (status, content type, payload bytes) for one request.
+        """
+        for route_method, prefix, provider, builder in ROUTES:
+            if method != route_method or not path.startswith(prefix):
+                continue
+            profile = self.profiles[provider]
+            rng = self._rng(provider, body)
+            latency = profile.median_ms * math.exp(rng.gauss(0, profile.sigma)) / 1000
+            failed = rng.random() < profile.error_rate
+            time.sleep(latency)
+            self._record(provider, failed)
+            if failed:
+                status = rng.choice([429, 500, 503])
+                return status, "application/json", json.dumps({"error": {"code": status, "message": "Injected failure"}}).encode()
+            if builder is None:
+                return 200, "audio/mpeg", FAKE_MP3
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                return 400, "application/json", b'{"error": "invalid json"}'
+            return 200, "application/json", json.dumps(builder(payload, rng)).encode()
+        return 404, "application/json", b'{"error": "not found"}'
+
+    def _handler(self):
+        fakes = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("content-length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, content_type, payload = fakes.handle("POST", self.path, body)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="fake-providers", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self):
+        with self.lock:
+            return {
+                name: {**self.counts[name], **self.profiles[name].to_dict()}
+                for name in self.profiles
+            }
@@ -0,0 +1,207 @@
+import os
+import re
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli  # Optional: smaller payloads than gzip for browsers that accept "br"
+except ImportError:
+    brotli = None
+
+# --- Compression, ETags & Cache-Control ---
+# Replaces GZipMiddleware. Responses are buffered (up to SCOUT_HTTP_BUFFER_MB) so that:
+#   * every cacheable 200 GET response gets a strong ETag (hash of its content) and a 304 when
+#     the client's If-None-Match already has it, so repeat downloads cost a few bytes;
+#   * bodies of compressible types above SCOUT_COMPRESS_MIN_BYTES are sent brotli or
+#     gzip encoded, depending on Accept-Encoding (PDF and MP3 are already compressed);
+#   * each endpoint class gets its Cache-Control policy (see CACHE_POLICIES).
+# Compressed variants carry their own ETag ("<hash>-gz" / "<hash>-br"), as strong ETags
+# must differ per representation; If-None-Match accepts any variant of the same hash.
+COMPRESS_MIN_BYTES = int(os.getenv("SCOUT_COMPRESS_MIN_BYTES", "1000"))
+MAX_BUFFER_BYTES = int(float(os.getenv("SCOUT_HTTP_BUFFER_MB", "16")) * 1024 * 1024)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+DIGESTS_KEPT = 256
+
+# May change at any time: reuse only after revalidating the ETag. This includes stored
+# reports and their PDF / audio, which are rebuilt when a scan re-runs with the same run id;
+# a revalidated download still costs only a 304
+REVALIDATE = "private, no-cache"
+NO_STORE = "no-store"
+
+# (path pattern, policy) for GET requests, first match wins; everything else is REVALIDATE
+CACHE_POLICIES = [
+    (re.compile(r'^/api/profiles'), NO_STORE),
+    (re.compile(r'^/api/(providers|models|admission|prewarm)/status$|^/api/admission/metrics$'), NO_STORE),
+    (re.compile(r'^/health$'), NO_STORE),
+]
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def cache_policy(method: str, path: str):
+    if method != "GET":
+        # POST answers (scans, chat, battlecards...) depend on the request body
+        return NO_STORE
+    for pattern, policy in CACHE_POLICIES:
+        if pattern.search(path):
+            return policy
+    return REVALIDATE
+
+
+def negotiate_encoding(accept_encoding: str):
+    """
+    Picks "br" or "gzip" from an Accept-Encoding header, or None.
+    """
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        match = re.search(r'q=([0-9.]+)', params)
+        if match:
+            try:
+                q = float(match.group(1))
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    if brotli and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def etag_matches(if_none_match: str, digest: str):
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag == digest or tag.rsplit("-", 1)[0] == digest:
+            return True
+    return False
+
+
+class HttpCacheMiddleware:
+    """
+    ASGI middleware adding compression, strong ETags, If-None-Match and Cache-Control.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+        # FileResponse already tags a file by mtime and size; remember its content hash for that tag
+        self.digests = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _digest(self, path: str, file_tag, body: bytes):
+        key = (path, file_tag) if file_tag else None
+        if key:
+            with self.lock:
+                digest = self.digests.get(key)
+            if digest:
+                return digest
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        if key:
+            with self.lock:
+                self.digests[key] = digest
+                while len(self.digests) > DIGESTS_KEPT:
+                    self.digests.popitem(last=False)
+        return digest
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "POST"):
+            return await self.app(scope, receive, send)
+
+        request_headers = Headers(scope=scope)
+        method, path = scope["method"], scope["path"]
+        policy = cache_policy(method, path)
+        if "range" in request_headers:
+            # Partial content (audio seeking): leave it to FileResponse, just label it
+            return await self.app(scope, receive, self._labelled(send, policy))
+
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""))
+        state = {"start": None, "chunks": [], "size": 0, "passthrough": False}
+
+        async def buffered_send(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if "cache-control" not in headers:
+                    # Errors (e.g. a report that isn't built yet) must not stick in caches
+                    headers["Cache-Control"] = policy if message["status"] in (200, 206, 304) else NO_STORE
+                content_type = headers.get("content-type", "")
+                if message["status"] != 200 or "content-encoding" in headers or content_type.startswith("text/event-stream"):
+                    state["passthrough"] = True
+                    await send(message)
+                else:
+                    state["start"] = message
+                return
+            if message["type"] != "http.response.body" or state["passthrough"]:
+                await send(message)
+                return
+
+            state["chunks"].append(message.get("body", b""))
+            state["size"] += len(state["chunks"][-1])
+            if state["size"] > MAX_BUFFER_BYTES:
+                # Too big to hold: send it as it comes, untouched
+                state["passthrough"] = True
+                await send(state["start"])
+                await send({"type": "http.response.body", "body": b"".join(state["chunks"]), "more_body": message.get("more_body", False)})
+                state["chunks"] = []
+                return
+            if not message.get("more_body", False):
+                await self._finish(state["start"], b"".join(state["chunks"]), method, path, request_headers, encoding, send)
+
+        await self.app(scope, receive, buffered_send)
+
+    def _labelled(self, send, policy):
+        async def labelled_send(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if "cache-control" not in headers:
+                    headers["Cache-Control"] = policy
+            await send(message)
+        return labelled_send
+
+    async def _finish(self, start, body: bytes, method: str, path: str, request_headers, encoding, send):
+        headers = MutableHeaders(raw=start["headers"])
+        content_type = headers.get("content-type", "")
+        compressible = content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type
+        if compressible:
+            headers.add_vary_header("Accept-Encoding")
+
+        encoding = encoding if compressible and len(body) >= self.minimum_size else None
+        if method == "GET" and headers["cache-control"] != NO_STORE:
+            digest = self._digest(path, headers.get("etag"), body)
+            suffix = {"br": "-br", "gzip": "-gz"}.get(encoding, "")
+            headers["ETag"] = f'"{digest}{suffix}"'
+            if etag_matches(request_headers.get("if-none-match", ""), digest):
+                not_modified = MutableHeaders()
+                for name in ("etag", "cache-control", "vary", "last-modified"):
+                    if name in headers:
+                        not_modified[name] = headers[name]
+                await send({"type": "http.response.start", "status": 304, "headers": not_modified.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        elif "etag" in headers:
+            del headers["etag"]  # FileResponse's own tag isn't a content hash
+
+        if encoding:
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(body))
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
@@ -1,20 +1,338 @@
 import google.generativeai as genai
 import os
+import sys
+import json
+import time
+import random
+import argparse
+import importlib
+from datetime import datetime
 from dotenv import load_dotenv
 
+from prompts import report_prompt, chat_prompt, email_prompt, swot_batch_prompt, parse_swot_batch, SWOT_RESPONSE_SCHEMA
+
 load_dotenv()
 
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    print("No API Key found")
-    exit()
+# --- Model Listing & Benchmark ---
+#   python list_models.py                       -> models that support generateContent
+#   python list_models.py bench --models gemini-2.5-flash,gemini-2.5-flash-lite --repeats 3
+#   python list_models.py bench --backend fake --fake-speed 50 --output bench.json   (offline / CI)
+# The benchmark runs the production prompt templates (prompts.py) against each model
+# and records time-to-first-token, total latency, output tokens/sec and, for SWOT (one
+# batched, schema-constrained request, as agent.generate_swot sends), the share of
+# competitor cards that come back valid.
+
+
+def list_generate_models():
+    """
+    Names (without the "models/" prefix) of the models that support generateContent.
+    Uses whatever genai.configure() set up.
+    """
+    return [
+        m.name.replace("models/", "", 1)
+        for m in genai.list_models()
+        if 'generateContent' in m.supported_generation_methods
+    ]
+
+
+# --- Prompt suite ---
+
+SAMPLE_RAW_DATA = """
+--- Partner: Zoom ---
+- **Zoom Workplace adds AI Companion 2.0** (https://news.zoom.us/ai-companion) [Date: 2025-11-24T09:00:00Z]: Zoom expanded AI Companion to federated external meetings and added meeting summaries in chat...
+--- Partner: Microsoft Teams ---
+- **Teams Premium gains Copilot whiteboard summaries** (https://news.microsoft.com/teams-copilot) [Date: 2025-11-22T14:00:00Z]: Copilot can now summarize whiteboard sessions and huddles...
+--- Competitor: Smarsh ---
+- **Smarsh launches AI-assisted supervision** (https://www.smarsh.com/press/ai-supervision) [Date: 2025-11-20T10:00:00Z]: New supervision workflows use LLMs to reduce false positives...
+--- Competitor: Behavox ---
+- **Behavox achieves ISO/IEC 42001 certification** (https://www.behavox.com/press/iso-42001) [Date: 2025-11-18T08:00:00Z]: Behavox is among the first compliance vendors certified for AI management systems...
+--- Regulatory: Enforcement ---
+- **SEC fines broker-dealers $63M over off-channel communications** (https://www.sec.gov/news/press-release/2025-150) [Date: 2025-11-19T16:00:00Z]: Twelve firms settled recordkeeping failures involving WhatsApp and iMessage...
+--- Regulatory: Strategy ---
+- **FINRA publishes 2026 oversight report** (https://www.finra.org/rules-guidance/guidance/reports/2026-finra-annual-regulatory-oversight-report) [Date: 2025-11-17T12:00:00Z]: GenAI supervision and communications recordkeeping are highlighted as priorities...
+"""
+
+SAMPLE_REPORT = """# 🚨 TL;DR: The Weekly Pulse
+The SEC fined twelve broker-dealers $63M for off-channel communications while Zoom and Teams pushed AI deeper into meetings.
+
+## Cooperative & Partner Updates
+* **News:** Zoom expanded AI Companion 2.0 to federated external meetings. ([Zoom News](https://news.zoom.us/ai-companion)) [Nov 24, 2025 09:00 AM EST]
+> **💡 Theta Lake Take:** **[Opportunity]** Cross-tenant AI summaries create a capture gap legacy archivers can't close.
+
+## Competitive Intelligence
+* **News:** Behavox achieved ISO/IEC 42001 certification for AI management. ([Behavox](https://www.behavox.com/press/iso-42001)) [Nov 18, 2025 08:00 AM EST]
+> **💡 Theta Lake Take:** **[Threat]** AI governance certifications are becoming table stakes in RFPs.
+
+## Regulatory Radar
+* **Event:** SEC fined twelve broker-dealers $63M over off-channel communications. ([SEC](https://www.sec.gov/news/press-release/2025-150)) [Nov 19, 2025 04:00 PM EST]
+> **💡 Theta Lake Take:** **[Sales Validation]** Every fine is a conversation starter for Unified Capture.
+"""
+
+SAMPLE_NEWS = {
+    "Smarsh": (
+        "Smarsh launched AI-assisted supervision to cut false positives. "
+        "Customers report migration pain from legacy archives. "
+        "Smarsh expanded its partnership with Microsoft for Teams capture."
+    ),
+    "Global Relay": (
+        "Global Relay added capture for WhatsApp and Signal through its own mobile apps. "
+        "It announced a new data center region in Europe."
+    ),
+    "Microsoft Purview": (
+        "Microsoft Purview Communication Compliance added Copilot interaction policies. "
+        "Retention for Teams meeting recordings moved to the E5 compliance add-on."
+    ),
+}
+
+
+def prompt_suite():
+    """
+    (task, prompt, response_schema) triples built from the production templates.
+    """
+    return [
+        ("report", report_prompt("7d", SAMPLE_RAW_DATA), None),
+        ("chat", chat_prompt(SAMPLE_REPORT, "Which item matters most for sales this week and why?"), None),
+        ("email", email_prompt("The SEC fined twelve broker-dealers $63M over off-channel communications.", "Jordan"), None),
+        ("swot", swot_batch_prompt(SAMPLE_NEWS), SWOT_RESPONSE_SCHEMA),
+    ]
+
+
+# --- Backends ---
+# A backend streams one completion: stream(model, prompt, response_schema=None) yields
+# text chunks and returns the output token count (or None to estimate it from the text).
+# prompt is a prompts.Prompt; str(prompt) is the full text for backends without system
+# instructions. response_schema, when given, asks for JSON structured output.
+
+class GeminiBackend:
+    def __init__(self, args):
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise SystemExit("No API Key found")
+        genai.configure(api_key=api_key)
+
+    def models(self):
+        return [n for n in list_generate_models() if n.startswith("gemini-")]
+
+    def stream(self, model: str, prompt, response_schema=None):
+        # Same split as production: static block as system instruction, dynamic part as content
+        config = genai.GenerationConfig(response_mime_type="application/json", response_schema=response_schema) if response_schema else None
+        response = genai.GenerativeModel(model, system_instruction=prompt.static or None).generate_content(
+            prompt.dynamic, stream=True, generation_config=config,
+        )
+        for chunk in response:
+            if chunk.parts:
+                yield chunk.text
+        usage = getattr(response, "usage_metadata", None)
+        return getattr(usage, "candidates_token_count", None) or None
+
+
+class FakeBackend:
+    """
+    Offline stand-in with a deterministic speed profile per model tier, for CI.
+    Canned answers come from fake_providers.gemini_text, so SWOT answers are real JSON
+    (with the odd malformed card); a small seeded share is deliberately truncated, as an
+    answer cut off at the token limit would be, to exercise the validity metric.
+    """
+
+    # tier -> (time to first token seconds, output tokens/sec, share of malformed SWOT answers)
+    PROFILES = {"lite": (0.25, 250, 0.10), "flash": (0.45, 160, 0.05), "pro": (1.2, 70, 0.0)}
+
+    def __init__(self, args):
+        self.speed = args.fake_speed
+        self.seed = args.seed
+        self.calls = 0
+
+    def models(self):
+        return ["gemini-2.5-flash-lite", "gemini-2.5-flash", "gemini-2.5-pro"]
+
+    def _profile(self, model: str):
+        for tier in ("lite", "pro", "flash"):
+            if tier in model:
+                return self.PROFILES[tier]
+        return self.PROFILES["flash"]
+
+    def stream(self, model: str, prompt, response_schema=None):
+        from fake_providers import gemini_text
+
+        self.calls += 1
+        rng = random.Random(f"{self.seed}:{model}:{self.calls}")
+        ttft, tokens_per_second, malformed = self._profile(model)
+        prompt = str(prompt)
+        text = gemini_text(prompt, rng)
+        if "SWOT" in prompt and rng.random() < malformed:
+            text = text[: len(text) // 2]
+
+        time.sleep(ttft * rng.uniform(0.8, 1.2) / self.speed)
+        chunk_size = 64
+        for start in range(0, len(text), chunk_size):
+            chunk = text[start:start + chunk_size]
+            time.sleep(max(len(chunk) // 4, 1) / tokens_per_second / self.speed)
+            yield chunk
+        return None
+
+
+BACKENDS = {"gemini": GeminiBackend, "fake": FakeBackend}
+
+
+def load_backend(name: str, args):
+    """
+    A registered backend name, or "module:Class" for a custom one.
+    """
+    if name in BACKENDS:
+        return BACKENDS[name](args)
+    module_name, _, class_name = name.partition(":")
+    if not class_name:
+        raise SystemExit(f"Unknown backend {name!r}; use one of {', '.join(BACKENDS)} or module:Class")
+    return getattr(importlib.import_module(module_name), class_name)(args)
+
+
+# --- Benchmark ---
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+def run_once(backend, model: str, prompt: str, response_schema=None):
+    """
+    Times one streamed completion. Returns a sample dict.
+    """
+    started = time.perf_counter()
+    first_token = None
+    chunks = []
+    stream = backend.stream(model, prompt, response_schema=response_schema)
+    try:
+        while True:
+            chunk = next(stream)
+            if first_token is None and chunk:
+                first_token = time.perf_counter() - started
+            chunks.append(chunk)
+    except StopIteration as done:
+        tokens = done.value
+    except Exception as e:
+        return {"ok": False, "error": str(e)[:200], "latency": time.perf_counter() - started}
+
+    latency = time.perf_counter() - started
+    text = "".join(chunks)
+    tokens = tokens or max(len(text) // 4, 1)
+    generation_time = latency - (first_token or 0)
+    return {
+        "ok": True,
+        "ttft": first_token if first_token is not None else latency,
+        "latency": latency,
+        "output_tokens": tokens,
+        "tokens_per_second": tokens / generation_time if generation_time > 0 else None,
+        "text": text,
+    }
+
+
+def summarize(task: str, samples):
+    ok = [s for s in samples if s["ok"]]
+    summary = {
+        "runs": len(samples),
+        "errors": len(samples) - len(ok),
+        "ttft_p50": _round(percentile([s["ttft"] for s in ok], 0.5)),
+        "latency_p50": _round(percentile([s["latency"] for s in ok], 0.5)),
+        "latency_p95": _round(percentile([s["latency"] for s in ok], 0.95)),
+        "output_tokens_avg": _round(sum(s["output_tokens"] for s in ok) / len(ok)) if ok else None,
+        "tokens_per_second_avg": _round(
+            sum(s["tokens_per_second"] for s in ok if s["tokens_per_second"]) / len(ok)
+        ) if ok else None,
+    }
+    if task == "swot":
+        competitors = list(SAMPLE_NEWS)
+        valid = sum(
+            1 for s in ok for card in parse_swot_batch(s["text"], competitors).values() if card is not None
+        )
+        summary["card_valid_rate"] = round(valid / (len(samples) * len(competitors)), 3) if samples else None
+    return summary
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
+
+
+def benchmark(backend, models, repeats: int, tasks=None):
+    suite = [(task, prompt, schema) for task, prompt, schema in prompt_suite() if not tasks or task in tasks]
+    results = {}
+    for model in models:
+        results[model] = {}
+        for task, prompt, schema in suite:
+            samples = []
+            for _ in range(repeats):
+                sample = run_once(backend, model, prompt, schema)
+                samples.append(sample)
+                status = f"{sample['latency']:.2f}s" if sample["ok"] else f"error: {sample['error']}"
+                print(f"  {model:<28} {task:<7} {status}", file=sys.stderr)
+            results[model][task] = summarize(task, samples)
+    return results
+
+
+def print_results(results):
+    header = f"{'model':<28}{'task':<8}{'runs':>5}{'err':>5}{'ttft':>8}{'p50':>8}{'p95':>8}{'tok/s':>8}{'valid':>7}"
+    print(header)
+    print("-" * len(header))
+    for model, tasks in results.items():
+        for task, stats in tasks.items():
+            def fmt(value, spec):
+                return format(value, spec) if value is not None else "-"
+            valid = stats.get("card_valid_rate")
+            print(
+                f"{model:<28}{task:<8}{stats['runs']:>5}{stats['errors']:>5}"
+                f"{fmt(stats['ttft_p50'], '>8.2f')}{fmt(stats['latency_p50'], '>8.2f')}"
+                f"{fmt(stats['latency_p95'], '>8.2f')}{fmt(stats['tokens_per_second_avg'], '>8.1f')}"
+                f"{(f'{valid:.0%}' if valid is not None else '-'):>7}"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List Gemini models or benchmark them on Scout's prompts.")
+    subcommands = parser.add_subparsers(dest="command")
+    subcommands.add_parser("list", help="List models that support generateContent (default)")
+    bench = subcommands.add_parser("bench", help="Benchmark models on the production prompt suite")
+    bench.add_argument("--models", help="Comma separated model names (default: every model the backend offers)")
+    bench.add_argument("--tasks", help="Comma separated subset of: report, chat, email, swot")
+    bench.add_argument("--repeats", type=int, default=3)
+    bench.add_argument("--backend", default="gemini", help="gemini, fake, or module:Class")
+    bench.add_argument("--fake-speed", type=float, default=1.0, help="Speed-up factor for the fake backend")
+    bench.add_argument("--seed", type=int, default=42)
+    bench.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    if args.command != "bench":
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            print("No API Key found")
+            exit()
+
+        genai.configure(api_key=api_key)
+
+        print("Available Models:")
+        try:
+            for name in list_generate_models():
+                print(name)
+        except Exception as e:
+            print(f"Error listing models: {e}")
+        return
+
+    backend = load_backend(args.backend, args)
+    models = [m.strip() for m in args.models.split(",")] if args.models else backend.models()
+    tasks = [t.strip() for t in args.tasks.split(",")] if args.tasks else None
+    results = benchmark(backend, models, args.repeats, tasks)
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "generated_at": datetime.now().isoformat(),
+                "backend": args.backend,
+                "repeats": args.repeats,
+                "seed": args.seed,
+                "results": results,
+            }, f, indent=2)
+        print(f"\nResults written to {args.output}")
 
-genai.configure(api_key=api_key)
 
-print("Available Models:")
-try:
-    for m in genai.list_models():
-        if 'generateContent' in m.supported_generation_methods:
-            print(m.name)
-except Exception as e:
-    print(f"Error listing models: {e}")
+if __name__ == "__main__":
+    main()
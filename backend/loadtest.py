@@ -0,0 +1,323 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+
+import requests
+
+from fake_providers import FakeProviders, parse_profiles
+
+# --- Load Test Harness ---
+# Starts the fake providers and the app (uvicorn, in a scratch directory), then
+# drives a weighted mix of endpoints from a fixed number of virtual users and
+# reports throughput, p50/p95/p99 latency and error rate per endpoint.
+# Everything runs on localhost, and the same --seed gives the same workload.
+#
+#   python loadtest.py --users 20 --requests 400 --mix run=1,chat=6,deep_dive=2,generate_pdf=2,audio=1
+#   python loadtest.py --latency gemini=4000:0.8 --error-rate tavily=0.2 --output results.json
+
+DEFAULT_MIX = "run=1,chat=6,deep_dive=2,generate_pdf=2,audio=1"
+ENDPOINTS = ("run", "chat", "deep_dive", "generate_pdf", "audio")
+
+TIME_RANGES = ["24h", "7d", "14d", "30d"]
+PROVIDERS = ["tavily", "exa", "perplexity"]
+QUESTIONS = [
+    "What are the top risks this week?",
+    "Summarize the competitive landscape.",
+    "Which partner updates matter for sales?",
+    "Any new FINRA or SEC enforcement actions?",
+]
+DEEP_DIVE_TOPICS = ["Smarsh AI supervision", "Zoom Workplace archiving", "SEC off-channel fines", "Microsoft Purview eDiscovery"]
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+def parse_mix(spec: str):
+    mix = {}
+    for entry in spec.split(","):
+        name, _, weight = entry.strip().partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# --- Request builders ---
+# Each returns (path, json body) for one call, drawn from the virtual user's RNG.
+
+def build_request(endpoint: str, rng, fixture: dict):
+    if endpoint == "run":
+        return "/api/run", {
+            "timeRange": rng.choice(TIME_RANGES),
+            "searchProvider": rng.choice(PROVIDERS),
+            "searchMode": rng.choice(["fast", "deep"]),
+        }
+    if endpoint == "chat":
+        return "/api/chat", {"report_context": fixture["report"], "user_message": rng.choice(QUESTIONS)}
+    if endpoint == "deep_dive":
+        return "/api/deep_dive", {"topic": rng.choice(DEEP_DIVE_TOPICS)}
+    if endpoint == "generate_pdf":
+        if fixture.get("report_id") and rng.random() < 0.5:
+            return "/api/generate_pdf", {"report_id": fixture["report_id"], "timestamp": "Load test"}
+        return "/api/generate_pdf", {"report_text": fixture["report"], "timestamp": "Load test"}
+    return "/api/audio", {"report_text": fixture["report"]}
+
+
+def is_error(response):
+    if response.status_code >= 400:
+        return True
+    if response.headers.get("content-type", "").startswith("application/json"):
+        try:
+            data = response.json()
+        except ValueError:
+            return True
+        return isinstance(data, dict) and "error" in data
+    return False
+
+
+class LoadTest:
+    def __init__(self, base_url: str, mix: dict, users: int, total_requests: int, duration: float, seed: int, think_time: float, timeout: float):
+        self.base_url = base_url.rstrip("/")
+        self.mix = mix
+        self.users = users
+        self.total_requests = total_requests
+        self.duration = duration
+        self.seed = seed
+        self.think_time = think_time
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.samples = {name: [] for name in mix}
+        self.fixture = {}
+
+    def prepare(self):
+        """
+        Runs one mock scan so chat/pdf/audio calls have a realistic report to work with.
+        """
+        response = requests.post(
+            f"{self.base_url}/api/run",
+            json={"timeRange": "7d", "useMockData": True, "forceLive": True},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        data = response.json()
+        self.fixture = {"report": data.get("report") or "", "report_id": data.get("report_id")}
+
+    def _quota(self, index: int):
+        # Fixed per-user request counts keep each user's call sequence reproducible
+        if not self.total_requests:
+            return None
+        share, extra = divmod(self.total_requests, self.users)
+        return share + (1 if index < extra else 0)
+
+    def _user(self, index: int, deadline):
+        rng = random.Random(f"{self.seed}:user:{index}")
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        session = requests.Session()
+        quota = self._quota(index)
+        issued = 0
+        while (quota is None or issued < quota) and not (deadline and time.monotonic() >= deadline):
+            issued += 1
+            endpoint = rng.choices(names, weights)[0]
+            path, body = build_request(endpoint, rng, self.fixture)
+            started = time.monotonic()
+            try:
+                response = session.post(f"{self.base_url}{path}", json=body, timeout=self.timeout)
+                status = response.status_code
+                failed = is_error(response)
+            except requests.RequestException:
+                status = None
+                failed = True
+            elapsed = time.monotonic() - started
+            with self.lock:
+                self.samples[endpoint].append((elapsed, status, failed))
+            if self.think_time:
+                time.sleep(rng.expovariate(1 / self.think_time))
+
+    def run(self):
+        deadline = time.monotonic() + self.duration if self.duration and not self.total_requests else None
+        started = time.monotonic()
+        threads = [threading.Thread(target=self._user, args=(i, deadline), daemon=True) for i in range(self.users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.monotonic() - started
+
+    def summary(self, elapsed: float):
+        endpoints = {}
+        all_latencies = []
+        all_errors = 0
+        for name, samples in self.samples.items():
+            latencies = [s[0] for s in samples]
+            errors = sum(1 for s in samples if s[2])
+            statuses = {}
+            for _, status, _ in samples:
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+            all_latencies += latencies
+            all_errors += errors
+            endpoints[name] = {
+                "requests": len(samples),
+                "throughput_rps": round(len(samples) / elapsed, 3) if elapsed else None,
+                "p50": _round(percentile(latencies, 0.5)),
+                "p95": _round(percentile(latencies, 0.95)),
+                "p99": _round(percentile(latencies, 0.99)),
+                "error_rate": round(errors / len(samples), 4) if samples else None,
+                "rejected_429": statuses.get("429", 0),
+                "statuses": statuses,
+            }
+        return {
+            "elapsed_seconds": round(elapsed, 2),
+            "total": {
+                "requests": len(all_latencies),
+                "throughput_rps": round(len(all_latencies) / elapsed, 3) if elapsed else None,
+                "p50": _round(percentile(all_latencies, 0.5)),
+                "p95": _round(percentile(all_latencies, 0.95)),
+                "p99": _round(percentile(all_latencies, 0.99)),
+                "error_rate": round(all_errors / len(all_latencies), 4) if all_latencies else None,
+            },
+            "endpoints": endpoints,
+        }
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
+
+
+def print_summary(summary: dict):
+    print(f"\nElapsed: {summary['elapsed_seconds']}s")
+    header = f"{'endpoint':<14}{'reqs':>7}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>9}{'429s':>7}"
+    print(header)
+    print("-" * len(header))
+    rows = list(summary["endpoints"].items()) + [("TOTAL", summary["total"])]
+    for name, stats in rows:
+        def fmt(value, spec):
+            return format(value, spec) if value is not None else "-"
+        error_rate = stats["error_rate"]
+        print(
+            f"{name:<14}{stats['requests']:>7}{fmt(stats['throughput_rps'], '>9.2f')}"
+            f"{fmt(stats['p50'], '>9.3f')}{fmt(stats['p95'], '>9.3f')}{fmt(stats['p99'], '>9.3f')}"
+            f"{(f'{error_rate:.1%}' if error_rate is not None else '-'):>9}{stats.get('rejected_429', ''):>7}"
+        )
+
+
+# Background work that would compete with the measured traffic (and, for prefetch, spend calls)
+HARNESS_ENV = {
+    "SCOUT_PREWARM_ENABLED": "false",
+    "SCOUT_PREFETCH_ENABLED": "false",
+}
+
+
+def start_app(env: dict, port: int, workdir: str, log_path: str):
+    """
+    Launches the app with uvicorn in workdir (so runs/, reports/ and artifacts/ stay out of the tree).
+    """
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    log = open(log_path, "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", backend_dir,
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        if process.poll() is not None:
+            raise RuntimeError(f"App exited during startup, see {log_path}")
+        try:
+            if requests.get(f"{base_url}/health", timeout=1).ok:
+                return process, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"App did not become healthy, see {log_path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the Scout API against local provider stand-ins.")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--requests", type=int, default=200, help="Total requests (0 = run for --duration)")
+    parser.add_argument("--duration", type=float, default=0, help="Seconds to run when --requests is 0")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Endpoint weights (default {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--think-time", type=float, default=0.5, help="Mean seconds between a user's requests")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--latency", action="append", default=[], metavar="PROVIDER=MEDIAN_MS[:SIGMA]",
+                        help="Fake provider latency (providers: tavily, exa, perplexity, gemini, tts)")
+    parser.add_argument("--error-rate", action="append", default=[], metavar="PROVIDER=RATE")
+    parser.add_argument("--app-url", help="Target an already running app instead of starting one")
+    parser.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra environment for the launched app, e.g. SCOUT_INTERACTIVE_CONCURRENCY=8")
+    parser.add_argument("--output", help="Write the JSON summary here")
+    parser.add_argument("--keep-workdir", action="store_true", help="Keep the app's work dir (runs, reports, app.log)")
+    args = parser.parse_args(argv)
+
+    if not args.requests and not args.duration:
+        parser.error("set --requests or --duration")
+
+    fakes = FakeProviders(parse_profiles(args.latency, args.error_rate), seed=args.seed).start()
+    process = None
+    workdir = tempfile.mkdtemp(prefix="scout-loadtest-")
+    try:
+        if args.app_url:
+            base_url = args.app_url
+        else:
+            env = {**os.environ, **fakes.env(), **HARNESS_ENV}
+            env.update(item.partition("=")[::2] for item in args.app_env)
+            process, base_url = start_app(env, free_port(), workdir, os.path.join(workdir, "app.log"))
+            print(f"App running at {base_url} (workdir {workdir}), fake providers at {fakes.base_url}")
+
+        test = LoadTest(base_url, parse_mix(args.mix), args.users, args.requests, args.duration, args.seed, args.think_time, args.timeout)
+        test.prepare()
+        elapsed = test.run()
+        summary = test.summary(elapsed)
+        summary["config"] = {
+            "users": args.users, "requests": args.requests, "duration": args.duration,
+            "mix": test.mix, "seed": args.seed, "think_time": args.think_time,
+        }
+        summary["providers"] = fakes.stats()
+        try:
+            summary["admission"] = requests.get(f"{base_url}/api/admission/metrics", timeout=5).json()
+        except (requests.RequestException, ValueError):
+            pass
+
+        print_summary(summary)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+            print(f"\nSummary written to {args.output}")
+        return summary
+    finally:
+        if process:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        fakes.stop()
+        if args.keep_workdir:
+            print(f"Work dir kept at {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
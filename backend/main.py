@@ -1,11 +1,23 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel
 from typing import Optional
+from contextlib import asynccontextmanager
 import time
 
 from fastapi.middleware.cors import CORSMiddleware
+from http_cache import HttpCacheMiddleware
+from profiling import ProfilingMiddleware
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background regeneration of the standard report windows (off unless SCOUT_PREWARM_ENABLED=true)
+    if PREWARM_ENABLED:
+        prewarm.start()
+    yield
+    prewarm.stop()
+    prefetcher.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,11 +27,36 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# Compress JSON payloads (reports, sections, battlecards) above 1KB, tag GET responses
+# with strong ETags (304 on If-None-Match) and set Cache-Control per endpoint class
+app.add_middleware(HttpCacheMiddleware, minimum_size=1000)
+
+# Opt-in per-request profiling (admin header or SCOUT_PROFILE_PATHS), see profiling.py
+app.add_middleware(ProfilingMiddleware)
+
 class ScoutConfig(BaseModel):
     timeRange: str
     searchProvider: str = "tavily"
     useMockData: bool = False
     searchMode: str = "deep" # "fast" or "deep"
+    runId: Optional[str] = None # Pass a previous run_id to resume an interrupted scan
+    forceLive: bool = False # Skip the prewarmed report and run a live scan
+
+class WindowScanConfig(BaseModel):
+    timeRanges: list[str] # e.g. ["24h", "7d", "30d"]; one sweep of the widest, narrower ones filtered locally
+    searchProvider: str = "tavily"
+    useMockData: bool = False
+    searchMode: str = "deep"
+    runId: Optional[str] = None
+
+class BatchScanRequest(BaseModel):
+    configs: list[ScoutConfig]
+    deriveWindows: bool = False # Configs differing only in timeRange share one sweep of the widest window
+    batchId: Optional[str] = None # Pass a previous batch_id to resume an interrupted batch
+
+class WatchlistTarget(BaseModel):
+    name: str
+    kind: str # "partner" or "competitor"
 
 class ChatRequest(BaseModel):
     report_context: str
@@ -34,69 +71,413 @@ class DeepDiveRequest(BaseModel):
     searchProvider: str = "tavily"
 
 class AudioRequest(BaseModel):
-    report_text: str
+    report_text: str = ""
+    report_id: Optional[str] = None # Serve (or build and keep) the briefing for a stored report
 
 class BattlecardRequest(BaseModel):
     competitors: list[str]
+    report_id: Optional[str] = None # Serve cards prefetched for this report when available
 
 from fastapi.responses import FileResponse
 from agent import run_agent, chat_with_report, generate_sales_email, deep_dive_search, generate_audio_summary, generate_swot, generate_pdf
+from agent import SEARCH_PROVIDERS, FALLBACK_PROVIDERS, provider_configured, discover_targets, router
+from spool import new_run_id
+from circuit_breaker import breaker_states
+from singleflight import SingleFlight
+from report_model import load_report, report_exists, report_summary, get_section, get_item, filter_sections
+from scheduler import prewarm, PREWARM_ENABLED
+from windows import run_agent_windows
+from batch import run_batch
+from watchlist import watchlist, ADAPTIVE_POLLING, WATCHLIST_BUDGET
+from admission import admission
+from profiling import run_in_threadpool, is_admin, ADMIN_TOKEN, list_profiles, load_profile, profile_path
+from starlette.background import BackgroundTask
+from artifacts import artifact_path, has_artifact, build_pdf, build_audio, build_battlecards, load_battlecards, PDF, AUDIO
+from prefetch import prefetcher
+from retention import retention
+from archive import archive
 import os
+import tempfile
+
+# Identical concurrent scans share one run_agent call (and its result for a short window)
+scan_flight = SingleFlight()
+
+def scan_key(config: ScoutConfig):
+    return (config.timeRange, config.searchProvider, config.searchMode, config.useMockData, config.runId)
+
+def execute_scan(config: ScoutConfig, run_id: str):
+    report_text = run_agent(config.timeRange, config.searchProvider, config.useMockData, config.searchMode, run_id=run_id)
+    report_id = run_id if report_exists(run_id) else None
+    pdf_url = None
+    if report_id:
+        # Each report gets its own PDF, so concurrent scans never serve each other's file
+        try:
+            build_pdf(report_id, report_text)
+            pdf_url = f"/api/artifacts/{report_id}/pdf"
+        except Exception as e:
+            print(f"PDF Generation failed for {report_id}: {e}")
+    return {"report": report_text, "run_id": run_id, "report_id": report_id, "pdf_url": pdf_url}
+
+def scan_succeeded(result):
+    return not result["report"].startswith("Error")
+
+async def coalesced_scan(endpoint_class: str, key, fn, *args, cache_if=None):
+    """
+    Joins an identical in-flight (or just finished) scan if there is one; otherwise
+    starts it. Only the scan itself waits for an admission slot, so identical
+    requests queued behind it don't each hold one.
+    """
+    result = await scan_flight.do(key, fn, *args, cache_if=cache_if, gate=lambda: admission.slot(endpoint_class))
+    # Every scan leaves a run behind; drop expired ones in the background
+    retention.maybe_prune()
+    return result
+
+def prewarmed_response(config: ScoutConfig):
+    """
+    Returns the freshest prewarmed report for this config, if one can be served.
+    """
+    if not PREWARM_ENABLED or config.forceLive or config.runId or config.useMockData:
+        return None
+    version = prewarm.latest(config.timeRange, config.searchProvider, config.searchMode)
+    if not version:
+        return None
+    report = load_report(version["report_id"])
+    if not report:
+        return None
+    report_id = version["report_id"]
+    return {
+        "report": report["markdown"],
+        "pdf_url": f"/api/artifacts/{report_id}/pdf" if PDF in version["artifacts"] else None,
+        "audio_url": f"/api/artifacts/{report_id}/audio" if AUDIO in version["artifacts"] else None,
+        "run_id": report_id,
+        "report_id": report_id,
+        "prewarmed": True,
+        "generated_at": version["generated_at"],
+    }
 
 @app.post("/api/run")
 async def run_scout(config: ScoutConfig):
-    report_text = run_agent(config.timeRange, config.searchProvider, config.useMockData, config.searchMode)
-    return {"report": report_text, "pdf_url": "/api/report/pdf"}
+    cached = prewarmed_response(config)
+    if cached:
+        prefetcher.submit(cached["report_id"], cached["report"])
+        return {**cached, "artifacts_url": f"/api/artifacts/{cached['report_id']}"}
+
+    result, coalesced = await coalesced_scan(
+        "scan", scan_key(config), execute_scan, config, config.runId or new_run_id(), cache_if=scan_succeeded
+    )
+    report_id = result["report_id"]
+    # Users usually listen next: start building the audio briefing in the background
+    prefetcher.submit(report_id, result["report"], config.useMockData)
+    return {
+        "report": result["report"],
+        "pdf_url": result["pdf_url"],
+        "run_id": result["run_id"],
+        "report_id": report_id,
+        "artifacts_url": f"/api/artifacts/{report_id}" if report_id else None,
+        "coalesced": coalesced,
+    }
+
+def execute_window_scan(config: WindowScanConfig, run_id: str):
+    reports = run_agent_windows(config.timeRanges, config.searchProvider, config.useMockData, config.searchMode, run_id=run_id)
+    return {"run_id": run_id, "reports": reports}
+
+@app.post("/api/run/windows")
+async def run_scout_windows(config: WindowScanConfig):
+    key = ("windows", tuple(sorted(set(config.timeRanges))), config.searchProvider, config.searchMode, config.useMockData, config.runId)
+    result, coalesced = await coalesced_scan(
+        "scan", key, execute_window_scan, config, config.runId or new_run_id(),
+        cache_if=lambda r: not isinstance(r["reports"], str),
+    )
+    if isinstance(result["reports"], str):
+        raise HTTPException(status_code=400, detail=result["reports"])
+    for report in result["reports"].values():
+        prefetcher.submit(report["report_id"], report["report"], config.useMockData)
+    return {"run_id": result["run_id"], "reports": result["reports"], "coalesced": coalesced}
+
+def execute_batch(request: BatchScanRequest, batch_id: str):
+    configs = [
+        {
+            "timeRange": c.timeRange,
+            "searchProvider": c.searchProvider,
+            "useMockData": c.useMockData,
+            "searchMode": c.searchMode,
+        }
+        for c in request.configs
+    ]
+    return run_batch(configs, batch_id, derive_windows=request.deriveWindows)
+
+@app.post("/api/batch")
+async def run_batch_scan(request: BatchScanRequest):
+    key = ("batch", tuple(scan_key(c) for c in request.configs), request.deriveWindows, request.batchId)
+    result, coalesced = await coalesced_scan(
+        "batch", key, execute_batch, request, request.batchId or new_run_id(),
+        cache_if=lambda r: not isinstance(r, str),
+    )
+    if isinstance(result, str):
+        raise HTTPException(status_code=400, detail=result)
+    return {**result, "coalesced": coalesced}
+
+@app.get("/api/watchlist")
+async def get_watchlist():
+    discover_targets() # Make sure the built-in targets are seeded
+    return {
+        "adaptive_polling": ADAPTIVE_POLLING,
+        "budget": WATCHLIST_BUDGET,
+        "targets": watchlist.targets(),
+        "next_scan": watchlist.schedule(),
+    }
+
+@app.post("/api/watchlist")
+async def add_watchlist_target(target: WatchlistTarget):
+    discover_targets()
+    try:
+        return watchlist.add(target.name, target.kind)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.delete("/api/watchlist/{name}")
+async def remove_watchlist_target(name: str):
+    if not watchlist.remove(name):
+        raise HTTPException(status_code=404, detail="Target not found")
+    return {"removed": name}
+
+@app.get("/api/prewarm/status")
+async def prewarm_status():
+    return prewarm.status()
+
+@app.get("/api/artifacts/{report_id}")
+async def get_artifacts(report_id: str):
+    require_report(report_id)
+    return prefetcher.artifacts(report_id)
+
+@app.get("/api/artifacts/{report_id}/battlecards")
+async def get_artifact_battlecards(report_id: str):
+    cards = load_battlecards(report_id)
+    if not cards:
+        raise HTTPException(status_code=404, detail="Battlecards not found")
+    return {"cards": cards}
+
+@app.get("/api/artifacts/{report_id}/pdf")
+async def get_artifact_pdf(report_id: str):
+    if not has_artifact(report_id, PDF):
+        raise HTTPException(status_code=404, detail="PDF not found")
+    return FileResponse(artifact_path(report_id, PDF), media_type="application/pdf", filename="DCGA_Scout_Report.pdf")
+
+@app.get("/api/artifacts/{report_id}/audio")
+async def get_artifact_audio(report_id: str):
+    if not has_artifact(report_id, AUDIO):
+        raise HTTPException(status_code=404, detail="Audio briefing not found")
+    return FileResponse(artifact_path(report_id, AUDIO), media_type="audio/mpeg", filename="briefing.mp3")
+
+def require_report(report_id: str):
+    report = load_report(report_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return report
+
+@app.get("/api/reports/{report_id}")
+async def get_report(report_id: str):
+    return report_summary(require_report(report_id))
+
+@app.get("/api/reports/{report_id}/sections/{section_id}")
+async def get_report_section(report_id: str, section_id: str, offset: int = 0, limit: int = 20):
+    section = get_section(require_report(report_id), section_id)
+    if not section:
+        raise HTTPException(status_code=404, detail="Section not found")
+    offset = max(offset, 0)
+    limit = min(max(limit, 1), 100)
+    items = section["items"][offset:offset + limit]
+    return {
+        "id": section["id"],
+        "key": section["key"],
+        "title": section["title"],
+        "summary": section["summary"],
+        "items": items,
+        "offset": offset,
+        "limit": limit,
+        "total": len(section["items"]),
+        "next_offset": offset + limit if offset + limit < len(section["items"]) else None,
+    }
+
+@app.get("/api/reports/{report_id}/sections/{section_id}/items/{item_id}")
+async def get_report_item(report_id: str, section_id: str, item_id: str):
+    item = get_item(require_report(report_id), section_id, item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return item
+
+@app.get("/api/archive/search")
+async def search_archive(q: str = "", entity: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None, scope: str = "all", limit: int = 20):
+    """
+    Full-text search over every archived report item and search result. No provider is called.
+    """
+    started = time.perf_counter()
+    try:
+        results = await run_in_threadpool(archive.search, q, entity, since, until, scope, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"query": q, "results": results, "took_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+@app.get("/api/archive/trends")
+async def archive_trends(entity: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None, bucket: str = "week"):
+    """
+    Mentions per entity (comma separated, default all) per day/week/month, from the archive.
+    """
+    entities = [e.strip() for e in entity.split(",") if e.strip()] if entity else None
+    try:
+        series = await run_in_threadpool(archive.trends, entities, since, until, bucket)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"bucket": bucket, "series": series}
+
+@app.get("/api/archive/entities")
+async def archive_entities():
+    return {"entities": await run_in_threadpool(archive.entities)}
+
+@app.get("/api/archive/status")
+async def archive_status():
+    return await run_in_threadpool(archive.stats)
 
 @app.post("/api/chat")
 async def chat(request: ChatRequest):
-    response = chat_with_report(request.report_context, request.user_message)
+    async with admission.slot("interactive"):
+        response = await run_in_threadpool(chat_with_report, request.report_context, request.user_message)
     return {"response": response}
 
 @app.post("/api/draft_email")
 async def draft_email(request: EmailRequest):
-    email = generate_sales_email(request.insight_text, request.recipient_name)
+    async with admission.slot("interactive"):
+        email = await run_in_threadpool(generate_sales_email, request.insight_text, request.recipient_name)
     return {"email": email}
 
 @app.post("/api/deep_dive")
 async def deep_dive(request: DeepDiveRequest):
-    summary = deep_dive_search(request.topic, request.searchProvider)
+    async with admission.slot("research"):
+        summary = await run_in_threadpool(deep_dive_search, request.topic, request.searchProvider)
     return {"summary": summary}
 
 @app.post("/api/audio")
 async def generate_audio(request: AudioRequest):
-    audio_path = generate_audio_summary(request.report_text)
-    return FileResponse(audio_path, media_type="audio/mpeg", filename="briefing.mp3")
+    if request.report_id:
+        report = require_report(request.report_id)
+        if not has_artifact(request.report_id, AUDIO):
+            async with admission.slot("artifact"):
+                # Build into the report's artifacts so later requests (and the prefetcher) reuse it
+                await run_in_threadpool(build_audio, request.report_id, request.report_text or report["markdown"])
+        if has_artifact(request.report_id, AUDIO):
+            return FileResponse(artifact_path(request.report_id, AUDIO), media_type="audio/mpeg", filename="briefing.mp3")
+        return FileResponse("error.mp3", media_type="audio/mpeg", filename="briefing.mp3")
+
+    async with admission.slot("artifact"):
+        # Each request gets its own file now that briefings can be generated concurrently
+        fd, audio_filename = tempfile.mkstemp(prefix="briefing_", suffix=".mp3")
+        os.close(fd)
+        audio_path = await run_in_threadpool(generate_audio_summary, request.report_text, audio_filename)
+    if audio_path != audio_filename:
+        os.remove(audio_filename)
+        return FileResponse(audio_path, media_type="audio/mpeg", filename="briefing.mp3")
+    return FileResponse(audio_path, media_type="audio/mpeg", filename="briefing.mp3", background=BackgroundTask(os.remove, audio_path))
 
 @app.post("/api/battlecards")
 async def battlecards(request: BattlecardRequest):
-    cards = generate_swot(request.competitors)
+    if request.report_id:
+        require_report(request.report_id)
+        prebuilt = load_battlecards(request.report_id)
+        if all(c in prebuilt for c in request.competitors):
+            return {"cards": {c: prebuilt[c] for c in request.competitors}, "prebuilt": True}
+        async with admission.slot("research"):
+            # Build into the report's artifacts so reopening the battlecards reuses them
+            stored = await run_in_threadpool(build_battlecards, request.report_id, request.competitors)
+        return {"cards": {c: stored.get(c, {"error": "Failed to generate battlecard"}) for c in request.competitors}}
+    async with admission.slot("research"):
+        cards = await run_in_threadpool(generate_swot, request.competitors)
     return {"cards": cards}
 
 class PDFRequest(BaseModel):
-    report_text: str
-    sections: list[str]
+    report_text: str = ""
+    sections: list[str] = []
     timestamp: str
+    report_id: Optional[str] = None # Use the stored report instead of re-sending report_text
 
 @app.post("/api/generate_pdf")
 async def generate_pdf_endpoint(request: PDFRequest):
-    pdf_filename = "dcga_report_custom.pdf"
-    try:
-        # Generate PDF with custom sections and timestamp
-        generate_pdf(request.report_text, pdf_filename, request.sections, request.timestamp)
-        
-        if os.path.exists(pdf_filename):
-            return FileResponse(pdf_filename, media_type="application/pdf", filename="DCGA_Scout_Report.pdf")
-        return {"error": "Failed to generate PDF"}
-    except Exception as e:
-        return {"error": str(e)}
-
-@app.get("/api/report/pdf")
-async def get_report_pdf():
-    file_path = "dcga_report_v2.pdf"
-    if os.path.exists(file_path):
-        return FileResponse(file_path, media_type="application/pdf", filename="dcga_report_v2.pdf")
-    return {"error": "Report not found"}
+    report = require_report(request.report_id) if request.report_id else None
+    async with admission.slot("artifact"):
+        # Each request gets its own file now that exports can run concurrently
+        fd, pdf_filename = tempfile.mkstemp(prefix="dcga_report_custom_", suffix=".pdf")
+        os.close(fd)
+        try:
+            # Generate PDF with custom sections and timestamp
+            if report:
+                await run_in_threadpool(generate_pdf, filter_sections(report, request.sections), pdf_filename, None, request.timestamp)
+            else:
+                await run_in_threadpool(generate_pdf, request.report_text, pdf_filename, request.sections, request.timestamp)
+        except Exception as e:
+            os.remove(pdf_filename)
+            return {"error": str(e)}
+
+    if os.path.getsize(pdf_filename):
+        return FileResponse(pdf_filename, media_type="application/pdf", filename="DCGA_Scout_Report.pdf", background=BackgroundTask(os.remove, pdf_filename))
+    os.remove(pdf_filename)
+    return {"error": "Failed to generate PDF"}
+
+@app.get("/api/providers/status")
+async def providers_status():
+    return {
+        "breakers": {name: state for name, state in breaker_states().items() if name in SEARCH_PROVIDERS},
+        "configured": {p: provider_configured(p) for p in SEARCH_PROVIDERS},
+        "fallback_order": FALLBACK_PROVIDERS,
+    }
+
+@app.get("/api/models/status")
+async def models_status():
+    if not router:
+        return {"configured": False}
+    breakers = {name: state for name, state in breaker_states().items() if name.startswith("gemini:")}
+    return {"configured": True, **router.status(), "breakers": breakers}
+
+@app.get("/api/admission/metrics")
+async def admission_metrics():
+    return {**admission.metrics(), "coalescing": scan_flight.stats()}
+
+def require_admin(request: Request):
+    # Profiling is off without a configured token, so the endpoints don't exist either
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin(request.scope["headers"]):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+def require_profile(profile_id: str):
+    profile = load_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+@app.get("/api/profiles")
+async def get_profiles(request: Request):
+    require_admin(request)
+    return {"profiles": list_profiles()}
+
+@app.get("/api/profiles/{profile_id}")
+async def get_profile(profile_id: str, request: Request):
+    require_admin(request)
+    return require_profile(profile_id)
+
+@app.get("/api/profiles/{profile_id}/collapsed")
+async def get_profile_collapsed(profile_id: str, request: Request):
+    # Collapsed stacks: feed to flamegraph.pl or drop into speedscope.app
+    require_admin(request)
+    require_profile(profile_id)
+    return FileResponse(profile_path(profile_id, "collapsed"), media_type="text/plain", filename=f"{profile_id}.collapsed")
+
+@app.get("/api/profiles/{profile_id}/pstats")
+async def get_profile_pstats(profile_id: str, request: Request):
+    # cProfile output: open with pstats, snakeviz or gprof2dot
+    require_admin(request)
+    require_profile(profile_id)
+    if not os.path.exists(profile_path(profile_id, "prof")):
+        raise HTTPException(status_code=404, detail="No deterministic profile was recorded for this request")
+    return FileResponse(profile_path(profile_id, "prof"), media_type="application/octet-stream", filename=f"{profile_id}.prof")
 
 @app.get("/health")
 async def health_check():
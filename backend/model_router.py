@@ -0,0 +1,252 @@
+import os
+import time
+import threading
+from collections import deque
+from datetime import timedelta
+
+import google.generativeai as genai
+
+from circuit_breaker import get_breaker
+from prompts import Prompt
+
+# --- Task-aware Model Router ---
+# Each LLM task declares how latency-sensitive it is and the minimum model quality it
+# needs. Interactive tasks (chat, email, deep dive, audio script) go to the fastest
+# adequate model; background tasks (report synthesis, SWOT) go to the best adequate
+# model. Observed latency (per model and task) and error rates steer the choice, a
+# per-model circuit breaker skips failing models, and a failed call falls through to
+# the next candidate.
+# Comma separated model names; "auto" discovers them with list_models.py
+GEMINI_MODELS = os.getenv("SCOUT_GEMINI_MODELS", "gemini-2.5-flash")
+# Discovered models whose name contains one of these can't answer text prompts
+# (speech / image generation variants, embeddings), so "auto" never routes to them
+AUTO_EXCLUDED = ("tts", "image", "embedding")
+DEFAULT_MODEL = os.getenv("SCOUT_DEFAULT_MODEL", "gemini-2.5-flash")
+LATENCY_SMOOTHING = float(os.getenv("SCOUT_ROUTER_SMOOTHING", "0.3"))  # EWMA weight of the newest sample
+ERROR_PENALTY = float(os.getenv("SCOUT_ROUTER_ERROR_PENALTY", "4"))  # Expected latency x (1 + penalty x error rate)
+ERROR_WINDOW = 20
+
+# Static prompt blocks at least this long are uploaded once as Gemini cached content
+# (explicit caching needs ~1k+ tokens); shorter ones are sent as a system instruction,
+# which Gemini 2.5's implicit prefix caching can still reuse.
+PROMPT_CACHE = os.getenv("SCOUT_PROMPT_CACHE", "true").lower() == "true"
+PROMPT_CACHE_MIN_CHARS = int(os.getenv("SCOUT_PROMPT_CACHE_MIN_CHARS", "4000"))
+PROMPT_CACHE_TTL_MINUTES = float(os.getenv("SCOUT_PROMPT_CACHE_TTL_MINUTES", "60"))
+PROMPT_CACHE_REFRESH_SECONDS = 120  # Recreate a cache this long before it expires
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# Model quality tiers, matched against the model name (first match wins)
+BASIC, STANDARD, HIGH = 1, 2, 3
+QUALITY_PATTERNS = [("lite", BASIC), ("8b", BASIC), ("pro", HIGH), ("flash", STANDARD)]
+# Latency guess (seconds) for a model that hasn't been used yet, by quality tier
+PRIOR_LATENCY = {BASIC: 2.0, STANDARD: 4.0, HIGH: 10.0}
+
+# task -> (latency class, minimum quality)
+TASKS = {
+    "report": (BACKGROUND, HIGH),
+    "swot": (BACKGROUND, STANDARD),
+    "deep_dive": (INTERACTIVE, STANDARD),
+    "chat": (INTERACTIVE, STANDARD),
+    "audio_script": (INTERACTIVE, BASIC),
+    "email": (INTERACTIVE, BASIC),
+}
+
+
+def model_quality(name: str):
+    lowered = name.lower()
+    for pattern, quality in QUALITY_PATTERNS:
+        if pattern in lowered:
+            return quality
+    return STANDARD
+
+
+def configured_models():
+    """
+    Model names from SCOUT_GEMINI_MODELS ("auto" asks the API which Gemini text models can generate content).
+    """
+    if GEMINI_MODELS.strip().lower() == "auto":
+        from list_models import list_generate_models
+        names = [
+            n for n in list_generate_models()
+            if n.startswith("gemini-") and not any(word in n.lower() for word in AUTO_EXCLUDED)
+        ]
+        return names or [DEFAULT_MODEL]
+    return [m.strip() for m in GEMINI_MODELS.split(",") if m.strip()] or [DEFAULT_MODEL]
+
+
+class ModelStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.quality = model_quality(name)
+        self.latency = {}  # task -> EWMA seconds
+        self.outcomes = deque(maxlen=ERROR_WINDOW)
+        self.calls = 0
+
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for ok in self.outcomes if not ok) / len(self.outcomes)
+
+    def expected_latency(self, task: str, peers):
+        if task in self.latency:
+            return self.latency[task]
+        # Not used for this task yet: scale the other models' latency on it by the tier priors
+        ratios = [p.latency[task] / PRIOR_LATENCY[p.quality] for p in peers if task in p.latency]
+        if ratios:
+            return PRIOR_LATENCY[self.quality] * sum(ratios) / len(ratios)
+        return PRIOR_LATENCY[self.quality]
+
+    def score(self, task: str, peers):
+        return self.expected_latency(task, peers) * (1 + ERROR_PENALTY * self.error_rate())
+
+    def record(self, task: str, ok: bool, latency: float):
+        self.calls += 1
+        self.outcomes.append(ok)
+        if ok:
+            previous = self.latency.get(task)
+            self.latency[task] = latency if previous is None else (
+                LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * previous
+            )
+
+    def snapshot(self):
+        return {
+            "quality": self.quality,
+            "calls": self.calls,
+            "error_rate": round(self.error_rate(), 3),
+            "latency": {task: round(value, 3) for task, value in self.latency.items()},
+        }
+
+
+class ModelRouter:
+    """
+    Routes each LLM task to one of the configured Gemini models.
+    """
+
+    def __init__(self, model_names):
+        self.lock = threading.Lock()
+        self.cache_lock = threading.Lock()
+        self.stats = {name: ModelStats(name) for name in model_names}
+        self.models = {}  # (model name, template version) -> (GenerativeModel, cache expiry or None)
+        self.uncacheable = set()
+        self.cache_stats = {"created": 0, "failed": 0}
+
+    def _model(self, name: str, template=None):
+        """
+        The GenerativeModel for a model name, bound to a template's static block if given.
+        """
+        key = (name, template.version if template else None)
+        with self.lock:
+            entry = self.models.get(key)
+        if entry and (entry[1] is None or time.monotonic() < entry[1]):
+            return entry[0]
+
+        with self.cache_lock:
+            entry = self.models.get(key)
+            if entry and (entry[1] is None or time.monotonic() < entry[1]):
+                return entry[0]
+            if template is None:
+                entry = (genai.GenerativeModel(name), None)
+            else:
+                entry = self._cached_model(name, template) or (
+                    genai.GenerativeModel(name, system_instruction=template.static), None
+                )
+            with self.lock:
+                self.models[key] = entry
+            return entry[0]
+
+    def _cached_model(self, name: str, template):
+        """
+        Uploads the template's static block as cached content. Returns (model, expiry) or None.
+        """
+        cache_key = (name, template.version)
+        if not PROMPT_CACHE or len(template.static) < PROMPT_CACHE_MIN_CHARS or cache_key in self.uncacheable:
+            return None
+        try:
+            cache = genai.caching.CachedContent.create(
+                model=name,
+                display_name=f"scout-{template.name}-{template.version}",
+                system_instruction=template.static,
+                ttl=timedelta(minutes=PROMPT_CACHE_TTL_MINUTES),
+            )
+        except Exception as e:
+            # Model without caching support, prompt under the token minimum, quota...
+            print(f"DEBUG: Prompt cache for {template.name} on {name} unavailable, using system instruction: {e}")
+            self.uncacheable.add(cache_key)
+            self.cache_stats["failed"] += 1
+            return None
+        print(f"DEBUG: Cached {template.name} prompt on {name} as {cache.name}")
+        self.cache_stats["created"] += 1
+        expires_at = time.monotonic() + max(PROMPT_CACHE_TTL_MINUTES * 60 - PROMPT_CACHE_REFRESH_SECONDS, 0)
+        return genai.GenerativeModel.from_cached_content(cached_content=cache), expires_at
+
+    def candidates(self, task: str):
+        """
+        Model names in the order they should be tried for the task.
+        """
+        latency_class, min_quality = TASKS[task]
+        with self.lock:
+            stats = list(self.stats.values())
+        adequate = [s for s in stats if s.quality >= min_quality]
+        fallback = [s for s in stats if s.quality < min_quality]
+        if latency_class == INTERACTIVE:
+            adequate.sort(key=lambda s: s.score(task, stats))
+        else:
+            # Best quality first; among equals, the faster / healthier one
+            adequate.sort(key=lambda s: (-s.quality, s.score(task, stats)))
+        # No adequate model left: use the best of the rest
+        fallback.sort(key=lambda s: (-s.quality, s.score(task, stats)))
+        return [s.name for s in adequate + fallback]
+
+    def generate(self, task: str, prompt, **kwargs):
+        """
+        Runs generate_content on the best available model for the task,
+        falling through to the next candidate on failure. A prompts.Prompt sends
+        only its dynamic part; the static block is bound to the model.
+        """
+        last_error = None
+        candidates = self.candidates(task)
+        template = prompt.template if isinstance(prompt, Prompt) and prompt.static else None
+        contents = prompt.dynamic if template else str(prompt)
+        for name in candidates:
+            breaker = get_breaker(f"gemini:{name}")
+            if not breaker.allow():
+                continue
+            started = time.monotonic()
+            try:
+                response = self._model(name, template).generate_content(contents, **kwargs)
+                response.text  # Blocked or empty responses raise here
+            except Exception as e:
+                latency = time.monotonic() - started
+                # Latency is judged per task by the router, so the breaker only sees errors
+                breaker.record(False, 0.0)
+                with self.lock:
+                    self.stats[name].record(task, False, latency)
+                print(f"DEBUG: {task} on {name} failed after {latency:.1f}s: {e}")
+                last_error = e
+                continue
+            latency = time.monotonic() - started
+            breaker.record(True, 0.0)
+            with self.lock:
+                self.stats[name].record(task, True, latency)
+            if name != candidates[0]:
+                print(f"DEBUG: {task} served by fallback model {name}")
+            return response
+        raise last_error or RuntimeError(f"No Gemini model available for {task}")
+
+    def status(self):
+        with self.lock:
+            models = {name: stats.snapshot() for name, stats in self.stats.items()}
+            cached = sorted(f"{name}:{version}" for (name, version), entry in self.models.items() if entry[1] is not None)
+        return {
+            "models": models,
+            "prompt_cache": {
+                "enabled": PROMPT_CACHE,
+                "active": cached,
+                "uncacheable": sorted(f"{name}:{version}" for name, version in self.uncacheable),
+                **self.cache_stats,
+            },
+            "routes": {task: self.candidates(task) for task in TASKS},
+            "tasks": {task: {"latency_class": c, "min_quality": q} for task, (c, q) in TASKS.items()},
+        }
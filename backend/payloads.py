@@ -0,0 +1,105 @@
+import os
+import json
+
+try:
+    import ijson  # Optional: incremental JSON parsing of large provider responses
+except ImportError:
+    ijson = None
+
+# --- Bounded Provider Payloads ---
+# Search providers can return far more than a scan keeps (full article text from Exa,
+# long "advanced" chunks from Tavily). Responses are streamed instead of loaded with
+# response.json(): with ijson installed, result objects are parsed one at a time and
+# reduced to the few fields the report uses, so the body is never held whole; without
+# it, the body is read in chunks and parsed once. Either way a body larger than
+# SCOUT_MAX_RESPONSE_MB fails the call instead of growing the worker's memory, and
+# every kept string is capped.
+SNIPPET_CHARS = int(os.getenv("SCOUT_SNIPPET_CHARS", "300"))
+TAVILY_CONTENT_CHARS = int(os.getenv("SCOUT_TAVILY_CONTENT_CHARS", "1000"))
+MAX_RESPONSE_BYTES = int(float(os.getenv("SCOUT_MAX_RESPONSE_MB", "8")) * 1024 * 1024)
+CHUNK_SIZE = 64 * 1024
+
+TAVILY_FIELDS = ("title", "url", "content", "score", "published_date")
+
+
+class PayloadTooLarge(ValueError):
+    pass
+
+
+class BoundedReader:
+    """
+    File-like view of a streamed requests response that refuses to read past max_bytes.
+    """
+
+    def __init__(self, response, max_bytes: int = MAX_RESPONSE_BYTES):
+        self.chunks = response.iter_content(CHUNK_SIZE)  # Undoes gzip/deflate transfer encoding
+        self.buffer = b""
+        self.size = 0
+        self.max_bytes = max_bytes
+
+    def read(self, n: int = -1):
+        while n < 0 or len(self.buffer) < n:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.size += len(chunk)
+            if self.size > self.max_bytes:
+                raise PayloadTooLarge(f"Response larger than {self.max_bytes // (1024 * 1024)} MB")
+            self.buffer += chunk
+        if n < 0:
+            data, self.buffer = self.buffer, b""
+        else:
+            data, self.buffer = self.buffer[:n], self.buffer[n:]
+        return data
+
+
+def compact(item: dict, fields, limit: int = SNIPPET_CHARS):
+    """
+    Keeps only `fields` of a result object, with strings (and lists of strings) capped at `limit`.
+    """
+    record = {}
+    for field in fields:
+        value = item.get(field)
+        if isinstance(value, str):
+            value = value[:limit]
+        elif isinstance(value, list):
+            value = [v[:limit] if isinstance(v, str) else v for v in value]
+        if value is not None:
+            record[field] = value
+    return record
+
+
+def read_json(response, max_bytes: int = MAX_RESPONSE_BYTES):
+    """
+    The whole body parsed as JSON, for responses that are small by design.
+    """
+    return json.loads(BoundedReader(response, max_bytes).read())
+
+
+def iter_results(response, key: str, fields, limit: int = SNIPPET_CHARS, max_items: int = None):
+    """
+    Yields compact records for the objects in the body's top-level `key` array.
+    """
+    reader = BoundedReader(response)
+    if ijson:
+        items = ijson.items(reader, f"{key}.item", use_float=True)
+    else:
+        data = json.loads(reader.read())
+        items = data.get(key) or [] if isinstance(data, dict) else []
+    for count, item in enumerate(items):
+        if max_items is not None and count >= max_items:
+            break
+        if isinstance(item, dict):
+            yield compact(item, fields, limit)
+
+
+def compact_tavily(response: dict):
+    """
+    Reduces a Tavily search response to the result fields the scan uses.
+    """
+    return {
+        "results": [
+            compact(r, TAVILY_FIELDS, TAVILY_CONTENT_CHARS)
+            for r in response.get("results", []) if isinstance(r, dict)
+        ]
+    }
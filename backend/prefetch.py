@@ -0,0 +1,149 @@
+import os
+import time
+import threading
+from collections import deque, OrderedDict
+from datetime import datetime
+
+from admission import admission
+from artifacts import PDF, AUDIO, has_artifact, build_audio, load_battlecards
+
+# --- Audio Prefetch ---
+# After a report completes, users almost always play the audio briefing. A single
+# low-priority worker builds it ahead of time into artifacts/<report_id>/, so
+# /api/audio can serve it immediately. It is the only artifact the UI fetches by
+# report id: the PDF is already built with the report, and exports of a selection
+# or battlecards are generated on request. Opt-in, since every job spends paid calls.
+# Before building, the worker checks admission.under_pressure(); while the server
+# is busy it backs off, and a job that stays blocked for too long is dropped.
+# Queued jobs are cancelled when the app shuts down.
+PREFETCH_ENABLED = os.getenv("SCOUT_PREFETCH_ENABLED", "false").lower() == "true"
+PREFETCH_QUEUE_SIZE = int(os.getenv("SCOUT_PREFETCH_QUEUE", "10"))
+PREFETCH_BACKOFF_SECONDS = float(os.getenv("SCOUT_PREFETCH_BACKOFF_SECONDS", "5"))
+PREFETCH_MAX_DEFER_SECONDS = float(os.getenv("SCOUT_PREFETCH_MAX_DEFER_SECONDS", "600"))
+JOBS_KEPT = 200
+
+
+class Prefetcher:
+    """
+    Builds audio briefings in the background, one job at a time, yielding to user traffic.
+    """
+
+    def __init__(self, busy=None):
+        # Admission state lives on the event loop; reading it from this thread is a benign race
+        self.busy = busy or admission.under_pressure
+        self.condition = threading.Condition()
+        self.queue = deque()
+        self.jobs = OrderedDict()  # report_id -> job status, oldest first
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    # --- Queue ---
+
+    def submit(self, report_id: str, markdown_text: str, use_mock_data: bool = False):
+        """
+        Queues a report for prefetching. Reports already queued or done, and mock reports, are ignored.
+        """
+        if not PREFETCH_ENABLED or use_mock_data or not report_id:
+            return False
+        with self.condition:
+            if report_id in self.jobs and self.jobs[report_id]["status"] != "cancelled":
+                return False
+            if len(self.queue) >= PREFETCH_QUEUE_SIZE:
+                # The newest report is the one most likely to be opened next
+                dropped = self.queue.popleft()
+                self.jobs[dropped]["status"] = "dropped"
+            self.jobs[report_id] = {
+                "report_id": report_id,
+                "status": "queued",
+                "submitted_at": datetime.now().isoformat(),
+                "built": False,
+                "deferred_seconds": 0.0,
+                "markdown": markdown_text,
+            }
+            self.jobs.move_to_end(report_id)
+            while len(self.jobs) > JOBS_KEPT:
+                self.jobs.popitem(last=False)
+            self.queue.append(report_id)
+            self.condition.notify()
+        self._ensure_started()
+        return True
+
+    def status(self, report_id: str):
+        with self.condition:
+            job = self.jobs.get(report_id)
+            return {k: v for k, v in job.items() if k != "markdown"} if job else None
+
+    # --- Worker ---
+
+    def _ensure_started(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._loop, name="audio-prefetch", daemon=True)
+        self.thread.start()
+
+    def _cancelled(self, job):
+        return self.stop_event.is_set() or job["status"] == "cancelled"
+
+    def _wait_for_capacity(self, job):
+        """
+        Blocks while the server is under pressure. Returns False if the job should give up.
+        """
+        while self.busy():
+            if self._cancelled(job):
+                return False
+            if job["deferred_seconds"] >= PREFETCH_MAX_DEFER_SECONDS:
+                job["status"] = "cancelled"
+                job["reason"] = "server busy"
+                return False
+            self.stop_event.wait(PREFETCH_BACKOFF_SECONDS)
+            job["deferred_seconds"] += PREFETCH_BACKOFF_SECONDS
+        return not self._cancelled(job)
+
+    def _run(self, job):
+        started = time.time()
+        report_id = job["report_id"]
+        if self._wait_for_capacity(job):
+            try:
+                job["built"] = has_artifact(report_id, AUDIO) or bool(build_audio(report_id, job["markdown"]))
+            except Exception as e:
+                print(f"Prefetch of audio for {report_id} failed: {e}")
+        if job["status"] == "running":
+            job["status"] = "done" if job["built"] else "failed"
+        job["duration"] = round(time.time() - started, 1)
+        job.pop("markdown", None)
+        print(f"DEBUG: Audio prefetch for {report_id} {job['status']}")
+
+    def _loop(self):
+        while not self.stop_event.is_set():
+            with self.condition:
+                while not self.queue and not self.stop_event.is_set():
+                    self.condition.wait(timeout=60)
+                if self.stop_event.is_set():
+                    return
+                job = self.jobs[self.queue.popleft()]
+                job["status"] = "running"
+            self._run(job)
+
+    def stop(self):
+        self.stop_event.set()
+        with self.condition:
+            for report_id in self.queue:
+                self.jobs[report_id]["status"] = "cancelled"
+            self.queue.clear()
+            self.condition.notify_all()
+
+    def artifacts(self, report_id: str):
+        """
+        Which artifacts exist for a report, plus its prefetch status.
+        """
+        return {
+            "report_id": report_id,
+            "pdf": has_artifact(report_id, PDF),
+            "audio": has_artifact(report_id, AUDIO),
+            "battlecards": sorted(load_battlecards(report_id)),
+            "prefetch": self.status(report_id),
+        }
+
+
+prefetcher = Prefetcher()
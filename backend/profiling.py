@@ -0,0 +1,255 @@
+import os
+import re
+import sys
+import json
+import time
+import pstats
+import cProfile
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+
+from starlette.concurrency import run_in_threadpool as starlette_run_in_threadpool
+
+from spool import new_run_id, RUN_ID_PATTERN
+
+# --- On-demand Request Profiling ---
+# A request is profiled when it carries "X-Scout-Profile: true" together with the
+# admin token (SCOUT_ADMIN_TOKEN, sent as X-Scout-Admin-Token), or when its path
+# matches SCOUT_PROFILE_PATHS (e.g. "/api/run"). Profiles expose code paths and
+# timings, so without an admin token nothing is profiled and /api/profiles is off.
+# The request's blocking work (every call made through run_in_threadpool below)
+# runs under cProfile, and a sampler thread records its stacks every few
+# milliseconds. Each profile is saved under an id as <id>.prof (pstats),
+# <id>.collapsed (flamegraph.pl / speedscope input) and <id>.json (metadata),
+# and the id is returned in the X-Scout-Profile-Id header.
+# When a request isn't profiled the only cost is one header lookup.
+PROFILES_DIR = os.getenv("SCOUT_PROFILES_DIR", "profiles")
+ADMIN_TOKEN = os.getenv("SCOUT_ADMIN_TOKEN", "")
+PROFILE_PATHS = [p.strip() for p in os.getenv("SCOUT_PROFILE_PATHS", "").split(",") if p.strip()]
+SAMPLE_INTERVAL = float(os.getenv("SCOUT_PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILES_KEPT = int(os.getenv("SCOUT_PROFILES_KEPT", "50"))
+
+PROFILE_HEADER = b"x-scout-profile"
+TOKEN_HEADER = b"x-scout-admin-token"
+ID_HEADER = b"x-scout-profile-id"
+
+current_profile = ContextVar("current_profile", default=None)
+
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class RequestProfile:
+    """
+    Collects cProfile stats and sampled stacks for the threads doing one request's work.
+    """
+
+    def __init__(self, profile_id: str, method: str, path: str):
+        self.profile_id = profile_id
+        self.method = method
+        self.path = path
+        self.lock = threading.Lock()
+        self.threads = {}  # thread id -> number of active calls
+        self.stats = None
+        self.deterministic = True
+        self.samples = Counter()
+        self.sample_count = 0
+        self.started = time.time()
+        self.stop_event = threading.Event()
+        self.sampler = threading.Thread(target=self._sample_loop, name=f"profiler-{profile_id}", daemon=True)
+
+    # --- Sampling ---
+
+    def _sample_loop(self):
+        while not self.stop_event.wait(SAMPLE_INTERVAL):
+            with self.lock:
+                thread_ids = list(self.threads)
+            if not thread_ids:
+                continue
+            frames = sys._current_frames()
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    self.samples[";".join(reversed(stack))] += 1
+                    self.sample_count += 1
+
+    # --- Deterministic profiling of worker calls ---
+
+    def call(self, fn, *args, **kwargs):
+        thread_id = threading.get_ident()
+        with self.lock:
+            self.threads[thread_id] = self.threads.get(thread_id, 0) + 1
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active in this interpreter (e.g. Python 3.12+ with a
+            # concurrent profiled call); the sampled stacks still cover this call
+            profiler = None
+            self.deterministic = False
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if profiler:
+                profiler.disable()
+            with self.lock:
+                self.threads[thread_id] -= 1
+                if not self.threads[thread_id]:
+                    del self.threads[thread_id]
+                if profiler and profiler.getstats():
+                    if self.stats is None:
+                        self.stats = pstats.Stats(profiler)
+                    else:
+                        self.stats.add(profiler)
+
+    def start(self):
+        self.sampler.start()
+
+    def finish(self, status_code):
+        self.stop_event.set()
+        self.sampler.join()
+        return save_profile(self, status_code)
+
+
+def profile_path(profile_id: str, extension: str):
+    return os.path.join(PROFILES_DIR, f"{profile_id}.{extension}")
+
+
+def save_profile(profile: RequestProfile, status_code):
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    duration = time.time() - profile.started
+    top_functions = []
+    if profile.stats is not None:
+        profile.stats.dump_stats(profile_path(profile.profile_id, "prof"))
+        ranked = sorted(profile.stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        for (filename, line, name), (_, calls, total_time, cumulative, _) in ranked[:25]:
+            top_functions.append({
+                "function": f"{name} ({os.path.basename(filename)}:{line})",
+                "calls": calls,
+                "total_time": round(total_time, 4),
+                "cumulative_time": round(cumulative, 4),
+            })
+
+    with open(profile_path(profile.profile_id, "collapsed"), "w", encoding="utf-8") as f:
+        for stack, count in profile.samples.most_common():
+            f.write(f"{stack} {count}\n")
+
+    meta = {
+        "profile_id": profile.profile_id,
+        "method": profile.method,
+        "path": profile.path,
+        "status_code": status_code,
+        "created_at": datetime.fromtimestamp(profile.started).isoformat(),
+        "duration": round(duration, 3),
+        "samples": profile.sample_count,
+        "sample_interval_ms": SAMPLE_INTERVAL * 1000,
+        "deterministic": profile.deterministic and profile.stats is not None,
+        "top_functions": top_functions,
+    }
+    with open(profile_path(profile.profile_id, "json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    prune_profiles()
+    print(f"DEBUG: Saved profile {profile.profile_id} for {profile.method} {profile.path} ({duration:.2f}s, {profile.sample_count} samples)")
+    return meta
+
+
+def prune_profiles(keep: int = PROFILES_KEPT):
+    ids = list_profile_ids()
+    for profile_id in ids[:-keep] if keep else []:
+        for extension in ("prof", "collapsed", "json"):
+            try:
+                os.remove(profile_path(profile_id, extension))
+            except FileNotFoundError:
+                pass
+
+
+def list_profile_ids():
+    if not os.path.isdir(PROFILES_DIR):
+        return []
+    return sorted(name[:-5] for name in os.listdir(PROFILES_DIR) if name.endswith(".json"))
+
+
+def load_profile(profile_id: str):
+    if not re.match(RUN_ID_PATTERN, profile_id):
+        return None
+    path = profile_path(profile_id, "json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_profiles():
+    profiles = []
+    for profile_id in reversed(list_profile_ids()):
+        meta = load_profile(profile_id)
+        if meta:
+            profiles.append({k: v for k, v in meta.items() if k != "top_functions"})
+    return profiles
+
+
+async def run_in_threadpool(fn, *args, **kwargs):
+    """
+    starlette's run_in_threadpool, profiled when the current request is being profiled.
+    """
+    profile = current_profile.get()
+    if profile is None:
+        return await starlette_run_in_threadpool(fn, *args, **kwargs)
+    return await starlette_run_in_threadpool(profile.call, fn, *args, **kwargs)
+
+
+def is_admin(headers) -> bool:
+    """
+    True if the request carries the admin token (always False when no token is configured).
+    """
+    return bool(ADMIN_TOKEN) and dict(headers).get(TOKEN_HEADER, b"").decode("latin-1") == ADMIN_TOKEN
+
+
+def should_profile(scope) -> bool:
+    if not ADMIN_TOKEN:
+        return False
+    path = scope.get("path", "")
+    if PROFILE_PATHS and any(path.startswith(prefix) for prefix in PROFILE_PATHS):
+        return True
+    headers = scope.get("headers") or []
+    for name, value in headers:
+        if name == PROFILE_HEADER:
+            return value.lower() in (b"1", b"true", b"yes") and is_admin(headers)
+    return False
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles requests selected by should_profile().
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not should_profile(scope):
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile("prof-" + new_run_id(), scope.get("method", ""), scope.get("path", ""))
+        status = {}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(ID_HEADER, profile.profile_id.encode())]
+            await send(message)
+
+        token = current_profile.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            current_profile.reset(token)
+            await starlette_run_in_threadpool(profile.finish, status.get("code"))
@@ -0,0 +1,338 @@
+import re
+import json
+import hashlib
+
+# --- Prompt Templates ---
+# Every Gemini prompt used by agent.py, kept in one place so other tools (e.g. the
+# list_models.py benchmark) run exactly the prompts production sends.
+# Each template is split into a static instruction block, built once at import, and a
+# dynamic part formatted per call. The model router sends the static block as a
+# system instruction or, when it is large enough, as Gemini cached content, so only
+# the dynamic part travels (and is processed) on every call. The template text is the
+# prompt exactly as sent; the split only decides which part is bound to the model.
+
+SWOT_KEYS = ("strengths", "weaknesses", "opportunities", "threats")
+
+
+class PromptTemplate:
+    """
+    A named prompt split where its dynamic part starts: the text before the first line
+    containing `split` is the static block, the rest is formatted with str.format() per call.
+    Without a split the whole prompt is dynamic.
+    """
+
+    def __init__(self, name: str, text: str, split: str = None):
+        self.name = name
+        start = text.rindex("\n", 0, text.index(split)) + 1 if split else 0
+        self.static = text[:start]
+        self.dynamic = text[start:]
+        # Changes whenever the instructions change, so cached copies are never stale
+        self.version = hashlib.sha1(self.static.encode("utf-8")).hexdigest()[:12]
+
+    def render(self, **values):
+        return Prompt(self, self.dynamic.format(**values))
+
+
+class Prompt:
+    """
+    One rendered prompt. str(prompt) is the full text, for backends without system instructions.
+    """
+
+    def __init__(self, template: PromptTemplate, dynamic: str):
+        self.template = template
+        self.dynamic = dynamic
+
+    @property
+    def static(self):
+        return self.template.static
+
+    def __str__(self):
+        return self.template.static + self.dynamic
+
+
+# The report prompt's static block (scoring rules, taxonomy and Theta Lake positioning)
+# ends at "Time Period"; the formatting rules and examples after the raw data are sent
+# with it on every call so the model reads the instructions in their original order.
+REPORT_TEMPLATE = PromptTemplate("report", """
+        You are the Chief Strategy Officer for Theta Lake.
+        We believe in enabling collaboration, not blocking it.
+        We believe 'Unified Capture' is superior to legacy email archiving.
+        We believe AI requires 'Human in the loop' supervision.
+        
+        Analyze the following raw data and generate a "DCGA Scout 4.0 Strategic Report".
+        
+        **CRITICAL INSTRUCTION: CURATION & SCORING**
+        1. You have been provided with a large set of raw news items (approx 10-20 per section), PLUS new "Grounding Sources" (LinkedIn, Blogs).
+        2. You must **analyze and score** each item based on its strategic relevance to Theta Lake.
+        3. **SELECT ONLY THE TOP 5** highest-scoring items for each section.
+        4. **PRIORITIZE DIVERSITY:** Try to include at least one insight from a non-traditional source (LinkedIn, Blog, Analyst Report) if it is high quality.
+        5. **NO DUPLICATES:** Do not list the same news item in multiple sections. Choose the *single best* section for it.
+        6. **COMPETITOR ALERT:** Treat "Microsoft Purview" as a COMPETITOR, not a partner, for the purpose of this report.
+        7. **SELF-EXCLUSION:** Do NOT include "Theta Lake" press releases or news in the "Competitive Intelligence" section. Place them in "Cooperative & Partner Updates" if relevant, or omit if minor.
+        
+        **STRICT INCLUSION CRITERIA (MUST MATCH ONE):**
+        - **Compliance & Governance:** News about recordkeeping, archiving, eDiscovery, or supervision.
+        - **AI Safety & Regulation:** News about AI bias, hallucinations, "human in the loop", or AI governance rules.
+        - **New Communication Modalities:** News about *new* features in Zoom/Teams/Webex that create *new* compliance risks (e.g., Whiteboards, Huddles, AI Summaries).
+        - **Major Corporate Moves:** Significant M&A, Funding (> $50M), or C-level executive changes at Competitors/Partners.
+
+        **STRICT NEGATIVE CONSTRAINTS (DO NOT INCLUDE):**
+        - **Generic Security News:** Exclude general vulnerabilities (CVEs), patches, ransomware, or "zero-day" exploits UNLESS they specifically mention "compliance failure" or "recordkeeping".
+        - **Stock Market Noise:** Exclude daily stock price fluctuations or quarterly earnings reports (unless they mention specific product strategy shifts).
+        - **Marketing Fluff:** Exclude generic "we are excited to announce" awards or minor partnership fluff without substance.
+        - **Irrelevant Features:** Exclude minor UI updates (e.g., "Dark Mode", "New Emojis") unless they impact data capture.
+
+        **REGULATORY PRIORITIZATION:**
+           - **HIGH PRIORITY:** Communication Compliance (recordkeeping, off-channel comms), AI Governance/Regulation, and Digital Communications Governance (DCGA).
+           - **EXAMPLES:** "SEC Division of Examinations 2026 Priorities" (if relevant), new AI rules, or major fines.
+        
+        **MUTUALLY EXCLUSIVE CATEGORIZATION (CRITICAL):**
+           - **Regulatory Radar:** STRICTLY for news driven by **Agencies** (SEC, FINRA, FCA, etc.) targeting **Financial Institutions** (Banks, Broker-Dealers). This includes fines, penalties, settlements, and new rules.
+           - **Competitive Intelligence:** STRICTLY for news driven by **Vendors** (Competitors). This includes product launches, features, partnerships, and funding.
+           - **OVERLAP RULE:** If a Competitor is fined, place this **ONLY in Regulatory Radar**.
+           - **NO DUPLICATES:** A story must appear in ONE section only.
+           - **NOTE:** It is rare for a Vendor to be fined. Focus Regulatory Radar on the *customers* (Banks) getting fined.
+        
+        **COMPETITOR WEIGHTING:**
+           - **CRITICAL:** Prioritize **ANY significant news** from direct competitors (e.g., Product Launches, Major Partnerships, Certifications, Funding, Acquisitions).
+           - **Certifications** (ISO, SOC2, FedRAMP) and **AI Governance** features are particularly high-threat and MUST be included.
+           - Ensure the "Behavox ISO/IEC 42001 Certification" is included if present in the raw data.
+        
+        Time Period: {time_range}
+        
+        Raw Data:
+        {raw_data}
+        
+        **LOGIC FOR MICROSOFT:**
+        - **Microsoft Purview** is a direct competitor. Updates to Purview are generally a **[Threat]** or **[Risk]**.
+        - **Microsoft AI / Copilot / Teams** features are **[Opportunity]**. New modalities create a need for Theta Lake's specialized governance.
+
+        **FORMATTING RULES:**
+        - Use Markdown.
+        - Start with a "TL;DR: The Weekly Pulse" (Executive Summary).
+        - Group by: "Cooperative & Partner Updates", "Competitive Landscape", "Regulatory Radar".
+        - **MANDATORY:** END EVERY BULLET POINT WITH THE DATE/TIME: ... `[Nov 25, 2025 10:00 AM EST]`
+        - **MANDATORY:** EVERY NEWS ITEM (OR GROUP) MUST HAVE A "THETA LAKE TAKE". NO EXCEPTIONS.
+        - **INTELLIGENT GROUPING:** You MAY group similar items together (e.g., multiple new features for Microsoft Teams).
+        - **CRITICAL FORMATTING RULE FOR GROUPS:** If you group items, you MUST combine them into a SINGLE bullet point paragraph. Do NOT list them on separate lines.
+        - Example of BAD grouping (Do NOT do this):
+          * News A
+          * News B
+          > Take
+        - Example of GOOD grouping (DO THIS):
+          * **News:** Microsoft Teams introduced Feature A AND Feature B. ([Source](url))
+          > **Theta Lake Take:** ...
+        - If grouped, provide a SINGLE "Theta Lake Take" that covers the entire group.
+        - **NO SUMMARY LISTS:** Do NOT provide a list of news items at the start of a section. Combine the news and the analysis into a single block for each item immediately.
+        - For each item (or group), provide the news/update first.
+        - Then, IMMEDIATELY follow with a "Theta Lake Take" blockquote: `> **Theta Lake Take:** [Badge] Analysis...`
+        - Badges must be one of: [Sales Validation], [Opportunity], [Risk], [Threat], [Validation].
+        - Cite sources with links: `([Source Name](url))`.
+        
+        **ONE-SHOT EXAMPLE (SINGLE ITEM):**
+        
+        ## Cooperative & Partner Updates
+        * **News:** Zoom launched "AI Companion 2.0" with new federation capabilities for external meetings. ([Zoom Blog](https://blog.zoom.us)) [Nov 28, 2025 09:00 AM EST]
+        > **💡 Theta Lake Take:** **[Opportunity]** This expansion of AI into external federation creates a massive compliance gap. Legacy archivers cannot see into these ephemeral, cross-tenant AI interactions. This is a prime upsell trigger for our "Unified Capture" to ensure full visibility.
+        
+        **ONE-SHOT EXAMPLE (GROUPED ITEMS):**
+
+        * **News:** Microsoft Teams introduced "Mesh" for immersive 3D meetings ([The Verge](https://theverge.com)) AND announced new "Copilot" integration for Whiteboard ([Microsoft News](https://news.microsoft.com)). [Nov 27, 2025 02:00 PM EST]
+        > **💡 Theta Lake Take:** **[Risk]** Both 3D avatars and AI-generated whiteboard content present a nightmare for traditional supervision. Whether a trader nods "yes" in a 3D space or Copilot summarizes a brainstorm, legacy tools miss this context. Theta Lake's ability to capture and replay the full visual context is the ONLY viable solution here.
+
+        Format the output EXACTLY as follows (Markdown):
+        
+        # 🚨 TL;DR: The Weekly Pulse
+        (A narrative summary of the top 3-5 most critical events. Be punchy and executive.)
+        
+        ## Cooperative & Partner Updates
+        (Select TOP 5 most impactful updates:)
+        * **News:** [Summary] ([Source](URL))
+        > **💡 Theta Lake Take:** **[Opportunity/Risk/Threat]** [Strategic Perspective]
+        
+        ## Competitive Intelligence
+        (Select TOP 5-10 most threatening or notable competitor moves. **DO NOT INCLUDE THETA LAKE NEWS HERE.**)
+        * **News:** [Summary] ([Source](URL))
+        > **💡 Theta Lake Take:** **[Threat/Validation]** [Strategic Perspective]
+        
+        ## Regulatory Radar
+        (Select TOP 5 most relevant fines or rule changes:)
+        * **Event:** [Description] ([Source](URL))
+        > **💡 Theta Lake Take:** **[Sales Validation]** [Sales enablement angle]
+        
+        Keep it professional, insightful, and perfectly formatted. Ensure every news item has a source link. Use the blockquote (>) for the Theta Lake Take to indent it.
+        """, split="Time Period:")
+
+CHAT_TEMPLATE = PromptTemplate("chat", """
+    You are an intelligent assistant for the DCGA Scout.
+    Your goal is to answer user questions based ONLY on the provided report context.
+    
+    Report Context:
+    {report_context}
+    
+    User Question: {user_message}
+    
+    Answer concisely and professionally.
+    """, split="Report Context:")
+
+EMAIL_TEMPLATE = PromptTemplate("email", """
+    You are a top-tier enterprise sales representative for Theta Lake.
+    Write a short, punchy, and professional outreach email to a prospect named {recipient_name}.
+    
+    The email should be based on this specific market insight:
+    "{insight_text}"
+    
+    Value Proposition to weave in:
+    - Theta Lake provides "Unified Capture" and "Proactive Compliance".
+    - We help firms enable modern collaboration (Zoom, Teams) without compliance risks.
+    
+    Structure:
+    1. Subject Line (Catchy but professional)
+    2. Hook (The insight)
+    3. The "So What?" (Why they should care)
+    4. Call to Action (Meeting request)
+    """, split="{recipient_name}")
+
+DEEP_DIVE_TEMPLATE = PromptTemplate("deep_dive", """
+            Summarize the following search results into a detailed "Deep Dive" briefing on the topic: "{topic}".
+            Focus on strategic implications for compliance and risk teams.
+            
+            Search Results:
+            {results}
+            """)
+
+AUDIO_SCRIPT_TEMPLATE = PromptTemplate("audio_script", """
+            Convert the following report into a 2-minute "Podcast Script" for an audio briefing.
+            
+            CRITICAL INSTRUCTIONS:
+            - Use PLAIN TEXT ONLY - no markdown, no asterisks, no special characters
+            - Write it exactly as a narrator would speak it
+            - Keep it conversational and engaging
+            - Focus on the top 3 most important takeaways
+            - Start with "Welcome to your DCGA Scout Daily Briefing."
+            - Do NOT use any formatting like *, **, #, >, or bullet points
+            
+            Report:
+            {report_text}
+            """, split="Report:")
+
+# Several competitors in one request. Sent with SWOT_RESPONSE_SCHEMA as Gemini
+# structured output, so the shape is enforced by the model rather than the prompt.
+SWOT_BATCH_TEMPLATE = PromptTemplate("swot_batch", """
+Based on general knowledge and the recent news provided, generate a structured SWOT analysis for EACH competitor listed below.
+
+Return one card per competitor, in the order given, with "competitor" set to the competitor's name exactly as written.
+Each category should have 3-4 specific, actionable points.
+
+{sections}
+""", split="{sections}")
+
+SWOT_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "cards": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "competitor": {"type": "string"},
+                    **{key: {"type": "array", "items": {"type": "string"}} for key in SWOT_KEYS},
+                },
+                "required": ["competitor", *SWOT_KEYS],
+            },
+        },
+    },
+    "required": ["cards"],
+}
+
+def report_prompt(time_range: str, raw_data: str):
+    """
+    The report synthesis prompt. raw_data is the (already capped) search results text.
+    """
+    return REPORT_TEMPLATE.render(time_range=time_range, raw_data=raw_data)
+
+
+def chat_prompt(report_context: str, user_message: str):
+    """
+    Scout Chat: answer a question from the report only.
+    """
+    return CHAT_TEMPLATE.render(report_context=report_context, user_message=user_message)
+
+
+def email_prompt(insight_text: str, recipient_name: str):
+    """
+    Sales Co-Pilot: outreach email built around one insight.
+    """
+    return EMAIL_TEMPLATE.render(insight_text=insight_text, recipient_name=recipient_name)
+
+
+def deep_dive_prompt(topic: str, results):
+    """
+    Deep Dive: briefing over targeted search results.
+    """
+    return DEEP_DIVE_TEMPLATE.render(topic=topic, results=results)
+
+
+def audio_script_prompt(report_text: str):
+    """
+    Audio Briefing: plain-text podcast script for text-to-speech.
+    """
+    return AUDIO_SCRIPT_TEMPLATE.render(report_text=report_text[:10000])
+
+
+def swot_batch_prompt(news_by_competitor: dict):
+    """
+    Battlecards: SWOT analyses for several competitors in one structured-output request.
+    """
+    sections = "\n\n".join(
+        f"Competitor: {competitor}\n\nRecent News:\n{news_text or 'No recent news found.'}"
+        for competitor, news_text in news_by_competitor.items()
+    )
+    return SWOT_BATCH_TEMPLATE.render(sections=sections)
+
+
+# --- SWOT answer parsing ---
+
+def validate_swot_card(data):
+    """
+    Returns the card if it has a non-empty list of strings under every SWOT key, else None.
+    """
+    if not isinstance(data, dict):
+        return None
+    for key in SWOT_KEYS:
+        values = data.get(key)
+        if not isinstance(values, list) or not values or not all(isinstance(v, str) for v in values):
+            return None
+    return {key: data[key] for key in SWOT_KEYS}
+
+
+def _load_json(text: str):
+    # Free-form answers may wrap the JSON in markdown fences or prose
+    cleaned = text.strip().replace("```json", "").replace("```", "").strip()
+    json_match = re.search(r'\{[\s\S]*\}', cleaned)
+    if json_match:
+        cleaned = json_match.group(0)
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        return None
+
+
+def parse_swot_batch(text: str, competitors):
+    """
+    Parses a batched SWOT answer. Returns {competitor: card or None}; each card is
+    validated on its own, so one malformed card doesn't discard the others.
+    """
+    cards = {competitor: None for competitor in competitors}
+    data = _load_json(text)
+    entries = data.get("cards") if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        return cards
+    by_name = {competitor.strip().lower(): competitor for competitor in competitors}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        competitor = by_name.get(str(entry.get("competitor", "")).strip().lower())
+        if competitor and cards[competitor] is None:
+            cards[competitor] = validate_swot_card(entry)
+    return cards
@@ -0,0 +1,218 @@
+import os
+import re
+import json
+from datetime import datetime
+
+from spool import RUN_ID_PATTERN
+
+# --- Structured Report Model ---
+# The markdown report produced by run_agent is parsed once into sections and items
+# and persisted as reports/<report_id>.json, so clients can fetch single sections
+# or items by id instead of re-downloading (and re-parsing) the whole blob.
+REPORTS_DIR = os.getenv("SCOUT_REPORTS_DIR", "reports")
+
+# Section keys are the names the frontend uses when selecting sections for export.
+SECTION_HEADERS = {
+    "Executive Summary": "TL;DR: The Weekly Pulse",
+    "Partner Updates": "Cooperative & Partner Updates",
+    "Competitive Intelligence": "Competitive Intelligence",
+    "Regulatory Radar": "Regulatory Radar",
+    "Industry Analysis": "Industry Analysis & Blogs",
+}
+
+BADGES = ["Sales Validation", "Opportunity", "Risk", "Threat", "Validation"]
+BADGE_PATTERN = re.compile(r'\[(Sales Validation|Opportunity|Risk|Threat|Validation)\]')
+SOURCE_PATTERN = re.compile(r'\[([^\]]*)\]\((https?://[^)\s]+)\)')
+# e.g. [Nov 25, 2025 10:00 AM EST]
+TIMESTAMP_PATTERN = re.compile(r'\[([A-Z][a-z]{2,8}\.? \d{1,2}, \d{4}[^\]]*)\]')
+KIND_PATTERN = re.compile(r'^\*\*(\w+):\*\*\s*')
+
+
+def slugify(text: str):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def section_key_for(title: str):
+    for key, header in SECTION_HEADERS.items():
+        if header.lower() in title.lower():
+            return key
+    return None
+
+
+def _new_section(title: str, level: int):
+    key = section_key_for(title)
+    return {
+        "id": slugify(key or title),
+        "key": key,
+        "title": title,
+        "level": level,
+        "summary": "",
+        "markdown": "",
+        "items": [],
+    }
+
+
+def _finish_item(item):
+    text = item["text"] + " " + item["take"]
+    badges = BADGE_PATTERN.findall(text)
+    item["badges"] = [b for b in BADGES if b in badges]
+    item["sources"] = [{"name": name, "url": url} for name, url in SOURCE_PATTERN.findall(item["text"])]
+    timestamps = TIMESTAMP_PATTERN.findall(item["text"])
+    item["timestamp"] = timestamps[-1].strip() if timestamps else None
+    kind = KIND_PATTERN.match(item["text"])
+    item["kind"] = kind.group(1) if kind else None
+    item["take"] = item["take"].strip()
+
+
+def parse_report(markdown_text: str, report_id: str, meta: dict = None):
+    """
+    Splits the report markdown into sections (by # / ## headers) and items
+    (bullets, each with the "Theta Lake Take" blockquote that follows it).
+    """
+    sections = []
+    preamble = []
+    section = None
+    item = None
+
+    for raw_line in markdown_text.split('\n'):
+        line = raw_line.strip()
+        header = re.match(r'^(#{1,2})\s+(.*)$', line)
+        if header:
+            section = _new_section(header.group(2).strip(), len(header.group(1)))
+            sections.append(section)
+            item = None
+        if section is None:
+            preamble.append(raw_line)
+            continue
+
+        section["markdown"] += raw_line + "\n"
+        if header or not line:
+            continue
+
+        if line.startswith('* ') or line.startswith('- '):
+            item = {
+                "id": f"{section['id']}-{len(section['items']) + 1}",
+                "text": line[2:].strip(),
+                "take": "",
+            }
+            section["items"].append(item)
+        elif line.startswith('>'):
+            take = line.lstrip('>').strip()
+            if item is not None:
+                item["take"] += take + " "
+            else:
+                section["summary"] += take + "\n"
+        elif item is None:
+            section["summary"] += line + "\n"
+        else:
+            # Continuation of the current bullet
+            item["text"] += " " + line
+
+    for section in sections:
+        section["summary"] = section["summary"].strip()
+        for item in section["items"]:
+            _finish_item(item)
+
+    report = {
+        "id": report_id,
+        "generated_at": datetime.now().isoformat(),
+        "preamble": "\n".join(preamble).strip(),
+        "sections": sections,
+        "markdown": markdown_text,
+    }
+    report.update(meta or {})
+    return report
+
+
+def _report_path(report_id: str):
+    if not RUN_ID_PATTERN.match(report_id or ""):
+        raise ValueError(f"Invalid report id: {report_id!r}")
+    return os.path.join(REPORTS_DIR, f"{report_id}.json")
+
+
+def save_report(report: dict):
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    path = _report_path(report["id"])
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f)
+    os.replace(tmp_path, path)
+    return report["id"]
+
+
+def load_report(report_id: str):
+    """
+    Returns the stored report, or None if it doesn't exist.
+    """
+    try:
+        path = _report_path(report_id)
+    except ValueError:
+        return None
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def delete_report(report_id: str):
+    """
+    Removes a stored report. Returns True if there was one.
+    """
+    if not report_exists(report_id):
+        return False
+    os.remove(_report_path(report_id))
+    return True
+
+
+def report_exists(report_id: str):
+    try:
+        return os.path.exists(_report_path(report_id))
+    except ValueError:
+        return False
+
+
+def report_summary(report: dict):
+    """
+    Report metadata plus a table of contents, without any item bodies.
+    """
+    summary = {k: v for k, v in report.items() if k not in ("sections", "markdown")}
+    summary["sections"] = [
+        {
+            "id": s["id"],
+            "key": s["key"],
+            "title": s["title"],
+            "level": s["level"],
+            "item_count": len(s["items"]),
+            "item_ids": [i["id"] for i in s["items"]],
+        }
+        for s in report["sections"]
+    ]
+    return summary
+
+
+def get_section(report: dict, section_id: str):
+    for section in report["sections"]:
+        if section["id"] == section_id:
+            return section
+    return None
+
+
+def get_item(report: dict, section_id: str, item_id: str):
+    section = get_section(report, section_id)
+    if not section:
+        return None
+    for item in section["items"]:
+        if item["id"] == item_id:
+            return item
+    return None
+
+
+def filter_sections(report: dict, selected_sections):
+    """
+    Structured counterpart of agent.filter_markdown_sections: looks the
+    selected sections up by key instead of searching the markdown for headers.
+    """
+    if not selected_sections:
+        return report["markdown"]
+    by_key = {s["key"]: s for s in report["sections"] if s["key"]}
+    return "".join(by_key[key]["markdown"] + "\n" for key in SECTION_HEADERS if key in selected_sections and key in by_key)
@@ -0,0 +1,132 @@
+import os
+import json
+import time
+import threading
+
+import spool
+from spool import delete_run
+from report_model import delete_report
+from artifacts import delete_artifacts
+from scheduler import prewarm
+
+# --- Run Retention ---
+# Every user scan leaves a run spool (runs/<run_id>/), its report(s) (reports/) and
+# their artifacts (artifacts/<report_id>/). After a scan, a background pass keeps the
+# newest RUN_RETENTION_COUNT runs and deletes older ones, and any run untouched for
+# RUN_RETENTION_DAYS, together with their reports and artifacts. Runs behind a kept
+# prewarmed version are left to the prewarm scheduler, and a run still in progress is
+# never deleted. 0 turns either limit off. Finished runs are already copied into the
+# archive (see archive.py), so their results stay searchable.
+RUN_RETENTION_DAYS = float(os.getenv("SCOUT_RUN_RETENTION_DAYS", "30"))
+RUN_RETENTION_COUNT = int(os.getenv("SCOUT_RUN_RETENTION_COUNT", "500"))
+RETENTION_INTERVAL_MINUTES = float(os.getenv("SCOUT_RETENTION_INTERVAL_MINUTES", "10"))
+IN_PROGRESS_GRACE_SECONDS = 3600  # A "running" manifest updated this recently belongs to a live scan
+
+
+def _load_manifest(path: str):
+    try:
+        with open(os.path.join(path, "manifest.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _last_modified(path: str):
+    paths = [path] + [os.path.join(path, name) for name in ("manifest.json", "results.jsonl")]
+    return max(os.path.getmtime(p) for p in paths if os.path.exists(p))
+
+
+def run_report_ids(run_id: str, manifest: dict):
+    """
+    Every report a run produced: single scans record report_id, windowed scans
+    {time_range: id} and batches a list of ids.
+    """
+    report_ids = manifest.get("report_ids") or []
+    if isinstance(report_ids, dict):
+        report_ids = list(report_ids.values())
+    return {run_id, manifest.get("report_id"), *report_ids} - {None, ""}
+
+
+def expired_runs(now: float = None):
+    """
+    [(run_id, manifest)] of the user runs past the retention limits, oldest first.
+    """
+    now = now or time.time()
+    if not os.path.isdir(spool.RUNS_DIR):
+        return []
+    kept_runs, _ = prewarm.kept_ids()
+    runs = []
+    for run_id in os.listdir(spool.RUNS_DIR):
+        path = os.path.join(spool.RUNS_DIR, run_id)
+        if run_id in kept_runs or not os.path.isdir(path):
+            continue
+        runs.append((_last_modified(path), run_id, _load_manifest(path)))
+    runs.sort(reverse=True)
+
+    expired = []
+    for position, (modified, run_id, manifest) in enumerate(runs):
+        age = now - modified
+        if manifest.get("status") == "running" and age < IN_PROGRESS_GRACE_SECONDS:
+            continue
+        too_many = RUN_RETENTION_COUNT > 0 and position >= RUN_RETENTION_COUNT
+        too_old = RUN_RETENTION_DAYS > 0 and age > RUN_RETENTION_DAYS * 86400
+        if too_many or too_old:
+            expired.append((run_id, manifest))
+    return expired[::-1]
+
+
+def prune_runs(now: float = None):
+    """
+    Deletes expired user runs with their reports and artifacts. Returns the deleted run ids.
+    """
+    _, kept_reports = prewarm.kept_ids()
+    deleted = []
+    for run_id, manifest in expired_runs(now):
+        try:
+            for report_id in run_report_ids(run_id, manifest) - kept_reports:
+                delete_report(report_id)
+                delete_artifacts(report_id)
+            delete_run(run_id)
+            deleted.append(run_id)
+        except OSError as e:
+            print(f"Cleanup of run {run_id} failed: {e}")
+    if deleted:
+        print(f"DEBUG: Retention removed {len(deleted)} run(s)")
+    return deleted
+
+
+class RunRetention:
+    """
+    Runs prune_runs in the background at most once per RETENTION_INTERVAL_MINUTES.
+    """
+
+    def __init__(self, interval_minutes: float = RETENTION_INTERVAL_MINUTES):
+        self.interval = interval_minutes * 60
+        self.lock = threading.Lock()
+        self.last_started = None
+        self.thread = None
+
+    def maybe_prune(self):
+        """
+        Starts a pruning pass if one is due. Returns True if it started one.
+        """
+        if RUN_RETENTION_DAYS <= 0 and RUN_RETENTION_COUNT <= 0:
+            return False
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return False
+            if self.last_started is not None and time.monotonic() - self.last_started < self.interval:
+                return False
+            self.last_started = time.monotonic()
+            self.thread = threading.Thread(target=self._prune, name="run-retention", daemon=True)
+            self.thread.start()
+        return True
+
+    def _prune(self):
+        try:
+            prune_runs()
+        except Exception as e:
+            print(f"Run retention failed: {e}")
+
+
+retention = RunRetention()
@@ -0,0 +1,264 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+from agent import run_agent, TIME_RANGE_DAYS
+from windows import run_agent_windows
+from spool import new_run_id, delete_run
+from report_model import load_report, delete_report
+from artifacts import ARTIFACTS_DIR, build_report_artifacts, delete_artifacts
+
+# --- Pre-warmed Reports ---
+# A background thread regenerates each configured (timeRange, provider, mode) combination
+# on a cadence, prebuilds its PDF and audio briefing, and records every version in
+# artifacts/prewarm.json so /api/run can serve the freshest one immediately. Versions
+# beyond the newest PREWARM_KEEP_VERSIONS are deleted with their report, artifacts and run spool.
+PREWARM_ENABLED = os.getenv("SCOUT_PREWARM_ENABLED", "false").lower() == "true"
+# Comma separated "timeRange:provider:mode" entries; provider and mode default to tavily/deep
+PREWARM_COMBOS = os.getenv("SCOUT_PREWARM_COMBOS", "24h,7d,14d,30d")
+PREWARM_INTERVAL_MINUTES = float(os.getenv("SCOUT_PREWARM_INTERVAL_MINUTES", "360"))
+# Prewarmed reports older than this are not served; /api/run falls back to a live run
+PREWARM_MAX_AGE_MINUTES = float(os.getenv("SCOUT_PREWARM_MAX_AGE_MINUTES", "720"))
+# ...nor older than this share of the report's own window (6h for "24h")
+PREWARM_MAX_AGE_FRACTION = float(os.getenv("SCOUT_PREWARM_MAX_AGE_FRACTION", "0.25"))
+PREWARM_KEEP_VERSIONS = int(os.getenv("SCOUT_PREWARM_KEEP_VERSIONS", "5"))
+# Regenerate all stale windows of a provider/mode from one sweep of the widest window
+PREWARM_DERIVE_WINDOWS = os.getenv("SCOUT_PREWARM_DERIVE_WINDOWS", "false").lower() == "true"
+PREWARM_INDEX = os.path.join(ARTIFACTS_DIR, "prewarm.json")
+
+
+def parse_combos(spec: str):
+    combos = []
+    for entry in spec.split(","):
+        parts = [p.strip() for p in entry.split(":") if p.strip()]
+        if not parts:
+            continue
+        time_range = parts[0]
+        provider = parts[1] if len(parts) > 1 else "tavily"
+        mode = parts[2] if len(parts) > 2 else "deep"
+        combos.append((time_range, provider, mode))
+    return combos
+
+
+def combo_key(time_range: str, provider: str, mode: str):
+    return f"{time_range}:{provider}:{mode}"
+
+
+def max_age(time_range: str):
+    """
+    Minutes a prewarmed report of this window may be served for.
+    """
+    window_minutes = TIME_RANGE_DAYS.get(time_range, 7) * 24 * 60
+    return min(PREWARM_MAX_AGE_MINUTES, window_minutes * PREWARM_MAX_AGE_FRACTION)
+
+
+class PrewarmScheduler:
+    """
+    Keeps a fresh, versioned report (plus PDF and audio) for each configured combination.
+    """
+
+    def __init__(self, combos, interval_minutes: float = PREWARM_INTERVAL_MINUTES):
+        self.combos = combos
+        self.interval = interval_minutes * 60
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.refreshing = None
+        self.last_errors = {}
+
+    # --- Version index ---
+
+    def _load_index(self):
+        if not os.path.exists(PREWARM_INDEX):
+            return {}
+        with open(PREWARM_INDEX, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_index(self, index):
+        os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+        tmp_path = PREWARM_INDEX + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, PREWARM_INDEX)
+
+    def versions(self, key: str):
+        with self.lock:
+            return self._load_index().get(key, [])
+
+    def kept_ids(self):
+        """
+        (run ids, report ids) of every version still in the index, so other cleanup leaves them alone.
+        """
+        with self.lock:
+            versions = [v for kept in self._load_index().values() for v in kept]
+        return {v.get("run_id", v["report_id"]) for v in versions}, {v["report_id"] for v in versions}
+
+    def latest(self, time_range: str, provider: str, mode: str, max_age_minutes: float = None):
+        """
+        Returns the newest prewarmed version for the combination, or None if
+        there isn't one younger than max_age_minutes (by default max_age(time_range)).
+        """
+        if max_age_minutes is None:
+            max_age_minutes = max_age(time_range)
+        versions = self.versions(combo_key(time_range, provider, mode))
+        if not versions:
+            return None
+        newest = versions[-1]
+        age = time.time() - newest["generated_ts"]
+        if age > max_age_minutes * 60:
+            return None
+        return newest
+
+    def _record_version(self, key: str, version: dict):
+        with self.lock:
+            index = self._load_index()
+            versions = index.get(key, [])
+            # Numbered per combination; trimming old versions doesn't restart the count
+            version["version"] = max((v.get("version", 0) for v in versions), default=0) + 1
+            versions.append(version)
+            index[key] = versions[-PREWARM_KEEP_VERSIONS:]
+            self._save_index(index)
+            dropped = versions[:-PREWARM_KEEP_VERSIONS]
+            # Windows derived from one sweep share a run spool; keep it while any of them is kept
+            kept_runs = {v.get("run_id", v["report_id"]) for kept in index.values() for v in kept}
+        for old in dropped:
+            self._delete_version(old, kept_runs)
+
+    def _delete_version(self, version: dict, kept_runs):
+        report_id = version["report_id"]
+        run_id = version.get("run_id", report_id)
+        try:
+            delete_report(report_id)
+            delete_artifacts(report_id)
+            if run_id not in kept_runs:
+                delete_run(run_id)
+        except OSError as e:
+            print(f"Cleanup of prewarmed report {report_id} failed: {e}")
+
+    # --- Refresh ---
+
+    def _store_version(self, key: str, report_id: str, report_markdown: str, started: float, run_id: str = None):
+        if report_markdown.startswith("Error") or not load_report(report_id):
+            self.last_errors[key] = report_markdown[:500]
+            print(f"Prewarm of {key} failed: {report_markdown[:200]}")
+            return None
+
+        built = build_report_artifacts(report_id, report_markdown)
+        version = {
+            "report_id": report_id,
+            "run_id": run_id or report_id,
+            "generated_at": datetime.now().isoformat(),
+            "generated_ts": time.time(),
+            "duration": round(time.time() - started, 1),
+            "artifacts": built,
+        }
+        self._record_version(key, version)
+        self.last_errors.pop(key, None)
+        return version
+
+    def refresh(self, time_range: str, provider: str, mode: str):
+        """
+        Runs one live scan for the combination and stores it as a new version.
+        """
+        key = combo_key(time_range, provider, mode)
+        self.refreshing = key
+        started = time.time()
+        try:
+            run_id = new_run_id()
+            print(f"DEBUG: Prewarming {key} as {run_id}")
+            report_markdown = run_agent(time_range, provider, False, mode, run_id=run_id)
+            return self._store_version(key, run_id, report_markdown, started)
+        except Exception as e:
+            self.last_errors[key] = str(e)
+            print(f"Prewarm of {key} failed: {e}")
+            return None
+        finally:
+            self.refreshing = None
+
+    def refresh_windows(self, time_ranges, provider: str, mode: str):
+        """
+        Regenerates several windows of one provider/mode from a single sweep.
+        """
+        keys = [combo_key(tr, provider, mode) for tr in time_ranges]
+        self.refreshing = ", ".join(keys)
+        started = time.time()
+        try:
+            run_id = new_run_id()
+            print(f"DEBUG: Prewarming {self.refreshing} from one sweep as {run_id}")
+            reports = run_agent_windows(time_ranges, provider, False, mode, run_id=run_id)
+            if isinstance(reports, str):
+                for key in keys:
+                    self.last_errors[key] = reports[:500]
+                return []
+            return [
+                self._store_version(combo_key(tr, provider, mode), r["report_id"] or "", r["report"], started, run_id)
+                for tr, r in reports.items()
+            ]
+        except Exception as e:
+            for key in keys:
+                self.last_errors[key] = str(e)
+            print(f"Prewarm of {self.refreshing} failed: {e}")
+            return []
+        finally:
+            self.refreshing = None
+
+    def _is_stale(self, key: str):
+        versions = self.versions(key)
+        return not versions or time.time() - versions[-1]["generated_ts"] >= self.interval
+
+    def run_pending(self):
+        stale = [combo for combo in self.combos if self._is_stale(combo_key(*combo))]
+        if PREWARM_DERIVE_WINDOWS:
+            groups = {}
+            for time_range, provider, mode in stale:
+                groups.setdefault((provider, mode), []).append(time_range)
+            for (provider, mode), time_ranges in groups.items():
+                if self.stop_event.is_set():
+                    return
+                if len(time_ranges) > 1:
+                    self.refresh_windows(time_ranges, provider, mode)
+                else:
+                    self.refresh(time_ranges[0], provider, mode)
+            return
+
+        for time_range, provider, mode in stale:
+            if self.stop_event.is_set():
+                return
+            self.refresh(time_range, provider, mode)
+
+    def _loop(self):
+        while not self.stop_event.is_set():
+            self.run_pending()
+            # Re-check once a minute so a stop request or a newly stale combo is noticed quickly
+            self.stop_event.wait(60)
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._loop, name="prewarm-scheduler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def status(self):
+        return {
+            "enabled": PREWARM_ENABLED,
+            "derive_windows": PREWARM_DERIVE_WINDOWS,
+            "running": bool(self.thread and self.thread.is_alive()),
+            "interval_minutes": self.interval / 60,
+            "max_age_minutes": PREWARM_MAX_AGE_MINUTES,
+            "max_age_fraction": PREWARM_MAX_AGE_FRACTION,
+            "refreshing": self.refreshing,
+            "combos": {
+                combo_key(*combo): self.versions(combo_key(*combo))
+                for combo in self.combos
+            },
+            "errors": self.last_errors,
+        }
+
+
+prewarm = PrewarmScheduler(parse_combos(PREWARM_COMBOS))
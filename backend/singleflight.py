@@ -0,0 +1,73 @@
+import os
+import time
+import asyncio
+
+from profiling import run_in_threadpool
+
+# Seconds a finished result is still handed to identical requests that arrive just after it.
+COALESCE_WINDOW = float(os.getenv("SCOUT_COALESCE_WINDOW", "60"))
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls into one computation.
+    While a key is in flight, every caller with that key awaits the same task.
+    Once it finishes, the result is reused for `window` seconds.
+    """
+
+    def __init__(self, window: float = COALESCE_WINDOW):
+        self.window = window
+        self.inflight = {}  # key -> asyncio.Task
+        self.recent = {}  # key -> (finished_at, result)
+        self.coalesced = 0
+
+    def _prune(self, now):
+        for key in [k for k, (finished_at, _) in self.recent.items() if now - finished_at > self.window]:
+            del self.recent[key]
+
+    async def do(self, key, fn, *args, cache_if=None, gate=None, **kwargs):
+        """
+        Runs the blocking `fn(*args, **kwargs)` in the threadpool once per key.
+        Returns (result, shared) where shared is True if this caller reused
+        another caller's computation. Results are only kept for the window
+        when `cache_if(result)` is true (default: always). `gate()`, if given,
+        is an async context manager entered around the computation (e.g. an
+        admission slot), so callers that join it never wait for one themselves.
+        """
+        now = time.monotonic()
+        self._prune(now)
+        if key in self.recent:
+            self.coalesced += 1
+            return self.recent[key][1], True
+
+        if key in self.inflight:
+            self.coalesced += 1
+            # shield() so one client disconnecting doesn't cancel the others' result
+            return await asyncio.shield(self.inflight[key]), True
+
+        task = asyncio.ensure_future(self._run(fn, args, kwargs, gate))
+        self.inflight[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t, cache_if))
+        return await asyncio.shield(task), False
+
+    async def _run(self, fn, args, kwargs, gate):
+        if gate is None:
+            return await run_in_threadpool(fn, *args, **kwargs)
+        async with gate():
+            return await run_in_threadpool(fn, *args, **kwargs)
+
+    def _finish(self, key, task, cache_if):
+        if self.inflight.get(key) is task:
+            del self.inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if cache_if is None or cache_if(result):
+            self.recent[key] = (time.monotonic(), result)
+
+    def stats(self):
+        return {
+            "inflight": len(self.inflight),
+            "cached": len(self.recent),
+            "coalesced": self.coalesced,
+        }
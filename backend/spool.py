@@ -0,0 +1,216 @@
+import os
+import re
+import json
+import uuid
+import shutil
+import threading
+from datetime import datetime
+
+# --- Run Spool ---
+# Every scan run gets its own directory under RUNS_DIR:
+#   runs/<run_id>/manifest.json  -> run config + progress
+#   runs/<run_id>/results.jsonl  -> one line per finished query, appended as it arrives
+RUNS_DIR = os.getenv("SCOUT_RUNS_DIR", "runs")
+
+RUN_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Statuses that count as "finished" when resuming. Errors are retried.
+DONE_STATUSES = ("ok", "empty")
+
+
+def new_run_id():
+    """
+    Generates a sortable, unique run id (e.g. 20251128-091500-1a2b3c4d).
+    """
+    return datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:8]
+
+
+def delete_run(run_id: str, runs_dir: str = None):
+    """
+    Removes a run's spool directory. Returns True if there was one.
+    """
+    if not RUN_ID_PATTERN.match(run_id or ""):
+        return False
+    path = os.path.join(runs_dir or RUNS_DIR, run_id)
+    if not os.path.isdir(path):
+        return False
+    shutil.rmtree(path)
+    return True
+
+
+def render_record(record):
+    """
+    Turns a spooled record into the text block used in the report prompt.
+    Returns None for records that should not be shown to the LLM.
+    """
+    status = record.get("status")
+    if status == "empty":
+        return None
+    if status == "error":
+        # Pillar searches store a ready "Error fetching ..." line; target searches keep the
+        # provider's error, shown under the target's header like any other result
+        result = record.get("result")
+        if not result:
+            return None
+        return result if result.startswith("Error fetching") else f"--- {record['label']} ---\n{result}"
+    return f"--- {record['label']} ---\n{record['result']}"
+
+
+class RunSpool:
+    """
+    Append-only, on-disk store for the results of a single scan run.
+    Results are written as soon as each query finishes, so a crashed or
+    timed-out run can be resumed with the same run id.
+    """
+
+    def __init__(self, run_id: str, runs_dir: str = None):
+        if not RUN_ID_PATTERN.match(run_id or ""):
+            raise ValueError(f"Invalid run id: {run_id!r}")
+        self.run_id = run_id
+        self.path = os.path.join(runs_dir or RUNS_DIR, run_id)
+        self.manifest_path = os.path.join(self.path, "manifest.json")
+        self.results_path = os.path.join(self.path, "results.jsonl")
+        os.makedirs(self.path, exist_ok=True)
+        # Batch scans append from several worker threads
+        self.lock = threading.Lock()
+
+    # --- Manifest ---
+
+    def load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_manifest(self, manifest: dict):
+        manifest["updated_at"] = datetime.now().isoformat()
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def start(self, config: dict, planned: int, **extra):
+        """
+        Creates the manifest for a new run, or validates it when resuming.
+        Returns the manifest, or raises ValueError if the run id is already
+        used by a run with a different configuration. `extra` fields are
+        only recorded for new runs.
+        """
+        manifest = self.load_manifest()
+        if manifest:
+            if manifest.get("config") != config:
+                raise ValueError(f"Run {self.run_id} was started with a different configuration.")
+            print(f"DEBUG: Resuming run {self.run_id} ({len(self.completed_keys())}/{planned} queries done)")
+        else:
+            manifest = {
+                "run_id": self.run_id,
+                "config": config,
+                "created_at": datetime.now().isoformat(),
+                **extra,
+            }
+        manifest["status"] = "running"
+        manifest["planned"] = planned
+        manifest["completed"] = len(self.completed_keys())
+        self.write_manifest(manifest)
+        return manifest
+
+    def finish(self, status: str = "complete", **extra):
+        manifest = self.load_manifest() or {"run_id": self.run_id}
+        manifest["status"] = status
+        manifest["completed"] = len(self.completed_keys())
+        manifest.update(extra)
+        self.write_manifest(manifest)
+        return manifest
+
+    # --- Results ---
+
+    def append(self, key: str, label: str, status: str, result, provider: str = None):
+        """
+        Appends one query result (and the provider that served it) and flushes it to disk immediately.
+        """
+        record = {
+            "key": key,
+            "label": label,
+            "status": status,
+            "result": result,
+            "provider": provider,
+            "at": datetime.now().isoformat(),
+        }
+        line = json.dumps(record, default=str)
+        with self.lock:
+            with open(self.results_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def iter_records(self):
+        """
+        Streams records from disk one at a time.
+        A truncated final line (from a crash mid-write) is skipped.
+        """
+        if not os.path.exists(self.results_path):
+            return
+        with open(self.results_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def completed_keys(self):
+        return {r["key"] for r in self.iter_records() if r.get("status") in DONE_STATUSES}
+
+    def _latest_offsets(self):
+        """
+        Maps each key to the byte offset of its most recent record, so
+        results can be read back in plan order without loading the whole spool.
+        """
+        offsets = {}
+        if not os.path.exists(self.results_path):
+            return offsets
+        with open(self.results_path, "rb") as f:
+            offset = 0
+            for raw_line in f:
+                try:
+                    record = json.loads(raw_line)
+                    offsets[record["key"]] = offset
+                except (json.JSONDecodeError, KeyError):
+                    pass
+                offset += len(raw_line)
+        return offsets
+
+    def read_records(self, keys):
+        """
+        Yields the latest record for each key, in the order given.
+        Keys with no record are skipped.
+        """
+        offsets = self._latest_offsets()
+        if not offsets:
+            return
+        with open(self.results_path, "rb") as f:
+            for key in keys:
+                if key not in offsets:
+                    continue
+                f.seek(offsets[key])
+                yield json.loads(f.readline())
+
+    def read_text(self, keys, limit: int = None, transform=None):
+        """
+        Assembles the prompt text from spooled results, stopping once
+        `limit` characters have been collected. `transform(record)` may
+        rewrite each record before it is rendered.
+        """
+        parts = []
+        size = 0
+        for record in self.read_records(keys):
+            if transform:
+                record = transform(record)
+            text = render_record(record)
+            if not text:
+                continue
+            if limit is not None and size + len(text) > limit:
+                parts.append(text[:max(limit - size, 0)])
+                break
+            parts.append(text)
+            size += len(text) + 2
+        return "\n\n".join(parts)
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from admission import AdmissionController
+
+
+def controller(limit=1, queue_size=1, max_wait=5, worker_slots=4, reserved=1):
+    return AdmissionController(
+        classes={"interactive": (4, 10, 0, 5), "scan": (limit, queue_size, 2, max_wait)},
+        worker_slots=worker_slots,
+        reserved=reserved,
+    )
+
+
+async def settle():
+    # Let queued callers reach their await points
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    async def scenario():
+        admission = controller()
+        await admission.acquire("scan")
+        waiter = asyncio.ensure_future(admission.acquire("scan"))
+        await settle()
+        with pytest.raises(HTTPException) as rejected:
+            await admission.acquire("scan")
+        admission.release("scan")
+        await waiter
+        return admission, rejected.value
+
+    admission, error = asyncio.run(scenario())
+    assert error.status_code == 429 and "queue full" in error.detail
+    assert int(error.headers["Retry-After"]) >= 1
+    assert admission.classes["scan"].rejected == 1
+    assert admission.classes["scan"].admitted == 2
+
+
+def test_queue_wait_times_out():
+    async def scenario():
+        admission = controller(max_wait=0.05)
+        await admission.acquire("scan")
+        with pytest.raises(HTTPException) as rejected:
+            await admission.acquire("scan")
+        return admission, rejected.value
+
+    admission, error = asyncio.run(scenario())
+    assert error.status_code == 429 and "timed out" in error.detail
+    assert admission.classes["scan"].timed_out == 1
+    assert not admission.classes["scan"].waiters
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        admission = controller(queue_size=2)
+        await admission.acquire("scan")
+        cancelled = asyncio.ensure_future(admission.acquire("scan"))
+        waiter = asyncio.ensure_future(admission.acquire("scan"))
+        await settle()
+        cancelled.cancel()
+        await settle()
+        queued = len(admission.classes["scan"].waiters)
+        admission.release("scan")
+        await waiter
+        return admission, queued
+
+    admission, queued = asyncio.run(scenario())
+    assert queued == 1
+    assert admission.classes["scan"].in_flight == 1
+    assert admission.in_flight == 1
+
+
+def test_cancel_after_admission_returns_the_slot():
+    async def scenario():
+        admission = controller()
+
+        async def request():
+            async with admission.slot("scan"):
+                await asyncio.sleep(0)
+
+        await admission.acquire("scan")
+        waiter = asyncio.ensure_future(request())
+        await settle()
+        # Admitted and cancelled before the waiter resumes
+        admission.release("scan")
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        return admission
+
+    admission = asyncio.run(scenario())
+    assert admission.classes["scan"].in_flight == 0
+    assert admission.in_flight == 0
+
+
+def test_reserved_slots_only_go_to_interactive():
+    async def scenario():
+        admission = controller(limit=4, queue_size=4, max_wait=0.05, worker_slots=2, reserved=1)
+        await admission.acquire("scan")
+        with pytest.raises(HTTPException):
+            await admission.acquire("scan")
+        await admission.acquire("interactive")
+        return admission
+
+    admission = asyncio.run(scenario())
+    assert admission.in_flight == 2
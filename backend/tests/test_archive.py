@@ -0,0 +1,24 @@
+from archive import entity_matcher
+
+ENTITIES = ["NICE", "Box", "Slack", "Zoom", "Mural", "Global Relay", "Smarsh"]
+
+
+def test_entity_matcher_ignores_ordinary_words():
+    tag = entity_matcher(ENTITIES)
+    assert tag("They shipped a nice box of slack to zoom in on the mural.") == set()
+
+
+def test_entity_matcher_tags_proper_nouns():
+    tag = entity_matcher(ENTITIES)
+    text = "NICE and Global Relay partnered with Box, while Slack and Zoom added Smarsh archiving."
+    assert tag(text) == {"NICE", "Global Relay", "Box", "Slack", "Zoom", "Smarsh"}
+
+
+def test_entity_matcher_needs_whole_words():
+    tag = entity_matcher(ENTITIES)
+    assert tag("Boxed Slacks at Zoomtopia") == set()
+
+
+def test_entity_matcher_without_entities():
+    assert entity_matcher([]) is None
+    assert entity_matcher(["", None]) is None
@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker, "time", SimpleNamespace(monotonic=clock))
+    monkeypatch.setattr(circuit_breaker, "BREAKER_MIN_CALLS", 4)
+    monkeypatch.setattr(circuit_breaker, "BREAKER_ERROR_RATE", 0.5)
+    monkeypatch.setattr(circuit_breaker, "BREAKER_SLOW_SECONDS", 20)
+    monkeypatch.setattr(circuit_breaker, "BREAKER_SLOW_RATE", 0.8)
+    monkeypatch.setattr(circuit_breaker, "BREAKER_COOLDOWN", 30)
+    monkeypatch.setattr(circuit_breaker, "BREAKER_WINDOW_SECONDS", 300)
+    return clock
+
+
+def tripped(clock):
+    breaker = CircuitBreaker("tavily")
+    for ok in (True, False, False, True):
+        assert breaker.allow()
+        breaker.record(ok, 1.0)
+    assert breaker.state == OPEN
+    return breaker
+
+
+def test_stays_closed_below_min_calls(clock):
+    breaker = CircuitBreaker("tavily")
+    for _ in range(3):
+        breaker.record(False, 1.0)
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_opens_on_error_rate_and_rejects(clock):
+    breaker = tripped(clock)
+    assert not breaker.allow()
+    assert breaker.snapshot()["rejected"] == 1
+    assert breaker.snapshot()["retry_in"] == 30
+
+
+def test_opens_on_slow_calls(clock):
+    breaker = CircuitBreaker("tavily")
+    for _ in range(4):
+        breaker.record(True, 25.0)
+    assert breaker.state == OPEN
+
+
+def test_old_calls_leave_the_window(clock):
+    breaker = CircuitBreaker("tavily")
+    for _ in range(3):
+        breaker.record(False, 1.0)
+    clock.now += 301
+    breaker.record(False, 1.0)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_a_single_probe(clock):
+    breaker = tripped(clock)
+    clock.now += 30
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes(clock):
+    breaker = tripped(clock)
+    clock.now += 30
+    breaker.allow()
+    breaker.record(True, 1.0)
+
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["calls"] == 0
+    assert breaker.allow()
+
+
+@pytest.mark.parametrize("ok, latency", [(False, 1.0), (True, 25.0)])
+def test_failed_or_slow_probe_reopens(clock, ok, latency):
+    breaker = tripped(clock)
+    clock.now += 30
+    breaker.allow()
+    breaker.record(ok, latency)
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
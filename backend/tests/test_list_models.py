@@ -0,0 +1,39 @@
+import argparse
+
+import list_models
+from prompts import chat_prompt, report_prompt
+
+
+def fake_backend():
+    return list_models.FakeBackend(argparse.Namespace(fake_speed=1000.0, seed=42))
+
+
+def test_suite_runs_the_production_prompts():
+    suite = {task: prompt for task, prompt, _ in list_models.prompt_suite()}
+    assert set(suite) == {"report", "chat", "email", "swot"}
+    assert str(suite["report"]) == str(report_prompt("7d", list_models.SAMPLE_RAW_DATA))
+    assert suite["chat"].template is chat_prompt("", "").template
+
+
+def test_fake_backend_benchmarks_offline():
+    backend = fake_backend()
+    results = list_models.benchmark(backend, backend.models()[:1], repeats=2)
+
+    stats = results[backend.models()[0]]
+    assert set(stats) == {"report", "chat", "email", "swot"}
+    for task in stats.values():
+        assert task["runs"] == 2 and task["errors"] == 0
+        assert task["ttft_p50"] <= task["latency_p50"]
+        assert task["tokens_per_second_avg"] > 0
+    assert 0 <= stats["swot"]["card_valid_rate"] <= 1
+
+
+def test_failed_stream_is_an_error_sample():
+    class Failing:
+        def stream(self, model, prompt, response_schema=None):
+            raise RuntimeError("quota")
+            yield
+
+    sample = list_models.run_once(Failing(), "gemini-2.5-flash", "prompt")
+    assert not sample["ok"] and "quota" in sample["error"]
+    assert list_models.summarize("chat", [sample])["errors"] == 1
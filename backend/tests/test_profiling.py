@@ -0,0 +1,46 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import profiling
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILES_DIR", str(tmp_path / "profiles"))
+    monkeypatch.setattr(profiling, "PROFILE_PATHS", ["/health"])
+    return TestClient(main.app)
+
+
+def set_token(monkeypatch, token: str):
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", token)
+    monkeypatch.setattr(main, "ADMIN_TOKEN", token)
+
+
+def test_nothing_is_profiled_without_a_token(client, monkeypatch):
+    set_token(monkeypatch, "")
+
+    response = client.get("/health")
+    assert "x-scout-profile-id" not in response.headers
+    assert profiling.list_profile_ids() == []
+    assert client.get("/api/profiles").status_code == 404
+
+
+def test_profiles_require_the_token(client, monkeypatch):
+    set_token(monkeypatch, "secret")
+
+    profile_id = client.get("/health").headers["x-scout-profile-id"]
+    assert client.get("/api/profiles").status_code == 403
+    assert client.get(f"/api/profiles/{profile_id}", headers={"X-Scout-Admin-Token": "wrong"}).status_code == 403
+
+    response = client.get("/api/profiles", headers={"X-Scout-Admin-Token": "secret"})
+    assert [p["profile_id"] for p in response.json()["profiles"]] == [profile_id]
+
+
+def test_profile_header_needs_the_token(monkeypatch):
+    set_token(monkeypatch, "secret")
+    scope = {"path": "/api/run", "headers": [(profiling.PROFILE_HEADER, b"true")]}
+
+    assert not profiling.should_profile(scope)
+    scope["headers"].append((profiling.TOKEN_HEADER, b"secret"))
+    assert profiling.should_profile(scope)
@@ -0,0 +1,27 @@
+from model_router import PROMPT_CACHE_MIN_CHARS
+from prompts import deep_dive_prompt, email_prompt, report_prompt
+
+
+def test_report_keeps_original_order():
+    text = str(report_prompt("7d", "RAW"))
+    assert text.index("**COMPETITOR WEIGHTING:**") < text.index("Time Period: 7d") < text.index("RAW")
+    assert text.index("RAW") < text.index("**LOGIC FOR MICROSOFT:**") < text.index("**FORMATTING RULES:**")
+
+
+def test_report_static_block_is_cacheable():
+    prompt = report_prompt("7d", "RAW")
+    assert len(prompt.static) >= PROMPT_CACHE_MIN_CHARS
+    assert "Time Period" not in prompt.static
+    assert str(prompt) == prompt.static + prompt.dynamic
+
+
+def test_values_only_land_in_the_dynamic_part():
+    prompt = email_prompt("SEC fines", "Jordan")
+    assert "Jordan" in prompt.dynamic and "Jordan" not in prompt.static
+    assert prompt.static.strip() == "You are a top-tier enterprise sales representative for Theta Lake."
+
+
+def test_prompt_without_split_is_all_dynamic():
+    prompt = deep_dive_prompt("Off-channel fines", "RESULTS")
+    assert prompt.static == ""
+    assert str(prompt) == prompt.dynamic
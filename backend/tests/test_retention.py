@@ -0,0 +1,95 @@
+import os
+import time
+
+import pytest
+
+import artifacts
+import report_model
+import retention
+import scheduler
+import spool
+
+
+@pytest.fixture
+def run_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(spool, "RUNS_DIR", str(tmp_path / "runs"))
+    monkeypatch.setattr(report_model, "REPORTS_DIR", str(tmp_path / "reports"))
+    monkeypatch.setattr(artifacts, "ARTIFACTS_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(scheduler, "ARTIFACTS_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(scheduler, "PREWARM_INDEX", str(tmp_path / "artifacts" / "prewarm.json"))
+    monkeypatch.setattr(retention, "RUN_RETENTION_DAYS", 7)
+    monkeypatch.setattr(retention, "RUN_RETENTION_COUNT", 0)
+    return tmp_path
+
+
+def make_run(run_id: str, age_days: float, status: str = "complete", report_ids=None):
+    run = spool.RunSpool(run_id)
+    run.start({"time_range": "7d"}, planned=1)
+    run.append("q", "Query", "ok", "result")
+    report_ids = report_ids or [run_id]
+    for report_id in report_ids:
+        report_model.save_report({"id": report_id, "sections": [], "markdown": "# Report"})
+        os.makedirs(os.path.dirname(artifacts.artifact_path(report_id, artifacts.PDF)))
+        with open(artifacts.artifact_path(report_id, artifacts.PDF), "wb") as f:
+            f.write(b"%PDF")
+    if len(report_ids) > 1:
+        run.finish(status, report_ids=report_ids)
+    else:
+        run.finish(status, report_id=run_id)
+    modified = time.time() - age_days * 86400
+    for path in (run.path, run.manifest_path, run.results_path):
+        os.utime(path, (modified, modified))
+    return run_id
+
+
+def exists(run_id: str, report_id: str = None):
+    report_id = report_id or run_id
+    return (
+        os.path.isdir(os.path.join(spool.RUNS_DIR, run_id)),
+        report_model.report_exists(report_id),
+        artifacts.has_artifact(report_id, artifacts.PDF),
+    )
+
+
+def test_runs_older_than_the_limit_are_deleted(run_dirs):
+    make_run("old", age_days=10, report_ids=["old-24h", "old-7d"])
+    make_run("new", age_days=1)
+
+    assert retention.prune_runs() == ["old"]
+    assert exists("old", "old-24h") == exists("old", "old-7d") == (False, False, False)
+    assert exists("new") == (True, True, True)
+
+
+def test_only_the_newest_runs_are_kept(run_dirs, monkeypatch):
+    monkeypatch.setattr(retention, "RUN_RETENTION_DAYS", 0)
+    monkeypatch.setattr(retention, "RUN_RETENTION_COUNT", 2)
+    for index, run_id in enumerate(["a", "b", "c", "d"]):
+        make_run(run_id, age_days=4 - index)
+
+    assert retention.prune_runs() == ["a", "b"]
+    assert sorted(os.listdir(spool.RUNS_DIR)) == ["c", "d"]
+
+
+def test_prewarmed_runs_are_kept(run_dirs):
+    make_run("warm", age_days=10)
+    scheduler.PrewarmScheduler([])._record_version("7d:tavily:deep", {"report_id": "warm", "run_id": "warm", "generated_ts": 0})
+
+    assert retention.prune_runs() == []
+    assert exists("warm") == (True, True, True)
+
+
+def test_runs_in_progress_are_kept(run_dirs, monkeypatch):
+    monkeypatch.setattr(retention, "RUN_RETENTION_COUNT", 1)
+    make_run("live", age_days=0.01, status="running")
+    make_run("done", age_days=0)
+
+    assert retention.prune_runs() == []
+    assert exists("live") == (True, True, True)
+
+
+def test_retention_off(run_dirs, monkeypatch):
+    monkeypatch.setattr(retention, "RUN_RETENTION_DAYS", 0)
+    make_run("old", age_days=100)
+
+    assert retention.RunRetention().maybe_prune() is False
+    assert retention.prune_runs() == []
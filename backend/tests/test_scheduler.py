@@ -0,0 +1,82 @@
+import os
+import time
+
+import pytest
+
+import artifacts
+import report_model
+import scheduler
+import spool
+
+
+@pytest.fixture
+def prewarm_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(spool, "RUNS_DIR", str(tmp_path / "runs"))
+    monkeypatch.setattr(report_model, "REPORTS_DIR", str(tmp_path / "reports"))
+    monkeypatch.setattr(artifacts, "ARTIFACTS_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(scheduler, "ARTIFACTS_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(scheduler, "PREWARM_INDEX", str(tmp_path / "artifacts" / "prewarm.json"))
+    monkeypatch.setattr(scheduler, "PREWARM_KEEP_VERSIONS", 2)
+    return tmp_path
+
+
+def make_version(report_id: str, run_id: str = None):
+    run_id = run_id or report_id
+    spool.RunSpool(run_id).append("q", "Query", "ok", "result")
+    report_model.save_report({"id": report_id, "sections": [], "markdown": "# Report"})
+    os.makedirs(os.path.dirname(artifacts.artifact_path(report_id, artifacts.PDF)))
+    with open(artifacts.artifact_path(report_id, artifacts.PDF), "wb") as f:
+        f.write(b"%PDF")
+    return {"report_id": report_id, "run_id": run_id, "generated_ts": 0}
+
+
+def stored(report_id: str, run_id: str = None):
+    return (
+        report_model.report_exists(report_id),
+        artifacts.has_artifact(report_id, artifacts.PDF),
+        os.path.isdir(os.path.join(spool.RUNS_DIR, run_id or report_id)),
+    )
+
+
+def test_trimmed_versions_are_deleted(prewarm_dirs):
+    prewarm = scheduler.PrewarmScheduler([])
+    for report_id in ("v1", "v2", "v3"):
+        prewarm._record_version("7d:tavily:deep", make_version(report_id))
+
+    assert [v["report_id"] for v in prewarm.versions("7d:tavily:deep")] == ["v2", "v3"]
+    assert stored("v1") == (False, False, False)
+    assert stored("v2") == (True, True, True)
+    assert stored("v3") == (True, True, True)
+
+
+def test_shared_run_spool_is_kept_while_referenced(prewarm_dirs):
+    prewarm = scheduler.PrewarmScheduler([])
+    prewarm._record_version("7d:tavily:deep", make_version("sweep-7d", "sweep"))
+    prewarm._record_version("30d:tavily:deep", make_version("sweep-30d", "sweep"))
+    for report_id in ("v2", "v3"):
+        prewarm._record_version("7d:tavily:deep", make_version(report_id))
+
+    # The 7d report is gone, but the 30d report built from the same sweep still needs the spool
+    assert stored("sweep-7d", "sweep") == (False, False, True)
+    assert stored("sweep-30d", "sweep") == (True, True, True)
+
+
+def test_version_numbers_keep_counting_after_trimming(prewarm_dirs):
+    prewarm = scheduler.PrewarmScheduler([])
+    for number in range(1, 6):
+        prewarm._record_version("7d:tavily:deep", make_version(f"v{number}"))
+
+    assert [v["version"] for v in prewarm.versions("7d:tavily:deep")] == [4, 5]
+
+
+def test_latest_is_capped_by_the_report_window(prewarm_dirs, monkeypatch):
+    monkeypatch.setattr(scheduler, "PREWARM_MAX_AGE_MINUTES", 720)
+    monkeypatch.setattr(scheduler, "PREWARM_MAX_AGE_FRACTION", 0.25)
+    prewarm = scheduler.PrewarmScheduler([])
+    eight_hours_ago = time.time() - 8 * 3600
+    for key in ("24h:tavily:deep", "7d:tavily:deep"):
+        prewarm._record_version(key, {**make_version(key.split(":")[0]), "generated_ts": eight_hours_ago})
+
+    # 8h old: too stale for a 24h report (6h cap), still fine for 7d (12h cap)
+    assert prewarm.latest("24h", "tavily", "deep") is None
+    assert prewarm.latest("7d", "tavily", "deep")["report_id"] == "7d"
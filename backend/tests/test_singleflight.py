@@ -0,0 +1,108 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+from singleflight import SingleFlight
+
+
+class Work:
+    """
+    A blocking function that counts its calls and waits until released.
+    """
+
+    def __init__(self, result="report"):
+        self.result = result
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self, *args):
+        self.calls += 1
+        self.release.wait(5)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+async def settle():
+    # Let queued callers reach their await points
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+
+def test_identical_calls_share_one_computation():
+    async def scenario():
+        flight, work = SingleFlight(window=60), Work()
+        calls = [asyncio.ensure_future(flight.do("k", work)) for _ in range(3)]
+        await settle()
+        work.release.set()
+        return work, await asyncio.gather(*calls)
+
+    work, results = asyncio.run(scenario())
+    assert work.calls == 1
+    assert [r for r, _ in results] == ["report"] * 3
+    assert sorted(shared for _, shared in results) == [False, True, True]
+
+
+def test_finished_result_is_reused_within_the_window_only_if_cacheable():
+    async def scenario():
+        flight, work = SingleFlight(window=60), Work()
+        work.release.set()
+        await flight.do("kept", work)
+        reused = await flight.do("kept", work)
+        await flight.do("dropped", work, cache_if=lambda r: False)
+        await flight.do("dropped", work, cache_if=lambda r: False)
+        return work, reused, flight.stats()
+
+    work, reused, stats = asyncio.run(scenario())
+    assert reused == ("report", True)
+    assert work.calls == 3
+    assert stats["cached"] == 1
+
+
+def test_only_the_leader_enters_the_gate():
+    async def scenario():
+        flight, work = SingleFlight(window=60), Work()
+        entered = []
+
+        @asynccontextmanager
+        async def gate():
+            entered.append(True)
+            yield
+
+        calls = [asyncio.ensure_future(flight.do("k", work, gate=gate)) for _ in range(4)]
+        await settle()
+        work.release.set()
+        await asyncio.gather(*calls)
+        return entered
+
+    assert len(asyncio.run(scenario())) == 1
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    async def scenario():
+        flight, work = SingleFlight(window=60), Work()
+        leader = asyncio.ensure_future(flight.do("k", work))
+        follower = asyncio.ensure_future(flight.do("k", work))
+        await settle()
+        leader.cancel()
+        await settle()
+        work.release.set()
+        return await follower, leader.cancelled()
+
+    (result, shared), leader_cancelled = asyncio.run(scenario())
+    assert leader_cancelled
+    assert (result, shared) == ("report", True)
+
+
+def test_failures_reach_every_caller_and_are_not_cached():
+    async def scenario():
+        flight, work = SingleFlight(window=60), Work(RuntimeError("provider down"))
+        calls = [asyncio.ensure_future(flight.do("k", work)) for _ in range(2)]
+        await settle()
+        work.release.set()
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        return results, flight.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert stats["cached"] == 0 and stats["inflight"] == 0
@@ -0,0 +1,75 @@
+import pytest
+
+import agent
+import spool
+
+
+@pytest.fixture
+def run_spool(tmp_path, monkeypatch):
+    monkeypatch.setattr(spool, "RUNS_DIR", str(tmp_path / "runs"))
+    return spool.RunSpool("run-1")
+
+
+def entry(key, **extra):
+    return {"key": key, "label": key.title(), "query": key, "topic": "news", "days": 7, "max_results": 5, **extra}
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    """
+    Fakes the search layer: queries listed in `failing` return a provider error.
+    """
+    calls = []
+    failing = set()
+
+    def search_with_fallback(query, **kwargs):
+        calls.append(query)
+        if query in failing:
+            return "tavily", f"Error querying Tavily: {query} timed out"
+        return "tavily", f"- **{query} news** (https://example.com/{query})"
+
+    monkeypatch.setattr(agent, "search_with_fallback", search_with_fallback)
+    return calls, failing
+
+
+def test_resume_with_different_config_is_rejected(run_spool):
+    run_spool.start({"time_range": "7d"}, planned=2)
+    resumed = spool.RunSpool("run-1")
+
+    assert resumed.start({"time_range": "7d"}, planned=2)["status"] == "running"
+    with pytest.raises(ValueError):
+        resumed.start({"time_range": "30d"}, planned=2)
+
+
+def test_resume_retries_only_failed_entries(run_spool, searches):
+    calls, failing = searches
+    plan = [entry("zoom"), entry("slack")]
+    failing.add("slack")
+
+    assert agent.execute_plan(plan, run_spool) == ["zoom", "slack"]
+    assert run_spool.completed_keys() == {"zoom"}
+
+    failing.clear()
+    assert agent.execute_plan(plan, spool.RunSpool("run-1")) == ["slack"]
+    assert calls == ["zoom", "slack", "slack"]
+    assert run_spool.completed_keys() == {"zoom", "slack"}
+    assert "Error" not in run_spool.read_text(["zoom", "slack"])
+
+
+def test_target_search_errors_reach_the_prompt(run_spool, searches):
+    _, failing = searches
+    failing.update({"zoom", "regulatory"})
+    agent.execute_plan([entry("zoom"), entry("regulatory", error_label="Regulatory Enforcement")], run_spool)
+
+    text = run_spool.read_text(["zoom", "regulatory"])
+    assert "--- Zoom ---\nError querying Tavily: zoom timed out" in text
+    assert "Error fetching Regulatory Enforcement: Error querying Tavily: regulatory timed out" in text
+
+
+def test_truncated_last_line_is_skipped(run_spool):
+    run_spool.append("zoom", "Zoom", "ok", "result")
+    with open(run_spool.results_path, "a", encoding="utf-8") as f:
+        f.write('{"key": "slack", "lab')
+
+    assert run_spool.completed_keys() == {"zoom"}
+    assert list(run_spool.read_records(["zoom", "slack"]))[0]["result"] == "result"
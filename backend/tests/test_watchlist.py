@@ -0,0 +1,63 @@
+import pytest
+
+from watchlist import DEFAULT_INTERVAL_HOURS, INTERVAL_GROWTH, Watchlist, item_fingerprints
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = Watchlist(str(tmp_path / "watchlist.json"))
+    store.seed(["Teams"], [])
+    return store
+
+
+def target(store, name="Teams"):
+    return next(t for t in store.targets() if t["name"] == name)
+
+
+def test_no_result_strings_have_no_items():
+    assert item_fingerprints("No results found.") == []
+    assert item_fingerprints("") == []
+
+
+def test_markdown_results_fingerprint_on_urls():
+    result = "- **Teams update** (https://example.com/a)\n  Summary\n- **Other** (https://example.com/b)\n"
+    assert item_fingerprints(result) == ["https://example.com/a", "https://example.com/b"]
+
+
+def test_prose_fingerprints_on_cited_urls_only():
+    first = "Teams shipped recording changes [1].\n\n[1] https://example.com/a."
+    reworded = "Microsoft changed how Teams records meetings [1].\n\n[1] https://example.com/a."
+    assert item_fingerprints(first) == item_fingerprints(reworded) == ["https://example.com/a"]
+
+
+def test_uncited_prose_is_not_countable():
+    assert item_fingerprints("Teams shipped several recording changes this week.") is None
+
+
+def test_reworded_prose_is_not_news(store):
+    store.record_polls({"Teams": "Teams shipped recording changes this week."})
+    store.record_polls({"Teams": "This week Teams changed its recording features."})
+
+    polled = target(store)
+    assert polled["polls"] == 2
+    assert polled["hits"] == 0
+    assert polled["interval_hours"] == DEFAULT_INTERVAL_HOURS
+
+
+def test_no_results_is_a_quiet_poll(store):
+    store.record_polls({"Teams": "No results found."})
+
+    polled = target(store)
+    assert polled["hits"] == 0
+    assert polled["seen_items"] == []
+    assert polled["interval_hours"] == DEFAULT_INTERVAL_HOURS * INTERVAL_GROWTH
+
+
+def test_repeat_citations_count_once(store):
+    result = "Teams news [1].\n\n[1] https://example.com/a"
+    store.record_polls({"Teams": result})
+    store.record_polls({"Teams": "Reworded Teams news [1].\n\n[1] https://example.com/a"})
+
+    polled = target(store)
+    assert polled["hits"] == 1
+    assert polled["seen_items"] == ["https://example.com/a"]
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import spool
+from windows import derive_window, has_undated_items
+
+
+@pytest.fixture
+def run_spool(tmp_path, monkeypatch):
+    monkeypatch.setattr(spool, "RUNS_DIR", str(tmp_path / "runs"))
+    return spool.RunSpool("sweep")
+
+
+def days_ago(days: int):
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+SWEEP = [
+    {"key": "competitor:Smarsh", "label": "Smarsh Activity", "query": "Smarsh", "topic": "general", "days": 30, "windowed": True},
+    {"key": "partner:Zoom", "label": "Zoom Updates", "query": "Zoom", "topic": "news", "days": 30, "windowed": True},
+    {"key": "regulatory:strategy", "label": "Regulatory Strategy", "query": "SEC", "topic": "general", "days": 30},
+]
+
+
+def test_undated_old_item_is_not_in_a_derived_window(run_spool):
+    # Tavily "general" results carry no published date: a 20-day-old item looks like any other
+    run_spool.append("competitor:Smarsh", "Smarsh Activity", "ok", {"results": [
+        {"title": "Smarsh old launch", "content": "twenty days old", "url": "https://example.com/old"},
+    ]})
+    run_spool.append("partner:Zoom", "Zoom Updates", "ok", {"results": [
+        {"title": "Zoom recent", "content": "two days old", "published_date": days_ago(2)},
+        {"title": "Zoom dated old", "content": "twenty days old", "published_date": days_ago(20)},
+    ]})
+    run_spool.append("regulatory:strategy", "Regulatory Strategy", "ok", "SEC priorities")
+
+    reran = []
+
+    def run(entries):
+        for entry in entries:
+            reran.append(entry)
+            # The provider, asked for the 7d window, only returns this week's item
+            run_spool.append(entry["key"], entry["label"], "ok", {"results": [
+                {"title": "Smarsh this week", "content": "three days old", "url": "https://example.com/new"},
+            ]})
+
+    keys, transform = derive_window(run_spool, SWEEP, 7, run, rekey=lambda e: f"{e['key']}@{e['days']}d")
+    text = run_spool.read_text(keys, transform=transform)
+
+    assert [(e["key"], e["days"]) for e in reran] == [("competitor:Smarsh@7d", 7)]
+    assert "Smarsh old launch" not in text
+    assert "Zoom dated old" not in text
+    assert "Smarsh this week" in text
+    assert "Zoom recent" in text
+    # Fixed-window entries are left alone
+    assert "SEC priorities" in text
+
+
+def test_reruns_are_not_repeated_on_resume(run_spool):
+    run_spool.append("competitor:Smarsh", "Smarsh Activity", "ok", "A prose summary with no dates")
+    run_spool.append("competitor:Smarsh@7d", "Smarsh Activity", "ok", "This week's summary")
+
+    def run(entries):
+        raise AssertionError(f"already spooled, should not re-run {entries}")
+
+    keys, transform = derive_window(run_spool, SWEEP[:1], 7, run, rekey=lambda e: f"{e['key']}@{e['days']}d")
+    assert keys == ["competitor:Smarsh@7d"]
+    assert "This week's summary" in run_spool.read_text(keys, transform=transform)
+
+
+def test_has_undated_items():
+    dated = f"- **Title** (https://example.com) [Date: {days_ago(1)}]: text..."
+    assert not has_undated_items(dated)
+    assert has_undated_items(dated + "\n- **Other** (https://example.com/2): snippet")
+    assert has_undated_items("Perplexity prose summary")
+    assert not has_undated_items("No results found.")
+    assert not has_undated_items({"results": [{"published_date": days_ago(1)}]})
+    assert has_undated_items({"results": [{"published_date": None}]})
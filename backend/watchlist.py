@@ -0,0 +1,221 @@
+import os
+import re
+import json
+import time
+import threading
+from datetime import datetime
+
+# --- Watchlist & Adaptive Polling ---
+# Partners and competitors live in watchlist.json (seeded from the built-in lists).
+# Each target keeps its own poll interval: finding new items halves it, a quiet poll
+# grows it. Every scan polls only the targets that are due, most overdue first,
+# within a global per-scan query budget, so busy targets (Teams, Zoom, Smarsh) are
+# searched often and quiet ones rarely.
+WATCHLIST_PATH = os.getenv("SCOUT_WATCHLIST_PATH", "watchlist.json")
+ADAPTIVE_POLLING = os.getenv("SCOUT_ADAPTIVE_POLLING", "false").lower() == "true"
+WATCHLIST_BUDGET = int(os.getenv("SCOUT_WATCHLIST_BUDGET", "30"))  # Max target searches per scan
+MIN_INTERVAL_HOURS = float(os.getenv("SCOUT_WATCHLIST_MIN_INTERVAL_HOURS", "6"))
+MAX_INTERVAL_HOURS = float(os.getenv("SCOUT_WATCHLIST_MAX_INTERVAL_HOURS", "336"))  # 2 weeks
+DEFAULT_INTERVAL_HOURS = 24.0
+INTERVAL_GROWTH = 1.5  # Quiet poll -> poll less often
+INTERVAL_SHRINK = 0.5  # New items -> poll more often
+SEEN_ITEMS_KEPT = 50
+
+KINDS = ("partner", "competitor")
+
+# Markdown links from the structured providers and bare citation URLs from Perplexity
+URL_PATTERN = re.compile(r'https?://[^\s)\]>"\']+')
+NO_RESULT_STRINGS = ("No results found.",)
+
+
+def item_fingerprints(result):
+    """
+    Identifies the items in a search result so repeat sightings aren't counted as news.
+    Returns None when the result can't be broken into items (uncited prose), in which
+    case the poll shouldn't count either way.
+    """
+    if isinstance(result, dict) and isinstance(result.get("results"), list):
+        return [r.get("url") or r.get("title") or "" for r in result["results"] if r.get("url") or r.get("title")]
+    if isinstance(result, str):
+        text = result.strip()
+        if not text or text in NO_RESULT_STRINGS:
+            return []
+        urls = [url.rstrip(".,;:") for url in URL_PATTERN.findall(text)]
+        if urls:
+            # Perplexity rewords its summary on every call, so only the cited sources identify items
+            return list(dict.fromkeys(urls))
+        return None
+    return []
+
+
+class Watchlist:
+    """
+    JSON-backed store of watched partners and competitors with per-target polling stats.
+    """
+
+    def __init__(self, path: str = WATCHLIST_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+
+    # --- Storage ---
+
+    def _load(self):
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {"targets": {}}
+
+    def _save(self, data):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _new_target(self, name: str, kind: str):
+        return {
+            "name": name,
+            "kind": kind,
+            "enabled": True,
+            "added_at": datetime.now().isoformat(),
+            "interval_hours": DEFAULT_INTERVAL_HOURS,
+            "polls": 0,
+            "hits": 0,
+            "last_polled": None,
+            "last_news_at": None,
+            "last_seen_item": None,
+            "seen_items": [],
+        }
+
+    def seed(self, partners, competitors):
+        """
+        Adds any built-in targets that aren't in the store yet.
+        """
+        with self.lock:
+            data = self._load()
+            changed = False
+            for kind, names in (("partner", partners), ("competitor", competitors)):
+                for name in names:
+                    if name not in data["targets"]:
+                        data["targets"][name] = self._new_target(name, kind)
+                        changed = True
+            if changed or not os.path.exists(self.path):
+                self._save(data)
+
+    # --- Management ---
+
+    def targets(self):
+        with self.lock:
+            return list(self._load()["targets"].values())
+
+    def names(self, kind: str):
+        """
+        Enabled targets of one kind, in insertion order.
+        """
+        return [t["name"] for t in self.targets() if t["kind"] == kind and t["enabled"]]
+
+    def add(self, name: str, kind: str):
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+        name = name.strip()
+        if not name:
+            raise ValueError("name is required")
+        with self.lock:
+            data = self._load()
+            target = data["targets"].get(name) or self._new_target(name, kind)
+            target["kind"] = kind
+            target["enabled"] = True
+            data["targets"][name] = target
+            self._save(data)
+            return target
+
+    def remove(self, name: str):
+        """
+        Disables a target (its history is kept in case it is re-added).
+        """
+        with self.lock:
+            data = self._load()
+            if name not in data["targets"]:
+                return False
+            data["targets"][name]["enabled"] = False
+            self._save(data)
+            return True
+
+    # --- Scheduling ---
+
+    def _overdue(self, target, now):
+        if not target["last_polled"]:
+            return float("inf")
+        elapsed_hours = (now - target["last_polled"]) / 3600
+        return elapsed_hours / target["interval_hours"]
+
+    def schedule(self, budget: int = WATCHLIST_BUDGET, now: float = None):
+        """
+        Returns every enabled target with its overdue ratio, most overdue first,
+        and whether it fits in this scan's budget.
+        """
+        now = now or time.time()
+        ranked = sorted(
+            (t for t in self.targets() if t["enabled"]),
+            key=lambda t: (-self._overdue(t, now), -(t["hits"] / t["polls"] if t["polls"] else 1)),
+        )
+        schedule = []
+        selected = 0
+        for target in ranked:
+            overdue = self._overdue(target, now)
+            due = overdue >= 1
+            poll = due and selected < budget
+            if poll:
+                selected += 1
+            schedule.append({
+                "name": target["name"],
+                "kind": target["kind"],
+                "interval_hours": round(target["interval_hours"], 1),
+                "overdue": None if overdue == float("inf") else round(overdue, 2),
+                "due": due,
+                "poll": poll,
+            })
+        return schedule
+
+    def select(self, budget: int = WATCHLIST_BUDGET):
+        """
+        Names of the targets to search in the next scan.
+        """
+        return [entry["name"] for entry in self.schedule(budget) if entry["poll"]]
+
+    def record_polls(self, results: dict):
+        """
+        Updates polling stats from {target name: search result or None on error}.
+        """
+        now = time.time()
+        with self.lock:
+            data = self._load()
+            for name, result in results.items():
+                target = data["targets"].get(name)
+                if not target:
+                    continue
+                target["last_polled"] = now
+                target["polls"] += 1
+                if result is None:
+                    # Failed search: try again at the same cadence
+                    continue
+
+                fingerprints = item_fingerprints(result)
+                if fingerprints is None:
+                    # Uncited prose: no way to tell new items from repeats, keep the cadence
+                    continue
+                new_items = [f for f in fingerprints if f not in target["seen_items"]]
+                if new_items:
+                    target["hits"] += 1
+                    target["last_news_at"] = now
+                    target["last_seen_item"] = new_items[0]
+                    target["seen_items"] = (new_items + target["seen_items"])[:SEEN_ITEMS_KEPT]
+                    target["interval_hours"] = max(target["interval_hours"] * INTERVAL_SHRINK, MIN_INTERVAL_HOURS)
+                else:
+                    target["interval_hours"] = min(target["interval_hours"] * INTERVAL_GROWTH, MAX_INTERVAL_HOURS)
+            self._save(data)
+
+
+watchlist = Watchlist()
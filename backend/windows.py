@@ -0,0 +1,199 @@
+import re
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+from agent import (
+    TIME_RANGE_DAYS, check_search_provider, discover_targets, plan_queries,
+    execute_plan, synthesize_report, store_report, poll_targets, record_target_polls, archive_run,
+)
+from spool import RunSpool, new_run_id
+from artifacts import build_pdf
+
+# --- Derived Time Windows ---
+# A 30d sweep already contains the 14d, 7d and 24h news. Instead of one sweep per
+# window, run the widest requested window once and answer the narrower ones by
+# filtering the spooled items on their published date before LLM summarization.
+# Items without a published date (Perplexity summaries, Tavily "general" results,
+# WebSearch / You.com snippets) can't be placed in a window, so a windowed search
+# whose result has any is re-run at the narrower window instead (see derive_window).
+
+# Exa results are spooled as "- **Title** (url) [Date: 2025-11-25T00:00:00.000Z]: text..."
+DATE_TAG_PATTERN = re.compile(r'\[Date: ([^\]]+)\]')
+ITEM_PREFIX = "- **"
+NO_RESULTS = "No results found."
+
+
+def parse_published(value):
+    """
+    Parses ISO 8601 (Exa) and RFC 2822 (Tavily news) dates. Returns None if unknown.
+    """
+    if not value or not isinstance(value, str) or value == "Unknown Date":
+        return None
+    try:
+        published = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            published = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return published
+
+
+def within_window(value, cutoff):
+    published = parse_published(value)
+    return published is None or published >= cutoff
+
+
+def has_undated_items(result):
+    """
+    True if the result has items without a usable published date.
+    """
+    if isinstance(result, dict) and isinstance(result.get("results"), list):
+        return any(
+            parse_published(r.get("published_date") or r.get("publishedDate")) is None
+            for r in result["results"] if isinstance(r, dict)
+        )
+    if isinstance(result, str):
+        if not result.strip() or result.strip() == NO_RESULTS:
+            return False
+        items = [line for line in result.split("\n") if line.startswith(ITEM_PREFIX)]
+        # No item lines at all: a prose summary
+        return not items or any(not DATE_TAG_PATTERN.search(line) for line in items)
+    return False
+
+
+def filter_result(result, cutoff):
+    """
+    Drops dated items older than cutoff, keeping the provider's result shape.
+    Returns (filtered_result, has_items).
+    """
+    if isinstance(result, dict) and isinstance(result.get("results"), list):
+        kept = [
+            r for r in result["results"]
+            if within_window(r.get("published_date") or r.get("publishedDate"), cutoff)
+        ]
+        return {**result, "results": kept}, bool(kept)
+    if isinstance(result, str):
+        lines = []
+        dropping = False
+        for line in result.split("\n"):
+            if line.startswith(ITEM_PREFIX):
+                date_tag = DATE_TAG_PATTERN.search(line)
+                dropping = bool(date_tag) and not within_window(date_tag.group(1), cutoff)
+            if dropping:
+                continue  # An old item, or a continuation line of its snippet
+            lines.append(line)
+        text = "\n".join(lines)
+        return text, bool(text.strip())
+    return result, True
+
+
+def window_transform(windowed_keys, days: int):
+    """
+    Builds a spool transform that narrows windowed records to the last `days` days.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+
+    def transform(record):
+        if record["key"] not in windowed_keys or record.get("status") != "ok":
+            return record
+        result, has_items = filter_result(record["result"], cutoff)
+        return {**record, "result": result, "status": "ok" if has_items else "empty"}
+
+    return transform
+
+
+def derive_window(spool: RunSpool, entries, days: int, run, rekey):
+    """
+    Narrows a spooled sweep to the last `days` days. Dated items are filtered locally;
+    windowed entries whose result has undated items are re-planned at `days`, keyed by
+    rekey(entry), and the ones not spooled yet are executed with run(entries).
+    Returns (keys, transform) for spool.read_text.
+    """
+    windowed_keys = {entry["key"] for entry in entries if entry.get("windowed")}
+    records = {record["key"]: record for record in spool.read_records(list(windowed_keys))}
+    reruns = {}
+    for entry in entries:
+        record = records.get(entry["key"])
+        if record and record.get("status") == "ok" and has_undated_items(record["result"]):
+            rerun = {**entry, "days": days, "windowed": False}
+            rerun["key"] = rekey(rerun)
+            reruns[entry["key"]] = rerun
+    if reruns:
+        done = spool.completed_keys()
+        pending = [rerun for rerun in reruns.values() if rerun["key"] not in done]
+        if pending:
+            print(f"DEBUG: {len(pending)} search(es) with undated results re-run for the {days}d window")
+            run(pending)
+    keys = [reruns[entry["key"]]["key"] if entry["key"] in reruns else entry["key"] for entry in entries]
+    return keys, window_transform(windowed_keys, days)
+
+
+def run_agent_windows(time_ranges, search_provider: str = "tavily", use_mock_data: bool = False, search_mode: str = "deep", run_id: str = None):
+    """
+    Generates one report per requested time range from a single search sweep.
+    Returns {time_range: {"report", "report_id", "pdf_url"}}, or an error string.
+    """
+    provider_error = check_search_provider(search_provider)
+    if provider_error:
+        return provider_error
+
+    time_ranges = list(dict.fromkeys(time_ranges))
+    unknown = [tr for tr in time_ranges if tr not in TIME_RANGE_DAYS]
+    if not time_ranges or unknown:
+        return f"Error: Unknown time range(s): {', '.join(unknown) or 'none given'}"
+
+    widest = max(time_ranges, key=TIME_RANGE_DAYS.get)
+    widest_days = TIME_RANGE_DAYS[widest]
+
+    # 1. Discovery + a single sweep for the widest window
+    partners, competitors = discover_targets()
+    try:
+        spool = RunSpool(run_id or new_run_id())
+        targets = poll_targets(spool)
+        plan = plan_queries(partners, competitors, widest_days, use_mock_data=use_mock_data, search_mode=search_mode, targets=targets)
+        spool.start({
+            "time_ranges": sorted(time_ranges, key=TIME_RANGE_DAYS.get),
+            "search_provider": search_provider,
+            "use_mock_data": use_mock_data,
+            "search_mode": search_mode,
+        }, planned=len(plan), targets=targets)
+    except ValueError as e:
+        return f"Error: {e}"
+
+    executed_keys = execute_plan(plan, spool, search_provider)
+    if not use_mock_data:
+        record_target_polls(plan, spool, executed_keys)
+    plan_keys = [entry["key"] for entry in plan]
+
+    # 2. One summarization per window, over locally filtered results
+    reports = {}
+    for time_range in time_ranges:
+        days = TIME_RANGE_DAYS[time_range]
+        keys, transform = plan_keys, None
+        if days < widest_days:
+            keys, transform = derive_window(
+                spool, plan, days,
+                run=lambda entries: execute_plan(entries, spool, search_provider),
+                rekey=lambda entry: f"{entry['key']}@{entry['days']}d",
+            )
+        report_markdown = synthesize_report(
+            time_range, lambda limit, keys=keys, transform=transform: spool.read_text(keys, limit=limit, transform=transform)
+        )
+
+        report_id = store_report(report_markdown, f"{spool.run_id}-{time_range}", time_range, search_provider, search_mode)
+        pdf_url = None
+        if report_id:
+            try:
+                build_pdf(report_id, report_markdown)
+                pdf_url = f"/api/artifacts/{report_id}/pdf"
+            except Exception as e:
+                print(f"PDF Generation failed for {report_id}: {e}")
+        reports[time_range] = {"report": report_markdown, "report_id": report_id, "pdf_url": pdf_url}
+
+    spool.finish("complete", report_ids={tr: r["report_id"] for tr, r in reports.items()}, derived_from=widest)
+    if not use_mock_data:
+        archive_run(spool, plan, [r["report_id"] for r in reports.values()], partners + competitors)
+    return reports
@@ -9,6 +9,7 @@ import versionData from './version.json'
 function App() {
     const [loading, setLoading] = useState(false)
     const [report, setReport] = useState(null)
+    const [reportId, setReportId] = useState(null) // Prefetched artifacts (PDF, audio) are keyed by report
     const [deepDiveTopic, setDeepDiveTopic] = useState(null)
     const [deepDiveCache, setDeepDiveCache] = useState({}) // Cache deep dive results
     const [audioUrl, setAudioUrl] = useState(null)
@@ -25,6 +26,7 @@ function App() {
         setLoading(true)
         setError(null)
         setReport(null)
+        setReportId(null)
         try {
             const fullConfig = {
                 ...config,
@@ -54,6 +56,7 @@ function App() {
             }
 
             setReport(data.report)
+            setReportId(data.report_id || null)
         } catch (err) {
             console.error("Failed to run scout:", err)
             setError(err.message || "Failed to connect to backend")
@@ -73,7 +76,7 @@ function App() {
             const response = await fetch(`${API_BASE}/audio`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ report_text: report })
+                body: JSON.stringify({ report_text: report, report_id: reportId })
             })
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`)